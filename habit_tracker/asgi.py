@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "habit_tracker.settings")
+# settings podle toho vypnou trvalá DB spojení (viz HABITS_DB_PROFILE)
+os.environ.setdefault("HABITS_ASGI", "1")
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,11 +43,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "habits.instrumentation.RequestInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "habits.profiling.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -82,6 +85,120 @@ DATABASES = {
     }
 }
 
+# profil DB: "default" = výchozí SQLite (rollback journal, spojení na požadavek),
+# "production" = WAL + pragmy (habits.sqlite) + trvalá spojení (jen pod WSGI)
+HABITS_DB_PROFILE = os.environ.get("HABITS_DB_PROFILE", "default")
+HABITS_SQLITE_PRAGMAS = {}
+# nastavuje habit_tracker.asgi; pod ASGI běží sync kód v různých vláknech
+# a trvalá spojení by se hromadila -> spojení na požadavek
+HABITS_ASGI = os.environ.get("HABITS_ASGI", "") in ("1", "true", "yes")
+
+if HABITS_DB_PROFILE == "production":
+    DATABASES["default"].update(
+        {
+            # BEGIN IMMEDIATE pro atomic bloky (viz habits.backends.sqlite3)
+            "ENGINE": "habits.backends.sqlite3",
+            "CONN_MAX_AGE": 0 if HABITS_ASGI else 600,
+            "CONN_HEALTH_CHECKS": True,
+            # čekání na zámek v sqlite3 modulu (s), shodné s busy_timeout
+            "OPTIONS": {"timeout": 5},
+        }
+    )
+    HABITS_SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,  # ms
+        "cache_size": -64000,  # záporné = KiB -> 64 MiB na spojení
+        "mmap_size": 268435456,  # 256 MiB
+        "temp_store": "MEMORY",
+    }
+elif HABITS_DB_PROFILE != "default":
+    raise ValueError(f"Neznámý HABITS_DB_PROFILE: {HABITS_DB_PROFILE!r}")
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# locmem = LRU v rámci procesu; pro více workerů HABITS_CACHE_BACKEND=file
+
+if os.environ.get("HABITS_CACHE_BACKEND") == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": BASE_DIR / ".cache",
+            "TIMEOUT": 300,
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "habits",
+            "TIMEOUT": 300,
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+HABITS_STATS_CACHE = "default"
+HABITS_STATS_CACHE_TTL = 300
+# seznam habitů v paměti procesu (dnešní přehled) – jen se sdíleným backendem
+# (HABITS_CACHE_BACKEND=file), viz habits.habit_cache
+HABITS_HABIT_CACHE_TTL = 300
+
+# async view pro stats/today (pod ASGI serverem), viz habits.async_views
+HABITS_ASYNC_VIEWS = os.environ.get("HABITS_ASYNC_VIEWS", "") in ("1", "true", "yes")
+# velikost poolu vláken pro výpočty statistik (None = min(4, CPU))
+HABITS_ASYNC_WORKERS = None
+
+# živé aktualizace dnešního přehledu (SSE); broker je vyměnitelný (dotted path)
+HABITS_EVENT_BROKER = "habits.events.InProcessBroker"
+HABITS_SSE_KEEPALIVE = 15
+
+# měření požadavků (dotazy, čas DB/view), viz habits.instrumentation;
+# Server-Timing dostane jen staff (v DEBUG všichni)
+HABITS_INSTRUMENTATION = DEBUG
+HABITS_SERVER_TIMING = True
+# JSON řádek na požadavek (logger habits.requests) do souboru s rotací;
+# bez proměnné se nezapisuje nikam
+HABITS_REQUEST_LOG = os.environ.get("HABITS_REQUEST_LOG") or None
+
+if HABITS_REQUEST_LOG:
+    LOGGING = {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {"line": {"format": "%(message)s"}},
+        "handlers": {
+            "request_log": {
+                "class": "logging.handlers.RotatingFileHandler",
+                "filename": HABITS_REQUEST_LOG,
+                "maxBytes": 10 * 1024 * 1024,
+                "backupCount": 5,
+                "encoding": "utf-8",
+                "formatter": "line",
+            },
+        },
+        "loggers": {
+            "habits.requests": {
+                "handlers": ["request_log"],
+                "level": "INFO",
+                "propagate": False,
+            },
+        },
+    }
+
+# /metrics (Prometheus); HABITS_METRICS_DIR = sdílené soubory pro více procesů
+HABITS_METRICS = True
+HABITS_METRICS_DIR = os.environ.get("HABITS_METRICS_DIR") or None
+HABITS_METRICS_FLUSH_INTERVAL = 1.0
+# None = bez omezení (např. za reverse proxy s vlastním ACL)
+HABITS_METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+
+# profilování na vyžádání (staff + ?profile=1 / X-Profile: 1), viz habits.profiling
+HABITS_PROFILING = os.environ.get("HABITS_PROFILING", "") in ("1", "true", "yes")
+HABITS_PROFILE_DIR = BASE_DIR / "profiles"
+# kolik nejpomalejších profilů se drží v indexu
+HABITS_PROFILE_KEEP = 20
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
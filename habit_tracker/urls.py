@@ -19,6 +19,8 @@ from django.contrib import admin
 from django.http import JsonResponse
 from django.urls import include, path
 
+from habits.metrics import metrics_view
+
 
 def healthcheck(_request):
     return JsonResponse({"status": "ok"})
@@ -27,6 +29,7 @@ def healthcheck(_request):
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("healthz/", healthcheck, name="healthz"),
+    path("metrics", metrics_view, name="metrics"),
     path("accounts/", include("django.contrib.auth.urls")),  # login/logout
     path("", include("habits.urls")),
 ]
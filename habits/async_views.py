@@ -0,0 +1,103 @@
+"""
+Nativně async (ASGI) varianty čtecích view: /api/stats/ a /today/.
+Zapínají se nastavením `HABITS_ASYNC_VIEWS` (viz habits.urls). Výpis
+/api/logs/ zůstává na sync viewsetu – ručně přepsané stránkování bylo
+pomalejší než DRF pod sync_to_async.
+
+Dotazy jdou přes async ORM, výpočet statistik (dekódování bitmap, streaky,
+okna) běží v omezeném poolu vláken (`HABITS_ASYNC_WORKERS`), takže pomalý
+uživatel neblokuje event loop ani nedrží worker. Autentizace je session;
+ostatní případy (anonym, Basic auth, zápis) se předají synchronním view,
+aby odpovědi zůstaly stejné.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+
+from .conditional import apply_validators, user_validators
+from .habit_cache import get_user_habits
+from .stats import parse_windows
+from .stats_cache import aget_user_stats, aget_user_version
+from .views import StatisticsView, _live_context, _today_context, _today_rows
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+_sync_stats = StatisticsView.as_view()
+
+
+def executor() -> ThreadPoolExecutor:
+    """Sdílený omezený pool pro CPU výpočty statistik."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, "HABITS_ASYNC_WORKERS", None)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers or min(4, os.cpu_count() or 1),
+                thread_name_prefix="habits-stats",
+            )
+    return _executor
+
+
+async def _session_user(request):
+    user = await request.auser()
+    if user.is_authenticated:
+        request.user = user
+        return user
+    return None
+
+
+def _not_modified(request, version: int):
+    validators = user_validators(request, version)
+    etag, last_modified = validators
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified)
+    )
+    return validators, response
+
+
+async def statistics(request):
+    """Async /api/stats/ (stejné parametry i odpověď jako StatisticsView)."""
+    if request.method != "GET" or await _session_user(request) is None:
+        return await sync_to_async(_sync_stats)(request)
+
+    version = await aget_user_version(request.user.id)
+    validators, not_modified = _not_modified(request, version)
+    if not_modified is not None:
+        return apply_validators(not_modified, validators)
+    try:
+        windows = parse_windows(request.GET.get("windows"))
+    except ValueError as exc:
+        return JsonResponse({"windows": [str(exc)]}, status=400)
+
+    data = await aget_user_stats(
+        request.user, windows=windows, executor=executor(), version=version
+    )
+    return apply_validators(JsonResponse({"habits": data}), validators)
+
+
+async def today_view(request):
+    """Async /today/ (HTMX požadavek dostane jen partial)."""
+    user = await _session_user(request)
+    if user is None:
+        return redirect_to_login(request.get_full_path())
+
+    today = date.today()
+    habits = await sync_to_async(get_user_habits)(user.id)
+    rows = [r async for r in _today_rows(user, today)]
+    ctx = _today_context(today, habits, rows)
+    ctx.update(_live_context(request))
+    if request.headers.get("HX-Request") == "true":
+        return render(request, "habits/_today_list.html", ctx)
+    return render(request, "habits/today.html", ctx)
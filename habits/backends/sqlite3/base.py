@@ -0,0 +1,19 @@
+"""
+SQLite backend, který zahajuje transakce `BEGIN IMMEDIATE`.
+
+Výchozí `BEGIN` (deferred) bere zápisový zámek až při prvním zápisu. Když
+transakce nejdřív čte (toggle: SELECT, pak DELETE/INSERT) a mezitím zapisuje
+jiné spojení, SQLite upgrade zámku odmítne hned s "database is locked" –
+`busy_timeout` se v této situaci nepoužije (hrozil by deadlock). IMMEDIATE
+vezme zámek na začátku, souběžní zapisovatelé tedy na sebe počkají.
+Čtení mimo `atomic` (autocommit) zámek nebere a s WAL zápisy neblokuje.
+
+Django 5.1+ totéž umí přes OPTIONS {"transaction_mode": "IMMEDIATE"}.
+"""
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE")
@@ -0,0 +1,10 @@
+"""
+Benchmarky výkonu nad datasety pevné velikosti (habity × roky logů).
+
+Spouští se `manage.py run_benchmarks`; výsledky jdou do JSON a lze je
+porovnat s uloženou baseline (regrese = nenulový návratový kód).
+"""
+
+from .runner import BenchResult, compare, run_benchmarks
+
+__all__ = ["BenchResult", "compare", "run_benchmarks"]
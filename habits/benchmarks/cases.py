@@ -0,0 +1,106 @@
+"""
+Měřené operace. Každý případ dostane uživatele datasetu a vrátí
+(setup, run, teardown); měří se jen `run`.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from django.conf import settings
+from django.test import RequestFactory
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from habits import habit_cache
+from habits.models import Habit
+from habits.services import get_current_streak
+from habits.stats import compute_user_stats
+from habits.views import (
+    HabitLogViewSet,
+    _build_today_context,
+    _toggle_log,
+    export_logs_csv,
+    toggle_today,
+)
+
+_noop = lambda: None  # noqa: E731
+
+
+def _host() -> str:
+    """Host povolený v ALLOWED_HOSTS (RequestFactory posílá 'testserver')."""
+    hosts = [
+        h for h in settings.ALLOWED_HOSTS if h not in ("*",) and not h.startswith(".")
+    ]
+    return hosts[0] if hosts else "localhost"
+
+
+def _first_habit(user):
+    return (
+        Habit.objects.filter(user=user, periodicity=Habit.Periodicity.DAILY)
+        .order_by("id")
+        .first()
+        or Habit.objects.filter(user=user).order_by("id").first()
+    )
+
+
+def stats(user):
+    return _noop, lambda: compute_user_stats(user), _noop
+
+
+def current_streak(user):
+    habit = _first_habit(user)
+    return _noop, lambda: get_current_streak(habit), _noop
+
+
+def today_context(user):
+    # teplá cesta: seznam habitů už je v paměťové cache (jen sdílený backend)
+    return (
+        lambda: habit_cache.get_user_habits(user.id),
+        lambda: _build_today_context(user),
+        _noop,
+    )
+
+
+def toggle(user):
+    habit = _first_habit(user)
+    request = RequestFactory(HTTP_HOST=_host()).post(f"/today/toggle/{habit.id}/")
+    request.user = user
+
+    def run():
+        return toggle_today(request, habit.id).content
+
+    # vrátí dnešní stav zpět, aby opakování měřila totéž
+    return _noop, run, lambda: _toggle_log(habit, date.today())
+
+
+def export_csv(user):
+    request = RequestFactory(HTTP_HOST=_host()).get("/export/logs.csv", {"stream": "1"})
+    request.user = user
+
+    def run():
+        return sum(len(chunk) for chunk in export_logs_csv(request).streaming_content)
+
+    return _noop, run, _noop
+
+
+def logs_list(user):
+    view = HabitLogViewSet.as_view({"get": "list"})
+
+    def run():
+        request = APIRequestFactory(HTTP_HOST=_host()).get("/api/logs/")
+        force_authenticate(request, user=user)
+        response = view(request)
+        response.render()
+        return response.content
+
+    return _noop, run, _noop
+
+
+CASES = {
+    "compute_user_stats": stats,
+    "get_current_streak": current_streak,
+    "build_today_context": today_context,
+    "toggle_today": toggle,
+    "export_logs_csv": export_csv,
+    "api_logs_list": logs_list,
+}
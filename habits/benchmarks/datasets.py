@@ -0,0 +1,89 @@
+"""
+Seedování benchmarkových datasetů přes deterministický generátor.
+
+Datasety i případ toggle zapisují do DB, proto `run_benchmarks` běží nad
+samostatnou databází (`benchmark_database`), ne nad vývojovou db.sqlite3.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from habits.models import HabitLog
+from habits.synthetic import ScaleSpec, generate_chunk
+
+DEFAULT_SIZES = "10x1,100x5,1000x20"
+SEED = 20240101
+SQLITE_NAME = "benchmark.sqlite3"
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    habits: int
+    years: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.habits}h_{self.years}y"
+
+    @property
+    def spec(self) -> ScaleSpec:
+        return ScaleSpec(
+            users=1,
+            habits_per_user=self.habits,
+            days=365 * self.years,
+            seed=SEED,
+            prefix=f"bench{self.habits}x{self.years}_",
+        )
+
+
+def parse_sizes(raw: str) -> list[DatasetSize]:
+    """ "10x1,100x5" -> [DatasetSize(10, 1), DatasetSize(100, 5)]; ValueError jinak."""
+    sizes = []
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        habits, sep, years = part.partition("x")
+        if not sep or not habits.isdigit() or not years.isdigit():
+            raise ValueError(f"Neplatná velikost '{part}', očekávám HABITYxROKY.")
+        if int(habits) < 1 or int(years) < 1:
+            raise ValueError(f"Velikost '{part}' musí být kladná.")
+        sizes.append(DatasetSize(int(habits), int(years)))
+    if not sizes:
+        raise ValueError("Zadej alespoň jednu velikost.")
+    return sizes
+
+
+@contextmanager
+def benchmark_database(keepdb: bool = False):
+    """
+    Přepne výchozí spojení na samostatnou DB stejně jako test runner
+    (`create_test_db`); SQLite používá soubor `SQLITE_NAME` v BASE_DIR.
+    S `keepdb` se DB (a vygenerované datasety) zachová pro další běh.
+    """
+    test = connection.settings_dict["TEST"]
+    previous = test.get("NAME")
+    if connection.vendor == "sqlite" and not previous:
+        test["NAME"] = str(settings.BASE_DIR / SQLITE_NAME)
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=keepdb
+    )
+    try:
+        yield connection.settings_dict["NAME"]
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        test["NAME"] = previous
+
+
+def ensure_dataset(size: DatasetSize):
+    """Uživatel datasetu (při prvním použití se vygeneruje) a počet jeho logů."""
+    spec = size.spec
+    generate_chunk(spec, 0, 1)
+    user = get_user_model().objects.get(username=spec.username(0))
+    return user, HabitLog.objects.filter(user=user).count()
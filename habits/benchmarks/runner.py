@@ -0,0 +1,133 @@
+"""Měření (čas, počet dotazů, špičková paměť) a porovnání s baseline."""
+
+from __future__ import annotations
+
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Iterable
+
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .cases import CASES
+from .datasets import DatasetSize, ensure_dataset
+
+# menší rozdíly v čase se za regresi nepovažují (šum)
+MIN_TIME_DELTA_MS = 5.0
+
+
+@dataclass
+class BenchResult:
+    case: str
+    dataset: str
+    habits: int
+    years: int
+    logs: int
+    wall_ms_median: float
+    wall_ms_min: float
+    queries: int
+    peak_kib: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}@{self.dataset}"
+
+
+def _measure(case_factory, user, repeat: int) -> tuple[list[float], int, float]:
+    setup, run, teardown = case_factory(user)
+    times = []
+    for _ in range(repeat):
+        setup()
+        started = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - started) * 1000)
+        teardown()
+
+    # dotazy a paměť zvlášť – tracemalloc zpomaluje a zkresloval by čas
+    setup()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as ctx:
+            run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        teardown()
+    return times, len(ctx.captured_queries), peak / 1024
+
+
+def run_benchmarks(
+    sizes: Iterable[DatasetSize],
+    cases: Iterable[str] | None = None,
+    repeat: int = 5,
+    progress=None,
+) -> dict:
+    """
+    Změří případy nad datasety v aktuální DB (zapisuje do ní – volat uvnitř
+    `datasets.benchmark_database` nebo testovací DB).
+    """
+    names = list(cases or CASES)
+    results = []
+    for size in sizes:
+        user, logs = ensure_dataset(size)
+        for name in names:
+            times, queries, peak = _measure(CASES[name], user, max(1, repeat))
+            result = BenchResult(
+                case=name,
+                dataset=size.name,
+                habits=size.habits,
+                years=size.years,
+                logs=logs,
+                wall_ms_median=round(statistics.median(times), 3),
+                wall_ms_min=round(min(times), 3),
+                queries=queries,
+                peak_kib=round(peak, 1),
+            )
+            results.append(result)
+            if progress:
+                progress(result)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "repeat": repeat,
+        },
+        "results": [asdict(r) for r in results],
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.25) -> list[str]:
+    """
+    Regrese proti baseline: víc dotazů (vždy), medián času nebo špičková
+    paměť horší o víc než `tolerance` (čas navíc aspoň o MIN_TIME_DELTA_MS).
+    """
+    base = {f"{r['case']}@{r['dataset']}": r for r in baseline.get("results", [])}
+    problems = []
+    for r in current.get("results", []):
+        key = f"{r['case']}@{r['dataset']}"
+        old = base.get(key)
+        if old is None:
+            continue
+        if r["queries"] > old["queries"]:
+            problems.append(f"{key}: dotazy {old['queries']} -> {r['queries']}")
+        limit = old["wall_ms_median"] * (1 + tolerance)
+        if (
+            r["wall_ms_median"] > limit
+            and r["wall_ms_median"] - old["wall_ms_median"] > MIN_TIME_DELTA_MS
+        ):
+            problems.append(
+                f"{key}: čas {old['wall_ms_median']:.1f} -> "
+                f"{r['wall_ms_median']:.1f} ms"
+            )
+        if r["peak_kib"] > old["peak_kib"] * (1 + tolerance):
+            problems.append(
+                f"{key}: paměť {old['peak_kib']:.0f} -> {r['peak_kib']:.0f} KiB"
+            )
+    return problems
@@ -0,0 +1,171 @@
+"""
+Kompaktní úložiště splnění týdenních habitů po letech (HabitYearBitmap).
+
+Každý rok je pole 366 × uint32 LE (1464 B/rok): na indexu dne od 1. 1. je
+součet value toho dne, 0 = bez záznamu. uint32 stačí na celý rozsah
+HabitLog.value (PositiveIntegerField).
+
+Zdrojem pravdy zůstává HabitLog; bitmapy se z něj odvozují a čte z nich
+týdenní statistika (`habits.stats`, `habits.services`). Denní habity bitmapy
+nemají – jejich statistiky a streaky čtou řady (HabitRun, `habits.runs`).
+"""
+
+from __future__ import annotations
+
+import struct
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable
+
+from django.db import transaction
+
+from .models import Habit, HabitLog, HabitYearBitmap
+
+DAYS_PER_YEAR = 366
+DAY_BYTES = 4
+MAX_COUNT = 2**32 - 1
+
+
+def _day_index(d: date) -> int:
+    return (d - date(d.year, 1, 1)).days
+
+
+def empty() -> bytearray:
+    return bytearray(DAYS_PER_YEAR * DAY_BYTES)
+
+
+def set_value(buf: bytearray, d: date, value: int) -> None:
+    """Zapíše hodnotu dne `d` do bufferu (0 = bez záznamu)."""
+    value = max(0, min(int(value), MAX_COUNT))
+    struct.pack_into("<I", buf, _day_index(d) * DAY_BYTES, value)
+
+
+def decode(year: int, data: bytes) -> list[tuple[date, int]]:
+    """Bitmapa -> seřazené (date, value) dvojice dnů se záznamem."""
+    jan1 = date(year, 1, 1)
+    return [
+        (jan1 + timedelta(days=idx), v)
+        for idx, (v,) in enumerate(struct.iter_unpack("<I", data))
+        if v
+    ]
+
+
+def encode(pairs: Iterable[tuple[date, int]]) -> dict[int, bytes]:
+    """(date, value) dvojice -> {rok: bitmapa}."""
+    by_year: dict[int, bytearray] = {}
+    for d, v in pairs:
+        buf = by_year.get(d.year)
+        if buf is None:
+            buf = by_year[d.year] = empty()
+        set_value(buf, d, v)
+    return {year: bytes(buf) for year, buf in by_year.items()}
+
+
+# ------- synchronizace s HabitLog -------
+
+
+def set_day(habit: Habit, d: date, value: int) -> None:
+    """Inkrementální update jednoho dne po zápisu HabitLog."""
+    if habit.periodicity != Habit.Periodicity.WEEKLY:
+        return
+    with transaction.atomic():
+        bm = (
+            HabitYearBitmap.objects.select_for_update()
+            .filter(habit_id=habit.id, year=d.year)
+            .first()
+        )
+        if bm is None:
+            if not value:
+                return
+            bm = HabitYearBitmap(habit_id=habit.id, year=d.year)
+            buf = empty()
+        else:
+            buf = bytearray(bm.data)
+        set_value(buf, d, value)
+        bm.data = bytes(buf)
+        bm.save()
+
+
+def clear_day(habit_id: int, d: date) -> None:
+    """
+    Vynulování dne po smazání HabitLog – bez načtení habitu: denní habity
+    bitmapu nemají, takže stačí chybějící řádek přeskočit. Volá se z
+    post_delete uvnitř transakce mazání, vlastní savepoint není potřeba.
+    """
+    with transaction.atomic(savepoint=False):
+        bm = (
+            HabitYearBitmap.objects.select_for_update()
+            .filter(habit_id=habit_id, year=d.year)
+            .first()
+        )
+        if bm is None:
+            return
+        buf = bytearray(bm.data)
+        set_value(buf, d, 0)
+        bm.data = bytes(buf)
+        bm.save(update_fields=["data"])
+
+
+def rebuild(habit_ids: Iterable[int]) -> None:
+    """
+    Přepočítá bitmapy zadaných habitů z HabitLog (po bulk operacích).
+    Denním habitům bitmapy smaže (např. po změně periodicity).
+    """
+    habit_ids = list(habit_ids)
+    if not habit_ids:
+        return
+    weekly = list(
+        Habit.objects.filter(
+            id__in=habit_ids, periodicity=Habit.Periodicity.WEEKLY
+        ).values_list("id", flat=True)
+    )
+    pairs_by_habit = defaultdict(list)
+    for hid, d, v in HabitLog.objects.filter(habit_id__in=weekly).values_list(
+        "habit_id", "date", "value"
+    ):
+        pairs_by_habit[hid].append((d, v))
+
+    rows = [
+        HabitYearBitmap(habit_id=hid, year=year, data=data)
+        for hid in weekly
+        for year, data in encode(pairs_by_habit.get(hid, [])).items()
+    ]
+    with transaction.atomic():
+        HabitYearBitmap.objects.filter(habit_id__in=habit_ids).delete()
+        HabitYearBitmap.objects.bulk_create(rows, batch_size=1000)
+
+
+# ------- čtení -------
+
+
+def series_from_rows(rows, start_date: date) -> dict[int, list[tuple[date, int]]]:
+    """Dekóduje řádky (habit_id, year, data) na {habit_id: [(date, value)]}."""
+    by_habit: dict[int, list[tuple[date, int]]] = defaultdict(list)
+    for hid, year, data in rows:
+        by_habit[hid].extend(
+            (d, v) for d, v in decode(year, bytes(data)) if d <= start_date
+        )
+    return by_habit
+
+
+def load_user_series(user, start_date: date) -> dict[int, list[tuple[date, int]]]:
+    """Týdenní habity uživatele jedním dotazem: {habit_id: [(date, value), ...]}."""
+    return series_from_rows(user_series_rows(user, start_date), start_date)
+
+
+def user_series_rows(user, start_date: date):
+    """Queryset řádků pro `series_from_rows` (lze iterovat i přes `async for`)."""
+    return (
+        HabitYearBitmap.objects.filter(habit__user=user, year__lte=start_date.year)
+        .order_by("habit_id", "year")
+        .values_list("habit_id", "year", "data")
+    )
+
+
+def load_habit_series(habit: Habit, start_date: date) -> list[tuple[date, int]]:
+    rows = (
+        HabitYearBitmap.objects.filter(habit=habit, year__lte=start_date.year)
+        .order_by("year")
+        .values_list("habit_id", "year", "data")
+    )
+    return series_from_rows(rows, start_date).get(habit.id, [])
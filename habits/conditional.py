@@ -0,0 +1,74 @@
+"""
+Podmíněné GET (ETag / Last-Modified) pro API čtení.
+
+Validátory se odvozují z verze dat uživatele (`stats_cache.get_user_version`),
+kterou signály zvedají v transakci každého zápisu Habit/HabitLog. Verze je
+jeden řádek v DB (čtení podle PK), takže ETag sedí napříč worker procesy
+a nezměněný poll dostane 304 bez dotazu na HabitLog a bez `compute_user_stats`.
+
+ETag je autoritativní (uživatel + verze v ns + cesta s query stringem + dnešní datum,
+na kterém závisí statistiky). Last-Modified má jen sekundovou přesnost
+a slouží pro klienty, kteří ETag neposílají.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import date, datetime, time
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .stats_cache import get_user_version
+
+
+def user_validators(request, version: int | None = None) -> tuple[str, float]:
+    """
+    (ETag, Last-Modified jako unix timestamp) pro požadavek uživatele.
+    Již načtenou verzi (async view, cache statistik) lze předat.
+    """
+    if version is None:
+        version = get_user_version(request.user.id)
+    today = date.today()
+    raw = f"{request.user.id}:{version}:{today.isoformat()}:{request.get_full_path()}"
+    etag = f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+    # po půlnoci se mění statistiky i bez zápisu -> nejméně začátek dne
+    midnight = datetime.combine(today, time.min).timestamp()
+    return etag, max(version / 1e9, midnight)
+
+
+def apply_validators(response, validators: tuple[str, float]):
+    """Doplní ETag, Last-Modified a Cache-Control do odpovědi (200/304)."""
+    etag, last_modified = validators
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    # data jsou per uživatel; klient má vždy revalidovat
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Pro DRF view: `self.not_modified(request)` vrátí 304 (nebo None) ještě
+    před hlavním dotazem; úspěšné GET odpovědi dostanou ETag a Last-Modified.
+    """
+
+    _validators: tuple[str, float] | None = None
+    data_version: int | None = None
+
+    def not_modified(self, request):
+        if not request.user.is_authenticated:
+            return None
+        self.data_version = get_user_version(request.user.id)
+        self._validators = user_validators(request, self.data_version)
+        etag, last_modified = self._validators
+        return get_conditional_response(
+            request._request, etag=etag, last_modified=int(last_modified)
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._validators and request.method in ("GET", "HEAD"):
+            if response.status_code in (200, 304):
+                apply_validators(response, self._validators)
+        return response
@@ -0,0 +1,159 @@
+"""
+Pub/sub změn pro živé aktualizace dnešního přehledu (SSE, viz today_events).
+
+Signály po commitu publikují `{"habit_id", "date"}` do kanálu uživatele;
+každé otevřené SSE spojení má vlastní odběr s omezenou frontou (pomalý klient
+o události přijde, ale neblokuje zápis).
+
+Událost může nést `origin` – id stránky (klienta), která změnu způsobila.
+Její vlastní SSE spojení ji přeskočí: řádek už aktualizovala odpověď na POST.
+
+Výchozí `InProcessBroker` doručuje jen v rámci procesu. Pro více workerů se
+přes `HABITS_EVENT_BROKER` (dotted path) nastaví jiná implementace se
+stejným rozhraním: publish(user_id, event), subscribe(user_id, loop=None),
+unsubscribe(subscription).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import re
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+DEFAULT_BROKER = "habits.events.InProcessBroker"
+QUEUE_SIZE = 100
+CLIENT_HEADER = "X-Habits-Client"
+
+_origin: ContextVar[str | None] = ContextVar("habits_event_origin", default=None)
+_CLIENT_ID = re.compile(r"^[0-9a-f]{8,32}$")
+
+
+def clean_client_id(value: str | None) -> str | None:
+    """Id klienta z hlavičky/parametru; jiná hodnota než krátký hex je None."""
+    if value and _CLIENT_ID.match(value):
+        return value
+    return None
+
+
+@contextmanager
+def event_origin(client_id: str | None):
+    """Události publikované v bloku ponesou `origin` = client_id."""
+    token = _origin.set(client_id)
+    try:
+        yield
+    finally:
+        _origin.reset(token)
+
+
+def current_origin() -> str | None:
+    return _origin.get()
+
+
+class Subscription:
+    """Fronta událostí jednoho spojení; sync (`get`) nebo async (`aget`)."""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop | None = None):
+        self.user_id = user_id
+        self.loop = loop
+        if loop is None:
+            self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        else:
+            self._queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def _put_nowait(self, event: dict) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except (queue.Full, asyncio.QueueFull):
+            pass
+
+    def put(self, event: dict) -> None:
+        """Volatelné z libovolného vlákna."""
+        if self.loop is None:
+            self._put_nowait(event)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._put_nowait, event)
+
+    def get(self, timeout: float) -> dict | None:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def aget(self, timeout: float) -> dict | None:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._subs: dict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int, loop=None) -> Subscription:
+        sub = Subscription(user_id, loop)
+        with self._lock:
+            self._subs[user_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.user_id]
+
+    def publish(self, user_id: int, event: dict) -> None:
+        with self._lock:
+            subs = list(self._subs.get(user_id, ()))
+        for sub in subs:
+            sub.put(event)
+
+    def subscriber_count(self, user_id: int) -> int:
+        with self._lock:
+            return len(self._subs.get(user_id, ()))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            path = getattr(settings, "HABITS_EVENT_BROKER", DEFAULT_BROKER)
+            _broker = import_string(path)()
+    return _broker
+
+
+def reset_broker() -> None:
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+@receiver(setting_changed)
+def _broker_setting_changed(setting, **kwargs):
+    if setting == "HABITS_EVENT_BROKER":
+        reset_broker()
+
+
+def publish_habit_change(user_id: int, habit_id: int, day=None, origin=None) -> None:
+    event = {"habit_id": habit_id}
+    if day is not None:
+        event["date"] = day.isoformat()
+    if origin is not None:
+        event["origin"] = origin
+    get_broker().publish(user_id, event)
@@ -0,0 +1,95 @@
+"""
+Seznam habitů uživatele cachovaný v paměti procesu.
+
+Habity se mění zřídka, čtou se při každém načtení dnešního přehledu.
+Položka se váže na verzi seznamu v cache `HABITS_STATS_CACHE`, kterou zvedají
+signály při zápisu/smazání Habit. TTL jen omezuje dobu držení v paměti.
+
+Zastaralý seznam pozná jiný proces jen tehdy, je-li backend sdílený
+(např. `HABITS_CACHE_BACKEND=file`). S locmem (verze per proces) nebo dummy
+backendem se cache nepoužije a seznam se čte vždy z DB.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .metrics import CACHE_REQUESTS
+from .models import Habit
+
+DEFAULT_TTL = 300
+MAX_USERS = 10_000
+
+_entries: dict[int, tuple[float, int, list[Habit]]] = {}
+_lock = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, "HABITS_STATS_CACHE", "default")]
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "HABITS_HABIT_CACHE_TTL", DEFAULT_TTL))
+
+
+def enabled() -> bool:
+    """Cache jen se sdíleným backendem – verzi seznamu musí vidět všechny procesy."""
+    return not isinstance(_cache(), (LocMemCache, DummyCache))
+
+
+def _version_key(user_id: int) -> str:
+    return f"habits:hlist:{user_id}"
+
+
+def _list_version(user_id: int) -> int:
+    cache = _cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_user_habits(user_id: int) -> None:
+    """Zneplatní seznam habitů uživatele ve všech procesech."""
+    if not enabled():
+        return
+    cache = _cache()
+    key = _version_key(user_id)
+    cache.set(key, max(time.time_ns(), (cache.get(key) or 0) + 1), timeout=None)
+    with _lock:
+        _entries.pop(user_id, None)
+
+
+def get_user_habits(user_id: int) -> list[Habit]:
+    """Habity uživatele seřazené podle id (instance jsou sdílené – jen číst)."""
+    if not enabled():
+        return list(Habit.objects.filter(user_id=user_id).order_by("id"))
+    version = _list_version(user_id)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(user_id)
+    if entry is not None and entry[0] > now and entry[1] == version:
+        CACHE_REQUESTS.inc(cache="habits", result="hit")
+        return list(entry[2])
+
+    CACHE_REQUESTS.inc(cache="habits", result="miss")
+
+    habits = list(Habit.objects.filter(user_id=user_id).order_by("id"))
+    with _lock:
+        if len(_entries) >= MAX_USERS:
+            _entries.clear()
+        _entries[user_id] = (now + _ttl(), version, habits)
+    return list(habits)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
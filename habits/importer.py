@@ -0,0 +1,175 @@
+"""
+Import logů z CSV ve formátu `export_logs_csv` (habit_id, habit_name, date, value).
+
+Soubor se čte jako stream po řádcích a vkládá se po dávkách (`bulk_create`),
+takže paměť nezávisí na velikosti souboru. Habity se hledají v paměťovém
+lookupu podle id (musí patřit uživateli a sedět jméno) nebo podle jména;
+chybějící se volitelně založí jako denní.
+"""
+
+from __future__ import annotations
+
+import csv
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import IO
+
+from django.db import transaction
+
+from .metrics import LOG_WRITES
+from .models import Habit, HabitLog
+from .signals import sync_after_bulk
+
+EXPECTED_HEADER = ["habit_id", "habit_name", "date", "value"]
+DEFAULT_BATCH_SIZE = 2000
+# přepočet odvozených dat po skupinách habitů (omezí paměť)
+SYNC_CHUNK = 50
+MAX_REPORTED_ERRORS = 20
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    habits_created: int = 0
+    elapsed: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "habits_created": self.habits_created,
+            "elapsed": round(self.elapsed, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "errors": self.errors,
+        }
+
+
+class _HabitLookup:
+    """Habity uživatele v paměti: podle id i jména."""
+
+    def __init__(self, user, create_missing: bool):
+        self.user = user
+        self.create_missing = create_missing
+        self.created = 0
+        self.by_id: dict[int, Habit] = {}
+        self.by_name: dict[str, Habit] = {}
+        for h in Habit.objects.filter(user=user).order_by("id"):
+            self.by_id[h.id] = h
+            self.by_name.setdefault(h.name, h)
+
+    def resolve(self, raw_id: str, name: str) -> Habit | None:
+        if raw_id.strip().isdigit():
+            h = self.by_id.get(int(raw_id))
+            # id z jiné instance může kolidovat -> musí sedět i jméno
+            if h is not None and (not name or h.name == name):
+                return h
+        h = self.by_name.get(name)
+        if h is None and name and self.create_missing:
+            h = Habit.objects.create(user=self.user, name=name[:100])
+            self.by_id[h.id] = h
+            self.by_name[name] = h
+            self.created += 1
+        return h
+
+
+def import_logs_csv(
+    user,
+    stream: IO[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    create_missing: bool = True,
+) -> ImportResult:
+    """
+    Naimportuje logy z textového streamu (otevřeného s encoding="utf-8-sig").
+    Vyhodí ValueError, pokud hlavička neodpovídá formátu exportu.
+    """
+    started = time.perf_counter()
+    result = ImportResult()
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None or [c.strip() for c in header] != EXPECTED_HEADER:
+        raise ValueError(f"Očekávám hlavičku {','.join(EXPECTED_HEADER)}.")
+
+    lookup = _HabitLookup(user, create_missing)
+    touched: set[int] = set()
+
+    def _invalid(line_no: int, msg: str):
+        result.invalid += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(f"řádek {line_no}: {msg}")
+
+    def _flush(batch: dict[tuple[int, date], int]):
+        if not batch:
+            return
+        dates = [d for _, d in batch]
+        existing = set(
+            HabitLog.objects.filter(
+                habit_id__in={hid for hid, _ in batch},
+                date__gte=min(dates),
+                date__lte=max(dates),
+            ).values_list("habit_id", "date")
+        )
+        new = [
+            HabitLog(habit_id=hid, user_id=user.id, date=d, value=v)
+            for (hid, d), v in batch.items()
+            if (hid, d) not in existing
+        ]
+        with transaction.atomic():
+            HabitLog.objects.bulk_create(new, ignore_conflicts=True)
+        LOG_WRITES.inc(len(new), op="create")
+        result.created += len(new)
+        result.duplicates += len(batch) - len(new)
+        touched.update(log.habit_id for log in new)
+        batch.clear()
+
+    batch: dict[tuple[int, date], int] = {}
+    try:
+        for line_no, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            result.rows += 1
+            if len(row) != len(EXPECTED_HEADER):
+                _invalid(line_no, "špatný počet sloupců")
+                continue
+            raw_id, name, raw_date, raw_value = row
+            try:
+                log_date = date.fromisoformat(raw_date.strip())
+                value = int(raw_value)
+            except ValueError:
+                _invalid(line_no, "neplatné datum nebo hodnota")
+                continue
+            if value < 1:
+                _invalid(line_no, "value musí být >= 1")
+                continue
+            habit = lookup.resolve(raw_id, name.strip())
+            if habit is None:
+                _invalid(line_no, f"neznámý návyk '{name}'")
+                continue
+
+            key = (habit.id, log_date)
+            if key in batch:
+                result.duplicates += 1
+                continue
+            batch[key] = value
+            if len(batch) >= batch_size:
+                _flush(batch)
+        _flush(batch)
+    finally:
+        # bulk_create nevolá signály -> dopočítat odvozená data
+        ids = sorted(touched)
+        for i in range(0, len(ids), SYNC_CHUNK):
+            sync_after_bulk(ids[i : i + SYNC_CHUNK])
+
+    result.habits_created = lookup.created
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,215 @@
+"""
+Měření každého požadavku: počet SQL dotazů, čas v DB, duplicitní dotazy
+a čas view. Zapíná se `HABITS_INSTRUMENTATION` (výchozí = DEBUG); latence
+pro /metrics se měří vždy. Výsledek jde do hlavičky `Server-Timing`
+(DevTools → Timing; jen pro staff nebo v DEBUG) a jako jeden JSON řádek
+do loggeru `habits.requests` (soubor s rotací viz `HABITS_REQUEST_LOG`).
+
+Dotazy se počítají přes execute wrapper (`connection.execute_wrappers`),
+který se přidá každému DB spojení při jeho vytvoření. Aktivní měření je
+v ContextVar, takže se započítají i dotazy async ORM ze `sync_to_async`
+vláken a view ani viewsety se nemusí upravovat. Mimo požadavek (příkazy,
+testy bez klienta) je wrapper jen průchozí.
+
+Streamované odpovědi (CSV export, SSE) se měří do vrácení odpovědi;
+generování těla už do měření nespadá.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject, empty
+
+from .metrics import REQUEST_LATENCY
+
+MAX_LOGGED_SQL = 300
+DUPLICATES_LOGGED = 3
+
+_current: ContextVar["RequestMetrics | None"] = ContextVar(
+    "habits_request_metrics", default=None
+)
+request_log = logging.getLogger("habits.requests")
+
+
+@dataclass
+class RequestMetrics:
+    started: float = field(default_factory=time.perf_counter)
+    view_started: float | None = None
+    queries: int = 0
+    db_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    @property
+    def duplicates(self) -> int:
+        """Dotazy navíc – stejné SQL se stejnými parametry víc než jednou."""
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def top_duplicates(self) -> list[dict]:
+        return [
+            {"sql": sql[:MAX_LOGGED_SQL], "count": n}
+            for (sql, _params), n in self.statements.most_common(DUPLICATES_LOGGED)
+            if n > 1
+        ]
+
+
+def _record(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.queries += 1
+        metrics.statements[(sql, repr(params))] += 1
+
+
+def install(connection) -> None:
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+@receiver(connection_created)
+def _connection_created(sender, connection, **kwargs):
+    install(connection)
+
+
+def _loaded_user(request):
+    user = getattr(request, "user", None)
+    # nevyhodnocený lazy user by znamenal dotazy navíc (a v async i chybu)
+    if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+        return None
+    return user
+
+
+def _user_id(request) -> int | None:
+    user = _loaded_user(request)
+    return user.id if user is not None and user.is_authenticated else None
+
+
+def _view_name(request) -> str | None:
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else None
+
+
+def server_timing(metrics: RequestMetrics, total: float, view: float | None) -> str:
+    parts = [
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+    ]
+    if metrics.duplicates:
+        parts.append(f'dup;desc="{metrics.duplicates} duplicate queries"')
+    if view is not None:
+        parts.append(f"view;dur={view * 1000:.1f}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def _wants_server_timing(request) -> bool:
+    """Časy a počty dotazů prozrazují interní detaily – jen staff nebo DEBUG."""
+    if not getattr(settings, "HABITS_SERVER_TIMING", True):
+        return False
+    if settings.DEBUG:
+        return True
+    user = _loaded_user(request)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Patří co nejvýš v MIDDLEWARE (celkový čas zahrnuje vše pod ním).
+    S `HABITS_INSTRUMENTATION = False` měří jen latenci pro /metrics;
+    bez metrik (`HABITS_METRICS = False`) se úplně vypne.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.detailed = getattr(settings, "HABITS_INSTRUMENTATION", False)
+        if not self.detailed and not getattr(settings, "HABITS_METRICS", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        if not self.detailed:
+            return self._finish(request, self.get_response(request), metrics)
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        if not self.detailed:
+            response = await self.get_response(request)
+            return self._finish(request, response, metrics)
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.detailed:
+            return None
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+        return None
+
+    def _finish(self, request, response, metrics: RequestMetrics):
+        now = time.perf_counter()
+        total = now - metrics.started
+        view = now - metrics.view_started if metrics.view_started else None
+        REQUEST_LATENCY.observe(
+            total, view=_view_name(request) or "unmatched", method=request.method
+        )
+        if not self.detailed:
+            return response
+        if _wants_server_timing(request):
+            response.headers["Server-Timing"] = server_timing(metrics, total, view)
+        if not request_log.isEnabledFor(logging.INFO):
+            return response
+
+        record = {
+            "ts": timezone.now().isoformat(),
+            "method": request.method,
+            "path": request.path,
+            "view": _view_name(request),
+            "status": response.status_code,
+            "user_id": _user_id(request),
+            "queries": metrics.queries,
+            "duplicates": metrics.duplicates,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            "view_ms": round(view * 1000, 2) if view is not None else None,
+            "total_ms": round(total * 1000, 2),
+        }
+        if metrics.duplicates:
+            record["duplicate_sql"] = metrics.top_duplicates()
+        try:
+            request_log.info(json.dumps(record, ensure_ascii=False))
+        except OSError:
+            pass  # plný disk / nedostupný soubor nesmí shodit odpověď
+        return response
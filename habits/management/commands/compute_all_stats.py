@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import as_completed
+from datetime import date
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.stats import compute_user_stats, parse_windows
+from habits.workers import process_pool
+
+
+def _compute_chunk(user_ids: list[int], start_date: date, windows: tuple[int, ...]):
+    """Statistiky pro dávku uživatelů -> seznam JSON-serializovatelných řádků."""
+    users = get_user_model().objects.filter(id__in=user_ids).order_by("id")
+    return [
+        {
+            "user_id": u.id,
+            "start_date": start_date.isoformat(),
+            "habits": compute_user_stats(u, start_date=start_date, windows=windows),
+        }
+        for u in users
+    ]
+
+
+def _done_user_ids(path: Path, start_date: date) -> set[int]:
+    """
+    Uživatelé už zapsaní v souboru (pro stejné datum). Neúplný poslední řádek
+    po přerušení se odřízne, aby se na něj dalo bezpečně navázat.
+    """
+    if not path.exists():
+        return set()
+    raw = path.read_bytes()
+    if raw and not raw.endswith(b"\n"):
+        raw = raw[: raw.rfind(b"\n") + 1]
+        path.write_bytes(raw)
+
+    done = set()
+    for line in raw.decode("utf-8").splitlines():
+        try:
+            row = json.loads(line)
+        except ValueError:
+            continue
+        if row.get("start_date") == start_date.isoformat():
+            done.add(row["user_id"])
+    return done
+
+
+class Command(BaseCommand):
+    help = (
+        "Spočítá statistiky všech uživatelů paralelně a zapíše je do JSONL.\n"
+        "Příklad: manage.py compute_all_stats --output stats.jsonl --workers 4\n"
+        "Po přerušení stačí spustit znovu – hotoví uživatelé se přeskočí."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default="stats_snapshot.jsonl", help="Cílový JSONL soubor"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Počet procesů (1 = bez poolu, v aktuálním procesu)",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=200, help="Uživatelů na jednu dávku"
+        )
+        parser.add_argument(
+            "--date", default=None, help="start_date (YYYY-MM-DD), výchozí dnes"
+        )
+        parser.add_argument(
+            "--windows", default=None, help="Okna úspěšnosti, např. 7,30,90"
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignorovat existující výstup a začít znovu",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            start_date = (
+                date.fromisoformat(opts["date"]) if opts["date"] else date.today()
+            )
+            windows = parse_windows(opts["windows"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        workers = max(1, int(opts["workers"]))
+        chunk_size = max(1, int(opts["chunk_size"]))
+        path = Path(opts["output"])
+
+        if opts["restart"] and path.exists():
+            path.unlink()
+        done = _done_user_ids(path, start_date)
+
+        all_ids = list(
+            get_user_model().objects.order_by("id").values_list("id", flat=True)
+        )
+        todo = [uid for uid in all_ids if uid not in done]
+        chunks = [todo[i : i + chunk_size] for i in range(0, len(todo), chunk_size)]
+        self.stdout.write(
+            f"Uživatelů: {len(all_ids)}, hotovo dříve: {len(done)}, "
+            f"zbývá: {len(todo)} v {len(chunks)} dávkách, workerů: {workers}"
+        )
+
+        started = time.perf_counter()
+        processed = 0
+        with path.open("a", encoding="utf-8") as out:
+
+            def _write(rows):
+                nonlocal processed
+                for row in rows:
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                out.flush()
+                processed += len(rows)
+                elapsed = time.perf_counter() - started
+                rate = processed / elapsed if elapsed else 0.0
+                self.stdout.write(
+                    f"  {processed}/{len(todo)} uživatelů ({rate:.1f} uživ./s)"
+                )
+
+            if workers == 1:
+                for chunk in chunks:
+                    _write(_compute_chunk(chunk, start_date, windows))
+            else:
+                with process_pool(workers) as pool:
+                    futures = [
+                        pool.submit(_compute_chunk, chunk, start_date, windows)
+                        for chunk in chunks
+                    ]
+                    for fut in as_completed(futures):
+                        _write(fut.result())
+
+        elapsed = time.perf_counter() - started
+        rate = processed / elapsed if elapsed else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Hotovo: {processed} uživatelů za {elapsed:.2f} s "
+                f"({rate:.1f} uživ./s) -> {path}"
+            )
+        )
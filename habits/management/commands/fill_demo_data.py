@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import random
+import time
+from concurrent.futures import as_completed
 from datetime import date, timedelta
 
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from habits.models import Habit, HabitLog
+from habits.signals import sync_after_bulk
+from habits.synthetic import ChunkResult, ScaleSpec, generate_chunk
+from habits.workers import process_pool
 
 daily_names = [
     "Čtení",
@@ -31,7 +36,9 @@ class Command(BaseCommand):
     help = (
         "Vytvoří demo uživatele, návyky a logy.\n"
         "Příklad: manage.py fill_demo_data --user demo --habits 6 --days 60 --seed 42 --reset\n"
-        "Pozn.: pokud uživatel neexistuje, nastaví mu heslo 'demo12345'."
+        "Pozn.: pokud uživatel neexistuje, nastaví mu heslo 'demo12345'.\n"
+        "Škálovací režim (zátěžové testy): manage.py fill_demo_data --users 100000 "
+        "--habits-per-user 6 --days 365 --workers 4"
     )
 
     def add_arguments(self, parser):
@@ -45,8 +52,111 @@ class Command(BaseCommand):
             help="Před naplněním smaže existující návyky/logy daného uživatele",
         )
 
-    @transaction.atomic
+        scale = parser.add_argument_group("škálovací režim (--users)")
+        scale.add_argument(
+            "--users", type=int, default=None, help="Počet generovaných uživatelů"
+        )
+        scale.add_argument("--habits-per-user", type=int, default=6)
+        scale.add_argument(
+            "--prefix", default="load", help="Prefix uživatelských jmen (load0000001…)"
+        )
+        scale.add_argument(
+            "--weekly-share", type=float, default=0.5, help="Podíl týdenních návyků"
+        )
+        scale.add_argument(
+            "--daily-rate",
+            type=float,
+            default=0.6,
+            help="Pravděpodobnost záznamu za den u denního návyku",
+        )
+        scale.add_argument(
+            "--weekly-rate",
+            type=float,
+            default=0.35,
+            help="Pravděpodobnost záznamu za den u týdenního návyku",
+        )
+        scale.add_argument(
+            "--active-share",
+            type=float,
+            default=1.0,
+            help="Podíl uživatelů, kteří mají nějaké logy",
+        )
+        scale.add_argument(
+            "--chunk-users", type=int, default=500, help="Uživatelů na jednu dávku"
+        )
+        scale.add_argument(
+            "--batch-size", type=int, default=5000, help="Řádků na jeden bulk_create"
+        )
+        scale.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Počet procesů (u SQLite se zápisy stejně serializují)",
+        )
+
     def handle(self, *args, **opts):
+        if opts["users"] is not None:
+            return self._fill_scale(opts)
+        return self._fill_user(opts)
+
+    def _fill_scale(self, opts):
+        for knob in ("weekly_share", "daily_rate", "weekly_rate", "active_share"):
+            if not 0.0 <= opts[knob] <= 1.0:
+                raise CommandError(f"--{knob.replace('_', '-')} musí být v 0..1.")
+        spec = ScaleSpec(
+            users=max(0, int(opts["users"])),
+            habits_per_user=max(0, int(opts["habits_per_user"])),
+            days=max(1, int(opts["days"])),
+            seed=int(opts["seed"]),
+            prefix=opts["prefix"],
+            weekly_share=opts["weekly_share"],
+            daily_rate=opts["daily_rate"],
+            weekly_rate=opts["weekly_rate"],
+            active_share=opts["active_share"],
+            batch_size=max(1, int(opts["batch_size"])),
+        )
+        chunk = max(1, int(opts["chunk_users"]))
+        workers = max(1, int(opts["workers"]))
+        bounds = [(i, min(i + chunk, spec.users)) for i in range(0, spec.users, chunk)]
+        self.stdout.write(
+            f"Uživatelů: {spec.users} v {len(bounds)} dávkách, workerů: {workers}"
+        )
+
+        started = time.perf_counter()
+        total = ChunkResult()
+
+        def _report(part: ChunkResult):
+            total.add(part)
+            elapsed = time.perf_counter() - started
+            rate = total.rows / elapsed if elapsed else 0.0
+            self.stdout.write(
+                f"  {total.users + total.skipped}/{spec.users} uživatelů, "
+                f"{total.logs} logů ({rate:.0f} řádků/s)"
+            )
+
+        if workers == 1:
+            for lo, hi in bounds:
+                _report(generate_chunk(spec, lo, hi))
+        else:
+            with process_pool(workers) as pool:
+                futures = [
+                    pool.submit(generate_chunk, spec, lo, hi) for lo, hi in bounds
+                ]
+                for fut in as_completed(futures):
+                    _report(fut.result())
+
+        elapsed = time.perf_counter() - started
+        rate = total.rows / elapsed if elapsed else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Hotovo: {total.users} uživatelů ({total.skipped} už existovalo), "
+                f"{total.habits} návyků, {total.logs} logů za {elapsed:.2f} s "
+                f"({rate:.0f} řádků/s)"
+            )
+        )
+
+    @transaction.atomic
+    def _fill_user(self, opts):
         username: str = opts["user"]
         num_habits: int = max(1, int(opts["habits"]))
         num_days: int = max(1, int(opts["days"]))
@@ -118,11 +228,11 @@ class Command(BaseCommand):
                     if (today - d).days <= 10:
                         p = 0.8
                     if rng.random() < p:
-                        to_create.append(HabitLog(habit=h, date=d, value=1))
+                        to_create.append(HabitLog(habit=h, user=user, date=d, value=1))
                         created_any = True
                 # jistota alespoň jednoho záznamu
                 if not created_any:
-                    to_create.append(HabitLog(habit=h, date=today, value=1))
+                    to_create.append(HabitLog(habit=h, user=user, date=today, value=1))
             else:
                 # týdenní: menší šance, ale v posledních 10 dnech častěji
                 for d in (start_date + timedelta(i) for i in range(num_days)):
@@ -130,7 +240,7 @@ class Command(BaseCommand):
                     if (today - d).days <= 10:
                         p = 0.55
                     if rng.random() < p:
-                        to_create.append(HabitLog(habit=h, date=d, value=1))
+                        to_create.append(HabitLog(habit=h, user=user, date=d, value=1))
 
         # -- pojistka unikátnosti (habit, date) v bufferu --
         seen: set[tuple[int, date]] = set()
@@ -142,9 +252,11 @@ class Command(BaseCommand):
                 unique_logs.append(log)
 
         HabitLog.objects.bulk_create(unique_logs, batch_size=1000)
+        # bulk_create nevolá signály -> dopočítat odvozená data
+        sync_after_bulk(h.id for h in habits)
 
         # -- shrnutí pro konzoli --
-        total_logs = HabitLog.objects.filter(habit__user=user).count()
+        total_logs = HabitLog.objects.filter(user=user).count()
         weekly_list = [h for h in habits if h.periodicity == Habit.Periodicity.WEEKLY]
         daily_list = [h for h in habits if h.periodicity == Habit.Periodicity.DAILY]
         self.stdout.write(
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.importer import DEFAULT_BATCH_SIZE, import_logs_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "Naimportuje logy z CSV ve formátu exportu (habit_id,habit_name,date,value).\n"
+        "Příklad: manage.py import_logs logs.csv --user demo --batch-size 5000"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Cesta k CSV souboru")
+        parser.add_argument("--user", required=True, help="Cílový uživatel")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Řádků na jeden bulk_create",
+        )
+        parser.add_argument(
+            "--no-create",
+            action="store_true",
+            help="Nezakládat chybějící návyky (řádky označit jako nevalidní)",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            user = get_user_model().objects.get(username=opts["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Uživatel '{opts['user']}' neexistuje.")
+
+        try:
+            with open(opts["path"], encoding="utf-8-sig", newline="") as fh:
+                result = import_logs_csv(
+                    user,
+                    fh,
+                    batch_size=max(1, int(opts["batch_size"])),
+                    create_missing=not opts["no_create"],
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for err in result.errors:
+            self.stderr.write(err)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Hotovo: {result.rows} řádků, {result.created} nových, "
+                f"{result.duplicates} duplicit, {result.invalid} nevalidních, "
+                f"{result.habits_created} nových návyků; "
+                f"{result.elapsed:.2f} s ({result.rows_per_sec:.0f} řádků/s)"
+            )
+        )
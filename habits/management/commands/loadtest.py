@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import secrets
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.models import Habit
+
+DEFAULT_PATHS = ["/api/stats/", "/today/", "/api/logs/"]
+DEFAULT_WRITE_PATH = "/today/toggle/{habit_id}/"
+
+
+def _session_cookie(user) -> str:
+    """Přihlášená session pro uživatele (server musí sdílet DB)."""
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _summary(results: list[tuple[float, int]]) -> dict:
+    latencies = [lat * 1000 for lat, status in results if status == 200]
+    return {
+        "requests": len(results),
+        "ok": len(latencies),
+        "errors": len(results) - len(latencies),
+        "p50_ms": round(_percentile(latencies, 50), 1),
+        "p95_ms": round(_percentile(latencies, 95), 1),
+        "p99_ms": round(_percentile(latencies, 99), 1),
+        "mean_ms": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+    }
+
+
+def _is_write(i: int, share: float) -> bool:
+    """Zápisy rovnoměrně rozprostřené mezi čtení (podíl `share`)."""
+    return int((i + 1) * share) > int(i * share)
+
+
+class Command(BaseCommand):
+    help = (
+        "Zátěžový test běžícího serveru (WSGI i ASGI) – souběžné GET požadavky.\n"
+        "Příklad: manage.py loadtest --base-url http://127.0.0.1:8000 "
+        "--user demo --path /api/stats/ --path /today/ --concurrency 50\n"
+        "Se --write-share 0.3 je 30 % požadavků POST (výchozí toggle dnešního "
+        "logu přes habity uživatele)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--user", required=True, help="Přihlášený uživatel")
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Cesta (lze opakovat, střídají se); výchozí stats, today, logs",
+        )
+        parser.add_argument(
+            "--post",
+            action="append",
+            dest="write_paths",
+            help="POST cesta pro zápisy (lze opakovat); {habit_id} = habity uživatele",
+        )
+        parser.add_argument(
+            "--write-share",
+            type=float,
+            default=0.0,
+            help="Podíl zápisů 0..1 (výchozí 0 = jen čtení)",
+        )
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--json", action="store_true", help="Výstup jako JSON")
+
+    def handle(self, *args, **opts):
+        try:
+            user = get_user_model().objects.get(username=opts["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Uživatel '{opts['user']}' neexistuje.")
+
+        paths = opts["paths"] or DEFAULT_PATHS
+        share = opts["write_share"]
+        if not 0 <= share <= 1:
+            raise CommandError("--write-share musí být v rozsahu 0..1.")
+        write_paths = []
+        if share:
+            habit_ids = list(
+                Habit.objects.filter(user=user)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            for template in opts["write_paths"] or [DEFAULT_WRITE_PATH]:
+                if "{habit_id}" not in template:
+                    write_paths.append(template)
+                    continue
+                if not habit_ids:
+                    raise CommandError(f"Uživatel '{user}' nemá žádné habity.")
+                write_paths += [template.format(habit_id=h) for h in habit_ids]
+
+        base = opts["base_url"].rstrip("/")
+        # CSRF: stejný (nemaskovaný) token v cookie i hlavičce
+        csrf = secrets.token_hex(16)
+        headers = {
+            "Cookie": f"{_session_cookie(user)}; {settings.CSRF_COOKIE_NAME}={csrf}",
+        }
+        write_headers = {**headers, "X-CSRFToken": csrf, "HX-Request": "true"}
+        total = max(1, opts["requests"])
+
+        def _one(i: int) -> tuple[float, int]:
+            if write_paths and _is_write(i, share):
+                req = urllib.request.Request(
+                    base + write_paths[i % len(write_paths)],
+                    data=b"",
+                    headers=write_headers,
+                    method="POST",
+                )
+            else:
+                req = urllib.request.Request(
+                    base + paths[i % len(paths)], headers=headers
+                )
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(req, timeout=opts["timeout"]) as res:
+                    res.read()
+                    status = res.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            except (urllib.error.URLError, OSError):
+                status = 0
+            return time.perf_counter() - started, status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, opts["concurrency"])) as pool:
+            results = list(pool.map(_one, range(total)))
+        elapsed = time.perf_counter() - started
+
+        report = {
+            **_summary(results),
+            "concurrency": opts["concurrency"],
+            "elapsed_s": round(elapsed, 3),
+            "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        }
+        if write_paths:
+            kinds = [_is_write(i, share) for i in range(total)]
+            report["reads"] = _summary([r for r, w in zip(results, kinds) if not w])
+            report["writes"] = _summary([r for r, w in zip(results, kinds) if w])
+        if opts["json"]:
+            self.stdout.write(json.dumps(report))
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['ok']}/{total} OK za {report['elapsed_s']} s "
+                f"({report['rps']} req/s), latence p50 {report['p50_ms']} ms, "
+                f"p95 {report['p95_ms']} ms, p99 {report['p99_ms']} ms"
+            )
+        )
+        for kind in ("reads", "writes"):
+            if kind in report:
+                part = report[kind]
+                self.stdout.write(
+                    f"  {kind}: {part['ok']}/{part['requests']} OK, "
+                    f"p50 {part['p50_ms']} ms, p99 {part['p99_ms']} ms"
+                )
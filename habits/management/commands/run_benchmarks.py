@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.benchmarks import compare, run_benchmarks
+from habits.benchmarks.cases import CASES
+from habits.benchmarks.datasets import (
+    DEFAULT_SIZES,
+    benchmark_database,
+    parse_sizes,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Změří stats, streak, dnešní přehled, toggle, CSV export a /api/logs/\n"
+        "nad datasety HABITYxROKY a zapíše JSON; s --baseline selže při regresi.\n"
+        "Běží nad samostatnou DB (SQLite: benchmark.sqlite3), ne nad db.sqlite3.\n"
+        "Příklad: manage.py run_benchmarks --sizes 10x1,100x5 "
+        "--output bench.json --baseline benchmarks/baseline.json"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default=DEFAULT_SIZES, help="Datasety, např. 10x1,100x5,1000x20"
+        )
+        parser.add_argument(
+            "--cases",
+            default=None,
+            help=f"Čárkou oddělené případy (výchozí vše: {', '.join(CASES)})",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--output", default="benchmark.json")
+        parser.add_argument(
+            "--baseline", default=None, help="JSON z dřívějšího běhu k porovnání"
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Povolené zhoršení času/paměti (0.25 = 25 %%)",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Zachovat benchmarkovou DB s datasety pro další běh",
+        )
+        parser.add_argument(
+            "--current-db",
+            action="store_true",
+            help="Měřit nad právě nastavenou DB (jen pro již izolovanou DB, "
+            "např. v testech) – datasety a toggle do ní zapisují",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            sizes = parse_sizes(opts["sizes"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        cases = None
+        if opts["cases"]:
+            cases = [c.strip() for c in opts["cases"].split(",") if c.strip()]
+            unknown = set(cases) - set(CASES)
+            if unknown:
+                raise CommandError(f"Neznámé případy: {', '.join(sorted(unknown))}")
+
+        baseline = None
+        if opts["baseline"]:
+            try:
+                baseline = json.loads(Path(opts["baseline"]).read_text("utf-8"))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Nelze načíst baseline: {exc}")
+
+        def _progress(r):
+            self.stdout.write(
+                f"  {r.key:<40} {r.wall_ms_median:>10.2f} ms  "
+                f"{r.queries:>4} dotazů  {r.peak_kib:>10.0f} KiB"
+            )
+
+        if opts["current_db"]:
+            report = run_benchmarks(
+                sizes, cases=cases, repeat=opts["repeat"], progress=_progress
+            )
+        else:
+            with benchmark_database(keepdb=opts["keepdb"]) as name:
+                self.stdout.write(f"Benchmarková DB: {name}")
+                report = run_benchmarks(
+                    sizes, cases=cases, repeat=opts["repeat"], progress=_progress
+                )
+        Path(opts["output"]).write_text(
+            json.dumps(report, indent=2, ensure_ascii=False) + "\n", "utf-8"
+        )
+        self.stdout.write(f"Výsledky -> {opts['output']}")
+
+        if baseline is not None:
+            problems = compare(report, baseline, tolerance=opts["tolerance"])
+            if problems:
+                raise CommandError("Regrese výkonu:\n  " + "\n  ".join(problems))
+            self.stdout.write(self.style.SUCCESS("Bez regresí proti baseline."))
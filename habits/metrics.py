@@ -0,0 +1,314 @@
+"""
+Provozní metriky v procesu a endpoint `/metrics` (Prometheus text format).
+
+Sleduje se latence požadavků podle názvu URL (plní
+`instrumentation.RequestInstrumentationMiddleware`), doba a počet habitů
+u `compute_user_stats`, hit/miss cache statistik a seznamu habitů,
+zápisy logů (v Prometheu `rate(habits_log_writes_total[1m])`) a bajty
+CSV exportu.
+
+Hodnoty drží `Registry` v paměti pod zámkem. Pro více worker procesů se
+nastaví `HABITS_METRICS_DIR`: každý proces do něj nejvýš jednou za
+`HABITS_METRICS_FLUSH_INTERVAL` s zapíše svůj snapshot (JSON, atomicky přes
+rename) a `/metrics` sečte soubory všech procesů. Soubory skončených procesů
+zůstávají (čítače nesmí klesat); adresář se maže při nasazení.
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HABITS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+DEFAULT_FLUSH_INTERVAL = 1.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry: "Registry", name: str, help_text: str, labels=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labels)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self.registry._inc(self, self._key(labels), amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        self.registry._observe(self, self._key(labels), value)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+class Registry:
+    def __init__(self, directory: str | Path | None = None):
+        self._directory = directory
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._reset_process()
+
+    def _reset_process(self) -> None:
+        # hodnoty + identita souboru patří jen tomuto procesu (i po fork())
+        self._pid = os.getpid()
+        self._file = f"{self._pid}-{uuid.uuid4().hex[:8]}.json"
+        self._counters: dict[tuple, float] = {}
+        self._histograms: dict[tuple, list] = {}
+        self._last_flush = 0.0
+
+    def _check_fork(self) -> None:
+        if os.getpid() != self._pid:
+            self._reset_process()
+
+    # ---- definice ----
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        return self._register(Counter(self, name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self, name, help_text, labels, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metrika {metric.name} už existuje.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    # ---- zápis ----
+
+    def _inc(self, metric: Counter, key: tuple, amount: float) -> None:
+        with self._lock:
+            self._check_fork()
+            full = (metric.name, key)
+            self._counters[full] = self._counters.get(full, 0) + amount
+        self._maybe_flush()
+
+    def _observe(self, metric: Histogram, key: tuple, value: float) -> None:
+        with self._lock:
+            self._check_fork()
+            full = (metric.name, key)
+            row = self._histograms.get(full)
+            if row is None:
+                # počty po bucketech (necumulativně) + +Inf, pak sum a count
+                row = self._histograms[full] = [0] * (len(metric.buckets) + 1) + [0, 0]
+            row[bisect.bisect_left(metric.buckets, value)] += 1
+            row[-2] += value
+            row[-1] += 1
+        self._maybe_flush()
+
+    # ---- sdílené úložiště ----
+
+    def directory(self) -> Path | None:
+        directory = self._directory or getattr(settings, "HABITS_METRICS_DIR", None)
+        return Path(directory) if directory else None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._check_fork()
+            return {
+                "counters": [[n, list(k), v] for (n, k), v in self._counters.items()],
+                "histograms": [
+                    [n, list(k), list(row)] for (n, k), row in self._histograms.items()
+                ],
+            }
+
+    def _maybe_flush(self) -> None:
+        if self.directory() is None:
+            return
+        interval = getattr(
+            settings, "HABITS_METRICS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL
+        )
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self) -> None:
+        directory = self.directory()
+        if directory is None:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return  # zapisuje jiné vlákno
+        try:
+            data = self.snapshot()
+            self._last_flush = time.monotonic()
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp = directory / f".{self._file}.tmp"
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, directory / self._file)
+        finally:
+            self._flush_lock.release()
+
+    def collect(self) -> dict:
+        """Součet hodnot tohoto procesu (živé) a ostatních procesů (soubory)."""
+        snapshots = [self.snapshot()]
+        directory = self.directory()
+        if directory is not None and directory.is_dir():
+            for path in directory.glob("*.json"):
+                if path.name == self._file:
+                    continue
+                try:
+                    snapshots.append(json.loads(path.read_text(encoding="utf-8")))
+                except (OSError, ValueError):
+                    continue  # právě přepisovaný nebo poškozený soubor
+
+        counters: dict[tuple, float] = {}
+        histograms: dict[tuple, list] = {}
+        for snap in snapshots:
+            for name, key, value in snap.get("counters", ()):
+                full = (name, tuple(key))
+                counters[full] = counters.get(full, 0) + value
+            for name, key, row in snap.get("histograms", ()):
+                full = (name, tuple(key))
+                if full in histograms:
+                    histograms[full] = [a + b for a, b in zip(histograms[full], row)]
+                else:
+                    histograms[full] = list(row)
+        return {"counters": counters, "histograms": histograms}
+
+    # ---- výstup ----
+
+    def render(self, collected: dict | None = None) -> str:
+        collected = collected or self.collect()
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if metric.kind == "counter":
+                for (name, key), value in sorted(collected["counters"].items()):
+                    if name == metric.name:
+                        labels = _labels(metric.labelnames, key)
+                        lines.append(f"{name}{labels} {_num(value)}")
+                continue
+            for (name, key), row in sorted(collected["histograms"].items()):
+                if name != metric.name:
+                    continue
+                cumulative = 0
+                for le, count in zip((*metric.buckets, "+Inf"), row[:-2]):
+                    cumulative += count
+                    labels = _labels((*metric.labelnames, "le"), (*key, _num(le)))
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                labels = _labels(metric.labelnames, key)
+                lines.append(f"{name}_sum{labels} {_num(row[-2])}")
+                lines.append(f"{name}_count{labels} {row[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset_process()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    inner = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + inner + "}"
+
+
+def _num(value) -> str:
+    if isinstance(value, str):
+        return value
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+REQUEST_LATENCY = registry.histogram(
+    "habits_request_duration_seconds",
+    "Doba zpracování požadavku podle názvu URL.",
+    labels=("view", "method"),
+)
+STATS_DURATION = registry.histogram(
+    "habits_compute_user_stats_seconds", "Doba výpočtu compute_user_stats."
+)
+STATS_HABITS = registry.histogram(
+    "habits_compute_user_stats_habits",
+    "Počet habitů na jedno volání compute_user_stats.",
+    buckets=HABITS_BUCKETS,
+)
+CACHE_REQUESTS = registry.counter(
+    "habits_cache_requests_total",
+    "Čtení z cache (stats = statistiky, habits = seznam habitů).",
+    labels=("cache", "result"),
+)
+LOG_WRITES = registry.counter(
+    "habits_log_writes_total", "Zápisy HabitLog.", labels=("op",)
+)
+CSV_EXPORT_BYTES = registry.counter(
+    "habits_csv_export_bytes_total", "Odeslané bajty CSV exportu."
+)
+
+
+def observe_stats(habits: int, seconds: float) -> None:
+    STATS_DURATION.observe(seconds)
+    STATS_HABITS.observe(habits)
+
+
+def cache_hit_ratio_lines(collected: dict) -> list[str]:
+    """Odvozený gauge hit ratio pro každou cache (ze součtů čítačů)."""
+    totals: dict[str, list[float]] = {}
+    for (name, key), value in collected["counters"].items():
+        if name != CACHE_REQUESTS.name:
+            continue
+        cache, result = key
+        row = totals.setdefault(cache, [0, 0])
+        row[0 if result == "hit" else 1] += value
+    name = "habits_cache_hit_ratio"
+    lines = [
+        f"# HELP {name} Podíl zásahů cache od startu.",
+        f"# TYPE {name} gauge",
+    ]
+    for cache, (hits, misses) in sorted(totals.items()):
+        ratio = hits / (hits + misses) if hits + misses else 0.0
+        lines.append(f"{name}{_labels(('cache',), (cache,))} {_num(ratio)}")
+    return lines
+
+
+def metrics_view(request):
+    if not getattr(settings, "HABITS_METRICS", True):
+        raise Http404
+    allowed = getattr(settings, "HABITS_METRICS_ALLOWED_IPS", None)
+    if allowed is not None and request.META.get("REMOTE_ADDR") not in allowed:
+        return HttpResponseForbidden()
+    collected = registry.collect()
+    body = registry.render(collected) + "\n".join(cache_hit_ratio_lines(collected))
+    return HttpResponse(body + "\n", content_type=CONTENT_TYPE)
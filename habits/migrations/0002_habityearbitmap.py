@@ -0,0 +1,94 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:02
+
+import django.db.models.deletion
+from collections import defaultdict
+from datetime import date
+
+from django.db import migrations, models
+
+# Zmrazená kopie kodeku z habits.bitmaps v podobě, jakou měl při vzniku
+# této migrace: DAILY 1 bit/den, WEEKLY 1 bajt/den saturovaný na 255.
+DAYS_PER_YEAR = 366
+MAX_COUNT = 255
+
+
+def encode(kind, pairs):
+    by_year = {}
+    for d, v in pairs:
+        buf = by_year.get(d.year)
+        if buf is None:
+            size = DAYS_PER_YEAR if kind == "weekly" else (DAYS_PER_YEAR + 7) // 8
+            buf = by_year[d.year] = bytearray(size)
+        idx = (d - date(d.year, 1, 1)).days
+        if kind == "weekly":
+            buf[idx] = max(0, min(int(v), MAX_COUNT))
+        elif v:
+            buf[idx >> 3] |= 1 << (idx & 7)
+    return {year: bytes(buf) for year, buf in by_year.items()}
+
+
+def backfill_bitmaps(apps, schema_editor):
+    Habit = apps.get_model("habits", "Habit")
+    HabitLog = apps.get_model("habits", "HabitLog")
+    HabitYearBitmap = apps.get_model("habits", "HabitYearBitmap")
+
+    pairs_by_habit = defaultdict(list)
+    for hid, d, v in HabitLog.objects.values_list("habit_id", "date", "value"):
+        pairs_by_habit[hid].append((d, v))
+
+    rows = [
+        HabitYearBitmap(habit_id=hid, year=year, kind=kind, data=data)
+        for hid, kind in Habit.objects.values_list("id", "periodicity")
+        for year, data in encode(kind, pairs_by_habit.get(hid, [])).items()
+    ]
+    HabitYearBitmap.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HabitYearBitmap",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("daily", "Denně"), ("weekly", "Týdně")], max_length=10
+                    ),
+                ),
+                ("data", models.BinaryField()),
+                (
+                    "habit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bitmaps",
+                        to="habits.habit",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["habit_id", "year"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="habityearbitmap",
+            constraint=models.UniqueConstraint(
+                fields=("habit", "year"), name="unique_bitmap_per_year"
+            ),
+        ),
+        migrations.RunPython(backfill_bitmaps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.0.7 on 2026-10-18 05:03
+
+import django.db.models.deletion
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def runs_from_dates(dates):
+    """Zmrazená kopie habits.runs.runs_from_dates z doby vzniku migrace."""
+    out = []
+    for d in sorted(set(dates)):
+        if out and out[-1][1] + timedelta(days=1) == d:
+            out[-1] = (out[-1][0], d)
+        else:
+            out.append((d, d))
+    return out
+
+
+def backfill_runs(apps, schema_editor):
+    HabitLog = apps.get_model("habits", "HabitLog")
+    HabitRun = apps.get_model("habits", "HabitRun")
+
+    dates_by_habit = defaultdict(list)
+    for hid, d in HabitLog.objects.values_list("habit_id", "date"):
+        dates_by_habit[hid].append(d)
+
+    rows = [
+        HabitRun(habit_id=hid, start=start, end=end)
+        for hid, dates in dates_by_habit.items()
+        for start, end in runs_from_dates(dates)
+    ]
+    HabitRun.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0002_habityearbitmap"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HabitRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start", models.DateField()),
+                ("end", models.DateField()),
+                (
+                    "habit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="runs",
+                        to="habits.habit",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["habit_id", "start"],
+                "indexes": [
+                    models.Index(fields=["habit", "end"], name="habitrun_habit_end")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="habitrun",
+            constraint=models.UniqueConstraint(
+                fields=("habit", "start"), name="unique_run_start"
+            ),
+        ),
+        migrations.RunPython(backfill_runs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_user(apps, schema_editor):
+    Habit = apps.get_model("habits", "Habit")
+    HabitLog = apps.get_model("habits", "HabitLog")
+
+    owner = Habit.objects.filter(pk=models.OuterRef("habit_id")).values("user_id")[:1]
+    HabitLog.objects.update(user_id=models.Subquery(owner))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0003_habitrun"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="habitlog",
+            name="user",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="habit_logs",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(backfill_user, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="habitlog",
+            name="user",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="habit_logs",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habitlog",
+            index=models.Index(fields=["user", "date"], name="habitlog_user_date"),
+        ),
+        migrations.AddIndex(
+            model_name="habitlog",
+            index=models.Index(
+                fields=["habit", "date", "value"], name="habitlog_habit_date_value"
+            ),
+        ),
+    ]
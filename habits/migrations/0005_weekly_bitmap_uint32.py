@@ -0,0 +1,56 @@
+import struct
+from collections import defaultdict
+from datetime import date
+
+from django.db import migrations
+
+# Zmrazená kopie týdenního kodeku z habits.bitmaps: uint32 LE na den.
+DAYS_PER_YEAR = 366
+WEEKLY_BYTES = 4
+MAX_COUNT = 2**32 - 1
+
+
+def encode_weekly(pairs):
+    by_year = {}
+    for d, v in pairs:
+        buf = by_year.get(d.year)
+        if buf is None:
+            buf = by_year[d.year] = bytearray(DAYS_PER_YEAR * WEEKLY_BYTES)
+        idx = (d - date(d.year, 1, 1)).days
+        struct.pack_into("<I", buf, idx * WEEKLY_BYTES, max(0, min(int(v), MAX_COUNT)))
+    return {year: bytes(buf) for year, buf in by_year.items()}
+
+
+def rebuild_weekly_bitmaps(apps, schema_editor):
+    """Týdenní bitmapy z 1 bajtu/den (saturace 255) na uint32/den."""
+    Habit = apps.get_model("habits", "Habit")
+    HabitLog = apps.get_model("habits", "HabitLog")
+    HabitYearBitmap = apps.get_model("habits", "HabitYearBitmap")
+
+    weekly = list(
+        Habit.objects.filter(periodicity="weekly").values_list("id", flat=True)
+    )
+    pairs_by_habit = defaultdict(list)
+    for hid, d, v in HabitLog.objects.filter(habit_id__in=weekly).values_list(
+        "habit_id", "date", "value"
+    ):
+        pairs_by_habit[hid].append((d, v))
+
+    HabitYearBitmap.objects.filter(kind="weekly").delete()
+    rows = [
+        HabitYearBitmap(habit_id=hid, year=year, kind="weekly", data=data)
+        for hid in weekly
+        for year, data in encode_weekly(pairs_by_habit.get(hid, [])).items()
+    ]
+    HabitYearBitmap.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0004_habitlog_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_weekly_bitmaps, migrations.RunPython.noop),
+    ]
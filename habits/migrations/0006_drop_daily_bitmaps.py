@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def drop_daily_bitmaps(apps, schema_editor):
+    """Denní statistiky čtou řady (HabitRun); bitmapy zůstávají jen týdenním."""
+    HabitYearBitmap = apps.get_model("habits", "HabitYearBitmap")
+    HabitYearBitmap.objects.filter(kind="daily").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0005_weekly_bitmap_uint32"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_daily_bitmaps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 06:28
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0007_userdataversion"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="habityearbitmap",
+            name="kind",
+        ),
+    ]
@@ -26,16 +26,103 @@ class Habit(models.Model):
 
 class HabitLog(models.Model):
     habit = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name="logs")
+    # denormalizovaný vlastník (= habit.user) – dotazy per uživatel bez JOINu
+    # na Habit; plní se v save(), u bulk_create ho musí nastavit volající
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="habit_logs",
+        editable=False,
+    )
     date = models.DateField(db_index=True)
     value = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-date", "-id"]
+        indexes = [
+            models.Index(fields=["user", "date"], name="habitlog_user_date"),
+            # pokrývající index pro výpočty statistik (čte jen index)
+            models.Index(
+                fields=["habit", "date", "value"], name="habitlog_habit_date_value"
+            ),
+        ]
         constraints = [
             # omezení na max 1 log za den
             models.UniqueConstraint(fields=["habit", "date"], name="unique_log_per_day")
         ]
 
+    def save(self, *args, **kwargs):
+        if self.user_id is None or self.user_id != self.habit.user_id:
+            self.user_id = self.habit.user_id
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.habit.name} @ {self.date} (+{self.value})"
+
+
+class HabitYearBitmap(models.Model):
+    """
+    Odvozené úložné pole splnění týdenního habitu za jeden kalendářní rok:
+    4 bajty na den (součet value, uint32). Denní habity bitmapu nemají.
+    Udržuje se synchronně se zápisy HabitLog (viz habits.signals).
+    """
+
+    habit = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name="bitmaps")
+    year = models.PositiveSmallIntegerField()
+    data = models.BinaryField()
+
+    class Meta:
+        ordering = ["habit_id", "year"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["habit", "year"], name="unique_bitmap_per_year"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.habit_id} / {self.year}"
+
+
+class HabitRun(models.Model):
+    """
+    Maximální řada po sobě jdoucích dní se záznamem: interval [start, end].
+    Udržuje se inkrementálně při zápisu/smazání HabitLog (viz habits.runs).
+    """
+
+    habit = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name="runs")
+    start = models.DateField()
+    end = models.DateField()
+
+    class Meta:
+        ordering = ["habit_id", "start"]
+        indexes = [models.Index(fields=["habit", "end"], name="habitrun_habit_end")]
+        constraints = [
+            models.UniqueConstraint(fields=["habit", "start"], name="unique_run_start")
+        ]
+
+    @property
+    def length(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def __str__(self):
+        return f"{self.habit_id}: {self.start}..{self.end}"
+
+
+class UserDataVersion(models.Model):
+    """
+    Verze dat uživatele (ns od epochy): klíč cache statistik a základ ETagu.
+    Zvedá se v transakci každého zápisu Habit/HabitLog (viz habits.signals),
+    takže ji vidí všechny procesy bez ohledu na backend cache.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="+",
+    )
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.version}"
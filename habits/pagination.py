@@ -0,0 +1,128 @@
+"""
+Keyset (cursor) stránkování pro /api/logs/ na dvojici (date, id).
+
+Místo OFFSET se další stránka filtruje podmínkou
+`(date, id) < (poslední date, poslední id)` (resp. `>` pro vzestupné řazení),
+takže stránka N stojí stejně jako stránka 1. COUNT(*) se neprovádí, pokud si
+ho klient nevyžádá (?count=1).
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# ?ordering= -> (pole řazení, sestupně?)
+ORDERINGS = {
+    "date": ("date", False),
+    "-date": ("date", True),
+    "id": ("id", False),
+    "-id": ("id", True),
+}
+DEFAULT_ORDERING = "-date"
+
+
+class HabitLogKeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 200
+    page_size_query_param = "page_size"
+
+    def _page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def _encode(position: dict) -> str:
+        raw = json.dumps(position, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode(cursor: str) -> dict:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            position = json.loads(raw)
+            out = {"i": int(position["i"])}
+            if "d" in position:
+                out["d"] = date.fromisoformat(position["d"])
+            return out
+        except (ValueError, KeyError, TypeError):
+            raise NotFound("Neplatný kurzor.")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self._page_size(request)
+        ordering = request.query_params.get("ordering", DEFAULT_ORDERING)
+        field, desc = ORDERINGS.get(ordering, ORDERINGS[DEFAULT_ORDERING])
+        self.field = field
+
+        op = "lt" if desc else "gt"
+        if field == "date":
+            order_by = ("-date", "-id") if desc else ("date", "id")
+        else:
+            order_by = ("-id",) if desc else ("id",)
+
+        with_count = request.query_params.get("count", "").lower() in ("1", "true")
+        self.count = queryset.count() if with_count else None
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            pos = self._decode(cursor)
+            if field == "date":
+                if "d" not in pos:
+                    raise NotFound("Neplatný kurzor.")
+                queryset = queryset.filter(
+                    Q(**{f"date__{op}": pos["d"]})
+                    | Q(date=pos["d"], **{f"id__{op}": pos["i"]})
+                )
+            else:
+                queryset = queryset.filter(**{f"id__{op}": pos["i"]})
+
+        rows = list(queryset.order_by(*order_by)[: self.page_size_value + 1])
+        self.has_next = len(rows) > self.page_size_value
+        self.page = rows[: self.page_size_value]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = {"i": last.id}
+        if self.field == "date":
+            position["d"] = last.date.isoformat()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self._encode(position))
+
+    def get_first_link(self):
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        payload = {"next": self.get_next_link(), "first": self.get_first_link()}
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "first": {"type": "string", "format": "uri"},
+                "count": {"type": "integer"},
+                "results": schema,
+            },
+        }
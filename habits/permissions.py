@@ -15,5 +15,5 @@ class IsOwner(BasePermission):
         if isinstance(obj, Habit):
             return obj.user_id == request.user.id
         if isinstance(obj, HabitLog):
-            return obj.habit.user_id == request.user.id
+            return obj.user_id == request.user.id
         return False
@@ -0,0 +1,117 @@
+"""
+Prefixové součty pro úspěšnost v libovolném okně.
+
+Index se pro habit postaví jednou v O(dní) nad rozsahem [origin, end] a pak
+odpovídá na libovolné okno končící kdykoli v tomto rozsahu v O(1) – denní
+i týdenní varianta.
+Sémantika odpovídá `success_ratio_daily` / `success_ratio_weekly`.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Iterable
+
+ONE_DAY = timedelta(days=1)
+
+
+def _monday(d: date) -> date:
+    return d - timedelta(days=d.weekday())
+
+
+class PrefixIndex:
+    """
+    Kumulativní součty hodnot po dnech a splněných týdnů.
+
+    `days[i]` = součet value za dny origin .. origin+i-1,
+    `weeks[k]` = počet splněných týdnů mezi prvními k týdny od pondělí origin.
+    """
+
+    def __init__(
+        self,
+        pairs: Iterable[tuple[date, int]],
+        origin: date,
+        end: date,
+        target: int = 1,
+    ):
+        self.origin = _monday(origin)
+        self.end = end
+        self.target = target
+
+        n_days = (end - self.origin).days + 1
+        per_day = [0] * max(n_days, 0)
+        for d, v in pairs:
+            if self.origin <= d <= end:
+                per_day[(d - self.origin).days] += int(v)
+        self.days = [0, *accumulate(per_day)]
+
+        week_ok = [
+            int(sum(per_day[i : i + 7]) >= target) for i in range(0, len(per_day), 7)
+        ]
+        self.weeks = [0, *accumulate(week_ok)]
+
+    @classmethod
+    def from_runs(cls, runs: Iterable[tuple[date, date]], origin: date, end: date):
+        """Index pro denní habit z řad (HabitRun) – každý den v řadě = 1."""
+
+        def _days():
+            for start, stop in runs:
+                d = max(start, _monday(origin))
+                while d <= min(stop, end):
+                    yield d, 1
+                    d += ONE_DAY
+
+        return cls(_days(), origin, end)
+
+    def _day_idx(self, d: date) -> int:
+        return min(max((d - self.origin).days, 0), len(self.days) - 1)
+
+    def total(self, lo: date, hi: date) -> int:
+        """Součet value za dny lo..hi (včetně), ořezáno na rozsah indexu."""
+        if hi < lo:
+            return 0
+        return self.days[self._day_idx(hi + ONE_DAY)] - self.days[self._day_idx(lo)]
+
+    def daily_ratio(self, days: int, end: date | None = None) -> float:
+        """Podíl dní se záznamem v okně `days` dní končícím `end` (výchozí konec)."""
+        end = end or self.end
+        lo = end - timedelta(days=days - 1)
+        return self.total(lo, end) / float(days)
+
+    def _week_ok_count(self, first: date, last: date) -> int:
+        """Počet splněných celých týdnů s pondělím v first..last."""
+        if last < first:
+            return 0
+        k_first = (first - self.origin).days // 7
+        k_last = (last - self.origin).days // 7
+        # týdny před origin nemají žádná data
+        outside = max(0, -k_first) - max(0, -k_last - 1)
+        inside = self.weeks[max(k_last + 1, 0)] - self.weeks[max(k_first, 0)]
+        return inside + outside * int(0 >= self.target)
+
+    def weekly_ratio(self, days: int, end: date | None = None) -> float:
+        """
+        Podíl týdnů v okně, které splnily target; pro okno < 14 dní se hodnotí
+        jen aktuální týden. Do součtu týdne se počítají jen dny uvnitř okna
+        (a nejpozději `end`, výchozí konec indexu).
+        """
+        end = end or self.end
+        lo = end - timedelta(days=days - 1)
+        cur_week = _monday(end)
+        # aktuální týden je rozpracovaný -> součet jen do end
+        cur_ok = int(self.total(max(lo, cur_week), end) >= self.target)
+
+        if days < 14:
+            return float(cur_ok)
+
+        first_week = _monday(lo)
+        n_weeks = (cur_week - first_week).days // 7 + 1
+        achieved = cur_ok
+        if first_week < lo:
+            # první týden zasahuje před okno -> součet jen od lo
+            partial = self.total(lo, first_week + timedelta(days=6))
+            achieved += int(partial >= self.target)
+            first_week += timedelta(days=7)
+        achieved += self._week_ok_count(first_week, cur_week - timedelta(days=7))
+        return achieved / float(n_weeks)
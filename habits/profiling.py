@@ -0,0 +1,196 @@
+"""
+Profilování jednoho požadavku na vyžádání (cProfile).
+
+Zapíná se nastavením `HABITS_PROFILING`; samotný požadavek pak musí poslat
+přihlášený staff uživatel s `?profile=1` nebo hlavičkou `X-Profile: 1`.
+Profil se uloží jako `.prof` do `HABITS_PROFILE_DIR` (pstats / snakeviz)
+a do `index.json` vedle něj se zapíše souhrn. Index drží jen
+`HABITS_PROFILE_KEEP` nejpomalejších požadavků; profily, které z něj
+vypadnou, se smažou.
+
+Souhrn obsahuje nejdražší funkce z balíčku `habits` (kumulativní čas),
+takže je hned vidět, zda dominuje stats.py, services.py nebo DB vrstva.
+
+Profiler je v procesu jen jeden (cProfile), souběžný profilovaný požadavek
+proto proběhne bez profilu a dostane `X-Profile: busy`. Pod ASGI se měří
+jen práce ve vlákně event loopu.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+DEFAULT_KEEP = 20
+TOP_FUNCTIONS = 15
+QUERY_PARAM = "profile"
+HEADER = "X-Profile"
+INDEX_NAME = "index.json"
+
+_profile_lock = threading.Lock()
+_index_lock = threading.Lock()
+_PACKAGE_DIR = str(Path(__file__).resolve().parent)
+
+
+def profile_dir() -> Path:
+    return Path(getattr(settings, "HABITS_PROFILE_DIR", "profiles"))
+
+
+def _keep() -> int:
+    return int(getattr(settings, "HABITS_PROFILE_KEEP", DEFAULT_KEEP))
+
+
+def _requested(request) -> bool:
+    flag = request.GET.get(QUERY_PARAM) or request.headers.get(HEADER)
+    return flag in ("1", "true", "yes")
+
+
+def wants_profile(request) -> bool:
+    if not _requested(request):
+        return False
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def top_functions(profile: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> list:
+    """Nejdražší funkce z balíčku habits podle kumulativního času."""
+    stats = pstats.Stats(profile)
+    rows = []
+    for (filename, line, func), row in stats.stats.items():
+        if not filename.startswith(_PACKAGE_DIR):
+            continue
+        _cc, calls, tottime, cumtime, _callers = row
+        rows.append(
+            {
+                "function": f"{os.path.relpath(filename, _PACKAGE_DIR)}:{line}({func})",
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            }
+        )
+    rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+    return rows[:limit]
+
+
+def read_index(directory: Path | None = None) -> list[dict]:
+    path = (directory or profile_dir()) / INDEX_NAME
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return []
+
+
+def _update_index(directory: Path, entry: dict) -> bool:
+    """Zařadí profil do indexu; vrátí False, pokud mezi nejpomalejší nepatří."""
+    with _index_lock:
+        entries = read_index(directory) + [entry]
+        entries.sort(key=lambda e: e["elapsed_ms"], reverse=True)
+        kept, dropped = entries[: _keep()], entries[_keep() :]
+        tmp = directory / f"{INDEX_NAME}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(kept, ensure_ascii=False, indent=1), "utf-8")
+        os.replace(tmp, directory / INDEX_NAME)
+    for old in dropped:
+        (directory / old["file"]).unlink(missing_ok=True)
+    return entry in kept
+
+
+def _slug(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    name = match.view_name if match is not None else request.path
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "root"
+
+
+def save_profile(request, response, profile: cProfile.Profile, elapsed: float):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    ms = elapsed * 1000
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    name = f"{stamp}_{_slug(request)}_{ms:.0f}ms_{uuid.uuid4().hex[:8]}.prof"
+    profile.dump_stats(directory / name)
+    entry = {
+        "file": name,
+        "ts": timezone.now().isoformat(),
+        "method": request.method,
+        "path": request.get_full_path(),
+        "status": response.status_code,
+        "user_id": request.user.id,
+        "elapsed_ms": round(ms, 2),
+        "top": top_functions(profile),
+    }
+    response.headers[HEADER] = name if _update_index(directory, entry) else "dropped"
+    return entry
+
+
+class ProfilingMiddleware:
+    """Patří za AuthenticationMiddleware (potřebuje request.user)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "HABITS_PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not wants_profile(request):
+            return self.get_response(request)
+        if not _profile_lock.acquire(blocking=False):
+            response = self.get_response(request)
+            response.headers[HEADER] = "busy"
+            return response
+        try:
+            profile = cProfile.Profile()
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profile.disable()
+            elapsed = time.perf_counter() - started
+        finally:
+            _profile_lock.release()
+        save_profile(request, response, profile, elapsed)
+        return response
+
+    async def __acall__(self, request):
+        if not _requested(request):
+            return await self.get_response(request)
+        # lazy user nelze v async kontextu vyhodnotit synchronně
+        request.user = await request.auser()
+        if not wants_profile(request):
+            return await self.get_response(request)
+        if not _profile_lock.acquire(blocking=False):
+            response = await self.get_response(request)
+            response.headers[HEADER] = "busy"
+            return response
+        try:
+            profile = cProfile.Profile()
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profile.disable()
+            elapsed = time.perf_counter() - started
+        finally:
+            _profile_lock.release()
+        save_profile(request, response, profile, elapsed)
+        return response
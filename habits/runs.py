@@ -0,0 +1,169 @@
+"""
+Run-length reprezentace historie habitu (HabitRun).
+
+Každý habit má seřazené disjunktní intervaly [start, end] po sobě jdoucích
+dní se záznamem. Zápis/smazání logu je upraví lokálně (rozšíření, sloučení,
+rozdělení); aktuální a nejdelší denní streak se pak čte z intervalů místo
+průchodu celou historií.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable, Sequence
+
+from django.db import transaction
+
+from .models import HabitLog, HabitRun
+
+ONE_DAY = timedelta(days=1)
+
+Run = tuple[date, date]
+
+
+# ------- údržba při zápisu -------
+
+
+def add_day(habit_id: int, d: date) -> None:
+    """Přidá den `d`; případně prodlouží nebo sloučí sousední řady."""
+    with transaction.atomic():
+        runs = HabitRun.objects.select_for_update().filter(habit_id=habit_id)
+        left = runs.filter(start__lte=d, end__gte=d - ONE_DAY).first()
+        if left is not None and left.end >= d:
+            return  # den už je pokrytý
+        right = runs.filter(start=d + ONE_DAY).first()
+
+        if left is not None and right is not None:
+            left.end = right.end
+            right.delete()
+            left.save(update_fields=["end"])
+        elif left is not None:
+            left.end = d
+            left.save(update_fields=["end"])
+        elif right is not None:
+            right.start = d
+            right.save(update_fields=["start"])
+        else:
+            HabitRun.objects.create(habit_id=habit_id, start=d, end=d)
+
+
+def remove_day(habit_id: int, d: date) -> None:
+    """Odebere den `d`; řadu zkrátí nebo rozdělí na dvě."""
+    with transaction.atomic():
+        run = (
+            HabitRun.objects.select_for_update()
+            .filter(habit_id=habit_id, start__lte=d, end__gte=d)
+            .first()
+        )
+        if run is None:
+            return
+        if run.start == run.end:
+            run.delete()
+        elif d == run.start:
+            run.start = d + ONE_DAY
+            run.save(update_fields=["start"])
+        elif d == run.end:
+            run.end = d - ONE_DAY
+            run.save(update_fields=["end"])
+        else:
+            HabitRun.objects.create(habit_id=habit_id, start=d + ONE_DAY, end=run.end)
+            run.end = d - ONE_DAY
+            run.save(update_fields=["end"])
+
+
+def runs_from_dates(dates: Iterable[date]) -> list[Run]:
+    """Seřazené maximální řady z množiny dní."""
+    out: list[Run] = []
+    for d in sorted(set(dates)):
+        if out and out[-1][1] + ONE_DAY == d:
+            out[-1] = (out[-1][0], d)
+        else:
+            out.append((d, d))
+    return out
+
+
+def rebuild(habit_ids: Iterable[int]) -> None:
+    """Přepočítá řady zadaných habitů z HabitLog (po bulk operacích)."""
+    habit_ids = list(habit_ids)
+    if not habit_ids:
+        return
+    dates_by_habit = defaultdict(list)
+    for hid, d in HabitLog.objects.filter(habit_id__in=habit_ids).values_list(
+        "habit_id", "date"
+    ):
+        dates_by_habit[hid].append(d)
+
+    rows = [
+        HabitRun(habit_id=hid, start=start, end=end)
+        for hid, dates in dates_by_habit.items()
+        for start, end in runs_from_dates(dates)
+    ]
+    with transaction.atomic():
+        HabitRun.objects.filter(habit_id__in=habit_ids).delete()
+        HabitRun.objects.bulk_create(rows, batch_size=1000)
+
+
+# ------- čtení -------
+
+
+def load_user_runs(user, start_date: date) -> dict[int, list[Run]]:
+    """Řady všech habitů uživatele (start <= start_date) jedním dotazem."""
+    return runs_by_habit(user_run_rows(user, start_date))
+
+
+def user_run_rows(user, start_date: date):
+    """Queryset řádků (habit_id, start, end) pro `runs_by_habit`."""
+    return (
+        HabitRun.objects.filter(habit__user=user, start__lte=start_date)
+        .order_by("habit_id", "start")
+        .values_list("habit_id", "start", "end")
+    )
+
+
+def runs_by_habit(rows) -> dict[int, list[Run]]:
+    by_habit: dict[int, list[Run]] = defaultdict(list)
+    for hid, start, end in rows:
+        by_habit[hid].append((start, end))
+    return by_habit
+
+
+def current_streak(habit_id: int, start_date: date) -> int:
+    """Aktuální denní streak ke `start_date` – jeden indexovaný dotaz."""
+    run = (
+        HabitRun.objects.filter(habit_id=habit_id, end__gte=start_date)
+        .order_by("end")
+        .values_list("start", flat=True)
+        .first()
+    )
+    if run is None or run > start_date:
+        return 0
+    return (start_date - run).days + 1
+
+
+def daily_metrics(
+    runs: Sequence[Run], start_date: date, windows: Sequence[int] = (7, 30)
+) -> tuple[int, int, dict[int, float]]:
+    """
+    (aktuální streak, nejdelší streak, {okno: úspěšnost}) ze seřazených řad.
+    Odpovídá `calc_daily_streak`, `longest_daily_streak` a `success_ratio_daily`.
+    """
+    # jen řady začínající nejpozději start_date, konec oříznutý na start_date
+    runs = runs[: bisect_right(runs, (start_date, date.max))]
+    clipped = [(s, min(e, start_date)) for s, e in runs]
+
+    current = 0
+    if clipped and clipped[-1][1] == start_date:
+        current = (start_date - clipped[-1][0]).days + 1
+    longest = max(((e - s).days + 1 for s, e in clipped), default=0)
+
+    ends = [e for _, e in clipped]
+    ratios = {}
+    for n in windows:
+        lo = start_date - timedelta(days=n - 1)
+        hit = sum(
+            (e - max(s, lo)).days + 1 for s, e in clipped[bisect_left(ends, lo) :]
+        )
+        ratios[n] = hit / float(n)
+    return current, longest, ratios
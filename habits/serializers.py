@@ -54,4 +54,12 @@ class HabitLogCreateSerializer(serializers.ModelSerializer):
                 {"date": "Pro tento den už záznam existuje."}
             )
 
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class HabitLogBulkItemSerializer(serializers.Serializer):
+    """Jedna položka pro POST /api/logs/bulk/ – vlastnictví a duplicity řeší view."""
+
+    habit = serializers.IntegerField()
+    date = serializers.DateField()
+    value = serializers.IntegerField(min_value=1, default=1)
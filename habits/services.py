@@ -4,6 +4,7 @@ from collections import defaultdict
 from datetime import date, timedelta
 from typing import Iterable
 
+from . import bitmaps, runs, stats_numpy
 from .models import Habit
 
 
@@ -67,13 +68,14 @@ def get_current_streak(habit: Habit, start_date: date | None = None) -> int:
     if start_date is None:
         start_date = date.today()
 
-    queryset = habit.logs.filter(date__lte=start_date)
-
     # Periodicita Weekly
     if habit.periodicity == Habit.Periodicity.WEEKLY:
-        pairs = queryset.values_list("date", "value")
+        pairs = bitmaps.load_habit_series(habit, start_date)
+        if stats_numpy.should_use(len(pairs)):
+            return stats_numpy.weekly_metrics(
+                pairs, habit.target_per_period, start_date, windows=()
+            )[0]
         return calc_weekly_streak(pairs, habit.target_per_period, start_date=start_date)
 
-    # Periodicita Daily (default)
-    dates = queryset.values_list("date", flat=True)
-    return calc_daily_streak(dates, start_date=start_date)
+    # Periodicita Daily (default) – lookup řady obsahující start_date
+    return runs.current_streak(habit.id, start_date)
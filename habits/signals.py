@@ -0,0 +1,143 @@
+"""
+Udržování odvozených dat (bitmapy, řady) a verze cache statistik
+v synchronizaci s Habit/HabitLog.
+
+Bulk operace (`bulk_create`, `QuerySet.update`) signály nevolají – po nich je
+potřeba zavolat `sync_after_bulk(habit_ids)`.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import bitmaps, runs
+from .events import current_origin, publish_habit_change
+from .habit_cache import invalidate_user_habits
+from .metrics import LOG_WRITES
+from .models import Habit, HabitLog, HabitYearBitmap
+from .stats_cache import bump_user_version
+
+
+def _origin_is_log(origin) -> bool:
+    """Mazání vyvolané přímo nad logy (ne kaskádou z Habit/User)."""
+    if isinstance(origin, QuerySet):
+        return origin.model is HabitLog
+    return isinstance(origin, HabitLog)
+
+
+def _origin_is_user(origin) -> bool:
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is get_user_model()
+
+
+def _data_changed(user_id: int) -> None:
+    """
+    Zvedne verzi dat uživatele v transakci zápisu: souběžný request do commitu
+    vidí starou verzi i stará data, po commitu obojí nové.
+    """
+    bump_user_version(user_id)
+
+
+def _habit_changed(user_id: int, habit_id: int, day=None) -> None:
+    """Živá událost pro otevřené dnešní přehledy (až po commitu)."""
+    origin = current_origin()
+    transaction.on_commit(
+        lambda: publish_habit_change(user_id, habit_id, day, origin=origin)
+    )
+
+
+def sync_after_bulk(habit_ids: Iterable[int]) -> None:
+    """Přepočet odvozených dat po bulk zápisech mimo signály."""
+    habit_ids = set(habit_ids)
+    bitmaps.rebuild(habit_ids)
+    runs.rebuild(habit_ids)
+    owners = dict(Habit.objects.filter(id__in=habit_ids).values_list("id", "user_id"))
+    for user_id in set(owners.values()):
+        _data_changed(user_id)
+        # bulk_create habitů (fill_demo_data) signál také nevolá
+        invalidate_user_habits(user_id)
+    for habit_id, user_id in owners.items():
+        _habit_changed(user_id, habit_id)
+
+
+@receiver(pre_save, sender=HabitLog)
+def _log_saving(sender, instance: HabitLog, raw=False, **kwargs):
+    """Update může log přesunout k jinému habitu -> zapamatovat původní."""
+    if raw or instance._state.adding:
+        return
+    instance._previous_habit_id = (
+        HabitLog.objects.filter(pk=instance.pk)
+        .values_list("habit_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=HabitLog)
+def _log_saved(sender, instance: HabitLog, created: bool, raw=False, **kwargs):
+    if raw:
+        return
+    LOG_WRITES.inc(op="create" if created else "update")
+    if created:
+        bitmaps.set_day(instance.habit, instance.date, instance.value)
+        runs.add_day(instance.habit_id, instance.date)
+        _data_changed(instance.habit.user_id)
+        _habit_changed(instance.habit.user_id, instance.habit_id, instance.date)
+    else:
+        # update mohl změnit datum i habit (a s ním vlastníka) -> přepočet
+        # obou habitů; sync_after_bulk zvedne verzi obou vlastníků
+        previous = getattr(instance, "_previous_habit_id", None)
+        sync_after_bulk({instance.habit_id, previous} - {None})
+
+
+@receiver(post_delete, sender=HabitLog)
+def _log_deleted(sender, instance: HabitLog, origin=None, **kwargs):
+    if not _origin_is_log(origin):
+        return
+    LOG_WRITES.inc(op="delete")
+    # jen sloupce logu (user_id je denormalizovaný) – instance.habit by
+    # znamenal dotaz navíc
+    bitmaps.clear_day(instance.habit_id, instance.date)
+    runs.remove_day(instance.habit_id, instance.date)
+    _data_changed(instance.user_id)
+    _habit_changed(instance.user_id, instance.habit_id, instance.date)
+
+
+@receiver(post_save, sender=Habit)
+def _habit_saved(sender, instance: Habit, created: bool, raw=False, **kwargs):
+    if raw:
+        return
+    _data_changed(instance.user_id)
+    invalidate_user_habits(instance.user_id)
+    transaction.on_commit(lambda: invalidate_user_habits(instance.user_id))
+    if created:
+        return
+    # denormalizovaný HabitLog.user musí sledovat vlastníka habitu
+    HabitLog.objects.filter(habit=instance).exclude(user_id=instance.user_id).update(
+        user_id=instance.user_id
+    )
+    # bitmapy mají jen týdenní habity -> po změně periodicity přepočet
+    stored = HabitYearBitmap.objects.filter(habit=instance)
+    if instance.periodicity == Habit.Periodicity.WEEKLY:
+        stale = (
+            not stored.exists() and HabitLog.objects.filter(habit=instance).exists()
+        )
+    else:
+        stale = stored.exists()
+    if stale:
+        bitmaps.rebuild([instance.id])
+
+
+@receiver(post_delete, sender=Habit)
+def _habit_deleted(sender, instance: Habit, origin=None, **kwargs):
+    # kaskádou smazané logy verzi nezvedají (viz _log_deleted); při mazání
+    # uživatele se nezvedá vůbec – jeho řádek verze maže stejná kaskáda
+    if not _origin_is_user(origin):
+        _data_changed(instance.user_id)
+    invalidate_user_habits(instance.user_id)
+    transaction.on_commit(lambda: invalidate_user_habits(instance.user_id))
@@ -0,0 +1,46 @@
+"""
+Ladění SQLite pro provoz (profil `HABITS_DB_PROFILE=production`).
+
+Pragmy z `HABITS_SQLITE_PRAGMAS` se nastaví každému novému spojení
+(signál connection_created). S WAL čtenáři neblokují zapisovatele ani
+naopak; `synchronous=NORMAL` je ve WAL bezpečné proti poškození (při výpadku
+napájení lze přijít jen o poslední transakce), `busy_timeout` nechá
+souběžné zapisovatele čekat na zámek místo chyby "database is locked".
+`journal_mode` se ukládá do souboru DB, ostatní pragmy platí pro spojení –
+proto se spojení s `CONN_MAX_AGE` drží déle a nastavení se neopakuje
+při každém požadavku.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# pořadí je důležité: journal_mode jako první (vyžaduje zámek celé DB)
+PRAGMA_ORDER = ("journal_mode", "busy_timeout", "synchronous")
+
+
+def _ordered(pragmas: dict) -> list[tuple[str, object]]:
+    first = [(k, pragmas[k]) for k in PRAGMA_ORDER if k in pragmas]
+    rest = [(k, v) for k, v in pragmas.items() if k not in PRAGMA_ORDER]
+    return first + rest
+
+
+def apply_pragmas(connection, pragmas: dict) -> dict:
+    """Nastaví pragmy na otevřeném sqlite spojení a vrátí jejich hodnoty."""
+    raw = connection.connection
+    applied = {}
+    for name, value in _ordered(pragmas):
+        raw.execute(f"PRAGMA {name} = {value}")
+        applied[name] = raw.execute(f"PRAGMA {name}").fetchone()[0]
+    return applied
+
+
+@receiver(connection_created)
+def _connection_created(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "HABITS_SQLITE_PRAGMAS", None)
+    if pragmas and not connection.is_in_memory_db():
+        apply_pragmas(connection, pragmas)
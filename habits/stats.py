@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from collections import defaultdict
 from datetime import date, timedelta
-from typing import Iterable
+from typing import Iterable, Sequence
 
+from . import bitmaps, metrics, runs, stats_numpy
 from .models import Habit
-from .services import calc_daily_streak, calc_weekly_streak
+from .prefix import PrefixIndex
+from .services import calc_weekly_streak
+
+# okna úspěšnosti (dny), pokud si klient neřekne jinak
+DEFAULT_WINDOWS = (7, 30)
+MAX_WINDOW_DAYS = 3660
+MAX_WINDOWS = 10
 
 
 def _start_of_week(d: date) -> date:
@@ -58,7 +67,7 @@ def longest_weekly_streak(week_sums: dict[date, int], target: int) -> int:
     return best
 
 
-# ------- úspěšnost 7/30 -------
+# ------- úspěšnost v okně -------
 
 def success_ratio_daily(dates: Iterable[date], days: int, start_date: date) -> float:
     """Podíl dní v okně, které mají záznam (0..1)."""
@@ -99,50 +108,243 @@ def success_ratio_weekly(
     return achieved / float(len(weeks))
 
 
+# ------- výpočet pro jeden habit -------
+
+def _habit_stats(
+    h: Habit,
+    pairs: list[tuple[date, int]],
+    habit_runs: list[tuple[date, date]],
+    start_date: date,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+) -> dict:
+    """
+    Statistiky jednoho habitu z už načtených dat.
+    DAILY se počítá z řad (HabitRun), WEEKLY z (date, value) dvojic z bitmap.
+    Úspěšnost pro všechna okna odpovídá jeden prefixový index (habits.prefix).
+    """
+    origin = start_date - timedelta(days=max(windows, default=1) - 1)
+    weekly = h.periodicity == Habit.Periodicity.WEEKLY
+    ratios = None
+
+    if not weekly:
+        current, longest, _ = runs.daily_metrics(habit_runs, start_date, windows=())
+    elif stats_numpy.should_use(len(pairs)):
+        current, longest, ratios = stats_numpy.weekly_metrics(
+            pairs, h.target_per_period, start_date, windows
+        )
+    else:
+        # pro streaky se použijí všechny dostupné týdny (do start_date)
+        week_sums_all = defaultdict(int)
+        for d, v in pairs:
+            week_sums_all[_start_of_week(d)] += v
+
+        current = calc_weekly_streak(pairs, h.target_per_period, start_date=start_date)
+        longest = longest_weekly_streak(week_sums_all, h.target_per_period)
+
+    if ratios is None:
+        if weekly:
+            index = PrefixIndex(pairs, origin, start_date, h.target_per_period)
+            ratios = {n: index.weekly_ratio(n) for n in windows}
+        else:
+            index = PrefixIndex.from_runs(habit_runs, origin, start_date)
+            ratios = {n: index.daily_ratio(n) for n in windows}
+
+    out = {
+        "id": h.id,
+        "name": h.name,
+        "periodicity": h.periodicity,
+        "current_streak": current,
+        "longest_streak": longest,
+    }
+    for n in windows:
+        out[f"success_{n}d"] = round(ratios[n], 4)
+    return out
+
+
 # ------- veřejné API služby -------
 
-def compute_user_stats(user, start_date: date | None = None) -> list[dict]:
+def compute_user_stats(
+    user, start_date: date | None = None, windows: Sequence[int] = DEFAULT_WINDOWS
+) -> list[dict]:
     """
     Vrátí seznam statistik pro všechny habit(y) uživatele.
-    Každá položka: {id, name, periodicity, current_streak, longest_streak, success_7d, success_30d}
+    Každá položka: {id, name, periodicity, current_streak, longest_streak,
+    success_<n>d pro každé okno z `windows` (výchozí 7 a 30 dní)}
+
+    Denní habity se čtou z řad (habits.runs), týdenní z ročních bitmap
+    (habits.bitmaps); počet DB dotazů je konstantní, nezávisle na počtu habitů.
     """
     if start_date is None:
         start_date = date.today()
 
-    out: list[dict] = []
-    habits = Habit.objects.filter(user=user).order_by("id")
+    started = time.perf_counter()
+    habits = list(Habit.objects.filter(user=user).order_by("id"))
+    logs_by_habit = bitmaps.load_user_series(user, start_date)
+    runs_by_habit = runs.load_user_runs(user, start_date)
+    data = _stats_from_data(habits, logs_by_habit, runs_by_habit, start_date, windows)
+    metrics.observe_stats(len(habits), time.perf_counter() - started)
+    return data
+
+
+def _stats_from_data(habits, logs_by_habit, runs_by_habit, start_date, windows):
+    return [
+        _habit_stats(
+            h,
+            logs_by_habit.get(h.id, []),
+            runs_by_habit.get(h.id, []),
+            start_date,
+            windows,
+        )
+        for h in habits
+    ]
+
 
-    for h in habits:
-        logs_qs = h.logs.filter(date__lte=start_date)
+async def acompute_user_stats(
+    user,
+    start_date: date | None = None,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+    executor=None,
+) -> list[dict]:
+    """
+    Async varianta `compute_user_stats`: stejné 3 dotazy přes async ORM,
+    dekódování a výpočet streaků běží v `executor` (omezený pool vláken),
+    takže neblokují event loop.
+    """
+    if start_date is None:
+        start_date = date.today()
 
-        if h.periodicity == Habit.Periodicity.WEEKLY:
-            pairs = list(logs_qs.values_list("date", "value"))
-            # pro streaky se použijí všechny dostupné týdny (do start_date)
-            week_sums_all = defaultdict(int)
-            for d, v in pairs:
-                week_sums_all[_start_of_week(d)] += int(v)
+    started = time.perf_counter()
+    habits = [h async for h in Habit.objects.filter(user=user).order_by("id")]
+    series_rows = [
+        r
+        async for r in bitmaps.user_series_rows(user, start_date)
+    ]
+    run_rows = [r async for r in runs.user_run_rows(user, start_date)]
 
-            current = calc_weekly_streak(pairs, h.target_per_period, start_date=start_date)
-            longest = longest_weekly_streak(week_sums_all, h.target_per_period)
-            success_7d = success_ratio_weekly(pairs, h.target_per_period, 7, start_date)
-            success_30d = success_ratio_weekly(pairs, h.target_per_period, 30, start_date)
+    def _compute():
+        return _stats_from_data(
+            habits,
+            bitmaps.series_from_rows(series_rows, start_date),
+            runs.runs_by_habit(run_rows),
+            start_date,
+            windows,
+        )
+
+    data = await asyncio.get_running_loop().run_in_executor(executor, _compute)
+    metrics.observe_stats(len(habits), time.perf_counter() - started)
+    return data
+
+
+# ------- historie (time-series) -------
+
+def _habit_history(
+    h: Habit,
+    pairs: list[tuple[date, int]],
+    habit_runs: list[tuple[date, date]],
+    date_from: date,
+    date_to: date,
+    windows: Sequence[int],
+) -> list[dict]:
+    """
+    Denní řada {date, current_streak, longest_streak_so_far, success_<n>d}
+    jedním průchodem od prvního záznamu (nebo začátku nejdelšího okna) do date_to.
+    """
+    weekly = h.periodicity == Habit.Periodicity.WEEKLY
+    first = habit_runs[0][0] if not weekly and habit_runs else None
+    if weekly and pairs:
+        first = pairs[0][0]
+    origin = date_from - timedelta(days=max(windows, default=1) - 1)
+    if first is not None:
+        origin = min(origin, first)
+
+    if weekly:
+        index = PrefixIndex(pairs, origin, date_to, h.target_per_period)
+        ratio = index.weekly_ratio
+    else:
+        index = PrefixIndex.from_runs(habit_runs, origin, date_to)
+        ratio = index.daily_ratio
+
+    out: list[dict] = []
+    current = best = 0
+    # weekly: řada splněných uzavřených týdnů a součet rozpracovaného týdne
+    closed_run = week_sum = 0
+    d = index.origin  # pondělí
+    while d <= date_to:
+        value = index.total(d, d)
+        if weekly:
+            if d.weekday() == 0 and d != index.origin:
+                closed_run = closed_run + 1 if week_sum >= h.target_per_period else 0
+                best = max(best, closed_run)
+                week_sum = 0
+            week_sum += value
+            current = closed_run + 1 if week_sum >= h.target_per_period else 0
         else:
-            dates = set(logs_qs.values_list("date", flat=True))
-            current = calc_daily_streak(dates, start_date=start_date)
-            longest = longest_daily_streak(dates)
-            success_7d = success_ratio_daily(dates, 7, start_date)
-            success_30d = success_ratio_daily(dates, 30, start_date)
-
-        out.append(
-            {
-                "id": h.id,
-                "name": h.name,
-                "periodicity": h.periodicity,
+            current = current + 1 if value else 0
+        best = max(best, current)
+
+        if d >= date_from:
+            row = {
+                "date": d.isoformat(),
                 "current_streak": current,
-                "longest_streak": longest,
-                "success_7d": round(success_7d, 4),
-                "success_30d": round(success_30d, 4),
+                "longest_streak_so_far": best,
             }
-        )
-
+            for n in windows:
+                row[f"success_{n}d"] = round(ratio(n, d), 4)
+            out.append(row)
+        d += timedelta(days=1)
     return out
+
+
+def compute_user_history(
+    user,
+    date_from: date,
+    date_to: date,
+    habit_id: int | None = None,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+) -> list[dict]:
+    """
+    Vývoj statistik po dnech v rozsahu date_from..date_to (včetně).
+    Každá položka: {id, name, periodicity, series: [...]} – viz `_habit_history`.
+    Stejně jako `compute_user_stats` jen konstantní počet DB dotazů.
+    """
+    habits = Habit.objects.filter(user=user).order_by("id")
+    if habit_id is not None:
+        habits = habits.filter(id=habit_id)
+    habits = list(habits)
+    logs_by_habit = bitmaps.load_user_series(user, date_to)
+    runs_by_habit = runs.load_user_runs(user, date_to)
+
+    return [
+        {
+            "id": h.id,
+            "name": h.name,
+            "periodicity": h.periodicity,
+            "series": _habit_history(
+                h,
+                logs_by_habit.get(h.id, []),
+                runs_by_habit.get(h.id, []),
+                date_from,
+                date_to,
+                windows,
+            ),
+        }
+        for h in habits
+    ]
+
+
+def parse_windows(raw: str | None) -> tuple[int, ...]:
+    """
+    "7,30,90" -> (7, 30, 90). Prázdná hodnota = DEFAULT_WINDOWS.
+    Vyhodí ValueError pro nečíselná, nekladná nebo příliš velká okna.
+    """
+    if not raw:
+        return DEFAULT_WINDOWS
+    try:
+        windows = sorted({int(part) for part in raw.split(",") if part.strip()})
+    except ValueError:
+        raise ValueError("Okna musí být celá čísla (např. 7,30,90).") from None
+    if not windows or len(windows) > MAX_WINDOWS:
+        raise ValueError(f"Zadej 1 až {MAX_WINDOWS} oken.")
+    if windows[0] < 1 or windows[-1] > MAX_WINDOW_DAYS:
+        raise ValueError(f"Okno musí být 1..{MAX_WINDOW_DAYS} dní.")
+    return tuple(windows)
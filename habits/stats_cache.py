@@ -0,0 +1,159 @@
+"""
+Cache nad `compute_user_stats` s verzí dat per uživatel.
+
+Klíč = (user, start_date, okna, verze). Verze je v DB (`UserDataVersion`)
+a signály ji zvedají v transakci každého zápisu Habit/HabitLog (viz
+habits.signals), takže staré položky se nikdy nečtou a samy vypadnou přes
+TTL / eviction backendu. Verze je `time.time_ns()` v okamžiku změny (nejméně
+o 1 víc než předchozí) – nikdy se tedy nevrátí stará hodnota.
+
+Verze z DB stojí jeden dotaz na čtení, zato platí pro všechny procesy:
+i s locmem backendem (cache per proces) worker nikdy nevrátí statistiky
+starší než poslední zápis. Backend se volí aliasem z `CACHES`
+(`HABITS_STATS_CACHE`); sdílený backend jen zvýší podíl zásahů.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date
+from typing import Sequence
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .metrics import CACHE_REQUESTS
+from .models import UserDataVersion
+from .stats import DEFAULT_WINDOWS, acompute_user_stats, compute_user_stats
+
+DEFAULT_TTL = 300
+
+_counters = {"hits": 0, "misses": 0}
+_lock = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, "HABITS_STATS_CACHE", "default")]
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "HABITS_STATS_CACHE_TTL", DEFAULT_TTL))
+
+
+def _versions(user_id: int):
+    return UserDataVersion.objects.filter(user_id=user_id).values_list(
+        "version", flat=True
+    )
+
+
+def get_user_version(user_id: int) -> int:
+    """Aktuální verze dat uživatele (0, dokud nic nezapsal)."""
+    return _versions(user_id).first() or 0
+
+
+async def aget_user_version(user_id: int) -> int:
+    return await _versions(user_id).afirst() or 0
+
+
+def bump_user_version(user_id: int) -> None:
+    """Zneplatní všechny cachované statistiky uživatele (v aktuální transakci)."""
+    now = time.time_ns()
+    updated = UserDataVersion.objects.filter(user_id=user_id).update(
+        version=Greatest(F("version") + 1, Value(now))
+    )
+    if not updated:
+        UserDataVersion.objects.bulk_create(
+            [UserDataVersion(user_id=user_id, version=now)], ignore_conflicts=True
+        )
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+    CACHE_REQUESTS.inc(cache="stats", result="hit" if name == "hits" else "miss")
+
+
+def cache_info() -> dict:
+    """Počítadla hit/miss tohoto procesu."""
+    with _lock:
+        hits, misses = _counters["hits"], _counters["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+    }
+
+
+def reset_cache_info() -> None:
+    with _lock:
+        _counters["hits"] = _counters["misses"] = 0
+
+
+def _stats_key(
+    user_id: int, start_date: date, windows: Sequence[int], version: int
+) -> str:
+    win = ",".join(str(n) for n in windows)
+    return f"habits:stats:{user_id}:{start_date.isoformat()}:{win}:{version}"
+
+
+def get_user_stats(
+    user,
+    start_date: date | None = None,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+    version: int | None = None,
+) -> list[dict]:
+    """
+    `compute_user_stats` přes cache. `version` = již načtená verze dat
+    (např. z podmíněného GET), jinak se přečte z DB.
+    """
+    if start_date is None:
+        start_date = date.today()
+    if version is None:
+        version = get_user_version(user.id)
+
+    key = _stats_key(user.id, start_date, windows, version)
+    cache = _cache()
+    data = cache.get(key)
+    if data is not None:
+        _count("hits")
+        return data
+
+    _count("misses")
+    data = compute_user_stats(user, start_date=start_date, windows=windows)
+    cache.set(key, data, timeout=_ttl())
+    return data
+
+
+async def aget_user_stats(
+    user,
+    start_date: date | None = None,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+    executor=None,
+    version: int | None = None,
+) -> list[dict]:
+    """
+    Async varianta `get_user_stats`. Cache backendy locmem/file jsou lokální
+    a rychlé, volají se proto přímo (bez přesunu do sync vlákna).
+    """
+    if start_date is None:
+        start_date = date.today()
+
+    if version is None:
+        version = await aget_user_version(user.id)
+    key = _stats_key(user.id, start_date, windows, version)
+    cache = _cache()
+    data = cache.get(key)
+    if data is not None:
+        _count("hits")
+        return data
+
+    _count("misses")
+    data = await acompute_user_stats(
+        user, start_date=start_date, windows=windows, executor=executor
+    )
+    cache.set(key, data, timeout=_ttl())
+    return data
@@ -0,0 +1,95 @@
+"""
+Volitelný NumPy backend pro výpočet streaků a úspěšnosti týdenních habitů
+(denní se počítají z řad, viz `habits.runs`).
+
+Data se převedou na celočíselné ordinály (`date.toordinal()`) a vše se počítá
+vektorově. Pokud NumPy není nainstalované, `AVAILABLE` je False a volající
+zůstane u čistého Pythonu (viz `habits.stats`).
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable, Sequence
+
+from django.conf import settings
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - závisí na prostředí
+    np = None
+
+AVAILABLE = np is not None
+
+# od kolika logů na habit se vyplatí přejít na NumPy
+DEFAULT_THRESHOLD = 1000
+
+
+def threshold() -> int:
+    return int(getattr(settings, "HABITS_NUMPY_THRESHOLD", DEFAULT_THRESHOLD))
+
+
+def should_use(n_logs: int) -> bool:
+    """True, pokud je NumPy k dispozici a dat je dost na to, aby se vyplatilo."""
+    return AVAILABLE and n_logs >= threshold()
+
+
+def _week_index(ordinals):
+    # date(1, 1, 1) je pondělí a má ordinál 1 => index ISO týdne
+    return (ordinals - 1) // 7
+
+
+def _runs(sorted_unique):
+    """(začátky, délky) maximálních řad po sobě jdoucích čísel."""
+    breaks = np.flatnonzero(np.diff(sorted_unique) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [sorted_unique.size]))
+    return starts, ends - starts
+
+
+def _to_arrays(pairs: Iterable[tuple[date, int]], start_date: date):
+    pairs = list(pairs)
+    ords = np.fromiter(
+        (d.toordinal() for d, _ in pairs), dtype=np.int64, count=len(pairs)
+    )
+    vals = np.fromiter((int(v) for _, v in pairs), dtype=np.int64, count=len(pairs))
+    mask = ords <= start_date.toordinal()
+    return ords[mask], vals[mask]
+
+
+def weekly_metrics(
+    pairs: Iterable[tuple[date, int]],
+    target: int,
+    start_date: date,
+    windows: Sequence[int] = (7, 30),
+) -> tuple[int, int, dict[int, float]]:
+    """
+    (aktuální streak, nejdelší streak, {okno: úspěšnost}) pro týdenní habit.
+    Odpovídá `calc_weekly_streak`, `longest_weekly_streak` a `success_ratio_weekly`.
+    """
+    ords, vals = _to_arrays(pairs, start_date)
+    s = start_date.toordinal()
+    cur_week = (s - 1) // 7
+
+    current = longest = 0
+    if ords.size:
+        weeks, inverse = np.unique(_week_index(ords), return_inverse=True)
+        totals = np.bincount(inverse, weights=vals)
+        ok = weeks[totals >= target]
+        if ok.size:
+            _, lengths = _runs(ok)
+            longest = int(lengths.max())
+            if ok[-1] == cur_week:
+                current = int(lengths[-1])
+
+    ratios = {}
+    for n in windows:
+        lo = s - n + 1
+        first_week = cur_week if n < 14 else (lo - 1) // 7
+        n_weeks = cur_week - first_week + 1
+        mask = (ords >= lo) & (_week_index(ords) >= first_week)
+        in_window = np.bincount(
+            _week_index(ords[mask]) - first_week, weights=vals[mask], minlength=n_weeks
+        )
+        ratios[n] = int((in_window >= target).sum()) / float(n_weeks)
+    return current, longest, ratios
@@ -0,0 +1,242 @@
+"""
+Deterministický generátor syntetických dat pro zátěžové testy
+(`fill_demo_data --users N`).
+
+Každý uživatel má vlastní RNG odvozený ze (seed, index), takže výsledek
+nezávisí na velikosti dávek ani počtu workerů. Logy se generují po habitech
+(geometrické mezery mezi dny – jedno losování na záznam) a vkládají se
+po `batch_size`, paměť je tedy omezená dávkou, ne velikostí datasetu.
+Řady (HabitRun) a bitmapy týdenních habitů se zapisují rovnou z vygenerovaných
+dní; noví uživatelé nemají nic v cache, signály tedy není potřeba simulovat.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import lru_cache
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .bitmaps import encode
+from .models import Habit, HabitLog, HabitRun, HabitYearBitmap
+from .runs import runs_from_dates
+
+DEFAULT_PASSWORD = "demo12345"
+SQLITE_BUSY_TIMEOUT_MS = 120_000
+
+
+@dataclass(frozen=True)
+class ScaleSpec:
+    users: int
+    habits_per_user: int = 6
+    days: int = 365
+    seed: int = 42
+    prefix: str = "load"
+    weekly_share: float = 0.5
+    daily_rate: float = 0.6
+    weekly_rate: float = 0.35
+    active_share: float = 1.0
+    batch_size: int = 5000
+    end_date: date = field(default_factory=date.today)
+
+    def username(self, index: int) -> str:
+        return f"{self.prefix}{index:07d}"
+
+
+@dataclass
+class ChunkResult:
+    users: int = 0
+    habits: int = 0
+    logs: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    def add(self, other: "ChunkResult") -> None:
+        self.users += other.users
+        self.habits += other.habits
+        self.logs += other.logs
+        self.skipped += other.skipped
+
+    @property
+    def rows(self) -> int:
+        return self.users + self.habits + self.logs
+
+
+class _Inserter:
+    """
+    Dávkový INSERT přes `executemany` – u milionů řádků je ORM `bulk_create`
+    (pre_save a příprava hodnot per pole) výrazně dražší než samotná DB.
+    Hodnoty musí být už adaptované pro DB (connection.ops.adapt_*).
+    """
+
+    def __init__(self, model, fields: list[str]):
+        qn = connections["default"].ops.quote_name
+        columns = ", ".join(qn(model._meta.get_field(f).column) for f in fields)
+        placeholders = ", ".join(["%s"] * len(fields))
+        self.sql = (
+            f"INSERT INTO {qn(model._meta.db_table)} ({columns}) "
+            f"VALUES ({placeholders})"
+        )
+        self.rows: list[tuple] = []
+        self.written = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self.rows)
+
+    def add(self, row: tuple) -> None:
+        self.rows.append(row)
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        with connections["default"].cursor() as cursor:
+            cursor.executemany(self.sql, self.rows)
+        self.written += len(self.rows)
+        self.rows = []
+
+
+@lru_cache(maxsize=1)
+def _password_hash() -> str:
+    # hashování je drahé -> jednou na proces
+    return make_password(DEFAULT_PASSWORD)
+
+
+def _user_rng(spec: ScaleSpec, index: int) -> random.Random:
+    return random.Random(spec.seed * 1_000_003 + index)
+
+
+def _log_days(rng: random.Random, start: date, days: int, rate: float):
+    """Dny se záznamem: Bernoulli(rate) pro každý den přes geometrické mezery."""
+    if rate <= 0:
+        return
+    if rate >= 1:
+        yield from (start + timedelta(days=i) for i in range(days))
+        return
+    log_q = math.log(1.0 - rate)
+    i = int(math.log(1.0 - rng.random()) / log_q)
+    while i < days:
+        yield start + timedelta(days=i)
+        i += 1 + int(math.log(1.0 - rng.random()) / log_q)
+
+
+def _habit_plan(spec: ScaleSpec, rng: random.Random) -> list[tuple[str, int]]:
+    plan = []
+    for _ in range(spec.habits_per_user):
+        if rng.random() < spec.weekly_share:
+            plan.append((Habit.Periodicity.WEEKLY, rng.randint(2, 4)))
+        else:
+            plan.append((Habit.Periodicity.DAILY, 1))
+    return plan
+
+
+def generate_chunk(spec: ScaleSpec, start: int, stop: int) -> ChunkResult:
+    """Uživatelé s indexy [start, stop) včetně habitů a logů; existující přeskočí."""
+    started = time.perf_counter()
+    result = ChunkResult()
+    UserModel = get_user_model()
+    names = {spec.username(i): i for i in range(start, stop)}
+    existing = set(
+        UserModel.objects.filter(username__in=names).values_list("username", flat=True)
+    )
+    todo = {name: i for name, i in names.items() if name not in existing}
+    result.skipped = len(existing)
+    if not todo:
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    first_day = spec.end_date - timedelta(days=spec.days - 1)
+    connection = connections["default"]
+    if connection.vendor == "sqlite":
+        # jediný zapisovatel: workery na zámek počkají místo "database is locked"
+        # (transakce začíná zápisem, takže nehrozí deadlock při upgradu zámku)
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    with transaction.atomic():
+        UserModel.objects.bulk_create(
+            [
+                UserModel(
+                    username=name,
+                    email=f"{name}@example.com",
+                    password=_password_hash(),
+                )
+                for name in todo
+            ],
+            batch_size=spec.batch_size,
+        )
+        user_ids = dict(
+            UserModel.objects.filter(username__in=todo).values_list("username", "id")
+        )
+
+        rngs = {}
+        habits = []
+        for name, index in todo.items():
+            rng = rngs[user_ids[name]] = _user_rng(spec, index)
+            for j, (kind, target) in enumerate(_habit_plan(spec, rng)):
+                habits.append(
+                    Habit(
+                        user_id=user_ids[name],
+                        name=f"Návyk {j + 1}",
+                        periodicity=kind,
+                        target_per_period=target,
+                    )
+                )
+        Habit.objects.bulk_create(habits, batch_size=spec.batch_size)
+        habits = list(
+            Habit.objects.filter(user_id__in=rngs)
+            .order_by("id")
+            .values_list("id", "user_id", "periodicity")
+        )
+
+        logs = _Inserter(HabitLog, ["habit", "user", "date", "value", "created_at"])
+        run_rows = _Inserter(HabitRun, ["habit", "start", "end"])
+        bitmap_rows = _Inserter(HabitYearBitmap, ["habit", "year", "data"])
+        ops = connections["default"].ops
+        created_at = ops.adapt_datetimefield_value(timezone.now())
+        active: dict[int, bool] = {}
+        for habit_id, user_id, kind in habits:
+            rng = rngs[user_id]
+            if user_id not in active:
+                active[user_id] = rng.random() < spec.active_share
+            if not active[user_id]:
+                continue
+            rate = (
+                spec.weekly_rate
+                if kind == Habit.Periodicity.WEEKLY
+                else spec.daily_rate
+            )
+            days = list(_log_days(rng, first_day, spec.days, rate))
+            for d in days:
+                logs.add(
+                    (habit_id, user_id, ops.adapt_datefield_value(d), 1, created_at)
+                )
+            # odvozená data rovnou z vygenerovaných dní (bez zpětného čtení logů)
+            for start_day, end_day in runs_from_dates(days):
+                run_rows.add(
+                    (
+                        habit_id,
+                        ops.adapt_datefield_value(start_day),
+                        ops.adapt_datefield_value(end_day),
+                    )
+                )
+            if kind == Habit.Periodicity.WEEKLY:
+                for year, data in encode((d, 1) for d in days).items():
+                    bitmap_rows.add((habit_id, year, data))
+            if logs.pending >= spec.batch_size:
+                for inserter in (logs, run_rows, bitmap_rows):
+                    inserter.flush()
+        for inserter in (logs, run_rows, bitmap_rows):
+            inserter.flush()
+        result.logs = logs.written
+
+    result.users = len(todo)
+    result.habits = len(habits)
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,15 @@
+import pytest
+from django.core.cache import caches
+
+from habits import habit_cache
+from habits.stats_cache import reset_cache_info
+
+
+@pytest.fixture(autouse=True)
+def _clean_caches():
+    """Cache přežívá mezi testy (rollback DB ji nevyčistí)."""
+    for cache in caches.all():
+        cache.clear()
+    reset_cache_info()
+    habit_cache.clear()
+    yield
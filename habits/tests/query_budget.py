@@ -0,0 +1,33 @@
+"""
+Pomůcky pro hlídání počtu SQL dotazů (viz test_query_budgets).
+
+`query_budget(n)` selže, pokud blok provede víc než n dotazů, a do chyby
+vypíše všechny zachycené SQL – N+1 je tak vidět přímo ve výstupu testu.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def format_queries(captured: CaptureQueriesContext) -> str:
+    return "\n".join(
+        f"{i}. {q['sql']}" for i, q in enumerate(captured.captured_queries, start=1)
+    )
+
+
+@contextmanager
+def query_budget(limit: int, label: str = ""):
+    with CaptureQueriesContext(connection) as captured:
+        yield captured
+    if len(captured) > limit:
+        where = f"{label}: " if label else ""
+        pytest.fail(
+            f"{where}{len(captured)} dotazů, rozpočet {limit}\n"
+            f"{format_queries(captured)}",
+            pytrace=False,
+        )
@@ -0,0 +1,106 @@
+import datetime as dt
+
+import pytest
+from rest_framework.test import APIClient
+
+from habits.models import HabitLog, HabitRun
+from habits.stats import compute_user_stats
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+START = dt.date(2025, 8, 1)
+
+
+def _client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_bulk_reports_created_duplicate_and_invalid():
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    foreign = HabitFactory(user=UserFactory())
+    HabitLogFactory(habit=h, date=START)
+
+    items = [
+        {"habit": h.id, "date": "2025-08-02", "value": 1},  # created
+        {"habit": h.id, "date": "2025-08-01", "value": 1},  # duplicate (DB)
+        {"habit": h.id, "date": "2025-08-02", "value": 1},  # duplicate (payload)
+        {"habit": foreign.id, "date": "2025-08-02"},  # cizí habit
+        {"habit": h.id, "date": "not-a-date"},  # nevalidní
+        {"habit": h.id, "date": "2025-08-03", "value": 0},  # value < 1
+        {"habit": h.id, "date": "2025-08-03"},  # created, value default 1
+    ]
+    res = _client(u).post("/api/logs/bulk/", items, format="json")
+    assert res.status_code == 200, res.content
+    payload = res.json()
+    assert [r["status"] for r in payload["results"]] == [
+        "created",
+        "duplicate",
+        "duplicate",
+        "invalid",
+        "invalid",
+        "invalid",
+        "created",
+    ]
+    assert payload["summary"] == {"created": 2, "duplicate": 2, "invalid": 3}
+    assert "habit" in payload["results"][3]["errors"]
+    assert "date" in payload["results"][4]["errors"]
+
+    assert set(h.logs.values_list("date", flat=True)) == {
+        START,
+        dt.date(2025, 8, 2),
+        dt.date(2025, 8, 3),
+    }
+    assert not foreign.logs.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_keeps_derived_data_in_sync():
+    u = UserFactory()
+    h = HabitFactory(user=u, periodicity="daily")
+    items = [
+        {"habit": h.id, "date": (START + dt.timedelta(days=i)).isoformat()}
+        for i in range(10)
+    ]
+    _client(u).post("/api/logs/bulk/", {"items": items}, format="json")
+
+    assert list(HabitRun.objects.filter(habit=h).values_list("start", "end")) == [
+        (START, START + dt.timedelta(days=9))
+    ]
+    stats = compute_user_stats(u, start_date=START + dt.timedelta(days=9))
+    assert stats[0]["current_streak"] == 10
+
+
+@pytest.mark.django_db
+def test_bulk_query_count_does_not_grow_with_items(django_assert_max_num_queries):
+    u = UserFactory()
+    habits = [HabitFactory(user=u) for _ in range(3)]
+    client = _client(u)
+
+    def _items(offset, n):
+        return [
+            {
+                "habit": habits[i % 3].id,
+                "date": (START + dt.timedelta(days=offset + i)).isoformat(),
+            }
+            for i in range(n)
+        ]
+
+    # ověření vlastnictví + duplicit + insert + přepočet odvozených dat
+    with django_assert_max_num_queries(25):
+        client.post("/api/logs/bulk/", _items(0, 30), format="json")
+    with django_assert_max_num_queries(25):
+        client.post("/api/logs/bulk/", _items(100, 900), format="json")
+    assert HabitLog.objects.filter(user=u).count() == 930
+
+
+@pytest.mark.django_db
+def test_bulk_rejects_non_list_and_too_many_items():
+    u = UserFactory()
+    client = _client(u)
+    assert client.post("/api/logs/bulk/", {"x": 1}, format="json").status_code == 400
+    many = [{"habit": 1, "date": "2025-08-01"}] * 5001
+    assert client.post("/api/logs/bulk/", many, format="json").status_code == 400
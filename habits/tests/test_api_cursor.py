@@ -0,0 +1,93 @@
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+START = dt.date(2025, 8, 1)
+
+
+@pytest.fixture
+def seeded():
+    u = UserFactory()
+    habits = [HabitFactory(user=u) for _ in range(3)]
+    # 3 logy na každý den -> shody v date, řadí se dál podle id
+    for i in range(10):
+        for h in habits:
+            HabitLogFactory(habit=h, date=START + dt.timedelta(days=i))
+    client = APIClient()
+    client.force_authenticate(user=u)
+    return client
+
+
+def _walk(client, url):
+    items, pages = [], 0
+    while url:
+        res = client.get(url)
+        assert res.status_code == 200, res.content
+        data = res.json()
+        assert "count" not in data
+        items += data["results"]
+        url = data["next"]
+        pages += 1
+    return items, pages
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", ["-date", "date", "id", "-id"])
+def test_cursor_walk_is_complete_and_ordered(seeded, ordering):
+    items, pages = _walk(
+        seeded, f"/api/logs/?pagination=cursor&page_size=7&ordering={ordering}"
+    )
+    assert pages == 5
+    ids = [x["id"] for x in items]
+    assert len(ids) == len(set(ids)) == 30
+
+    keyed = [(x["date"], x["id"]) if "date" in ordering else x["id"] for x in items]
+    assert keyed == sorted(keyed, reverse=ordering.startswith("-"))
+
+
+@pytest.mark.django_db
+def test_cursor_respects_filters_and_optional_count(seeded):
+    res = seeded.get("/api/logs/?pagination=cursor&date__gte=2025-08-09&count=1")
+    data = res.json()
+    assert data["count"] == 6
+    assert {x["date"] for x in data["results"]} == {"2025-08-09", "2025-08-10"}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("flag", ["0", "false", ""])
+def test_count_off_skips_count_query(seeded, flag):
+    with CaptureQueriesContext(connection) as ctx:
+        data = seeded.get(f"/api/logs/?pagination=cursor&count={flag}").json()
+    assert "count" not in data
+    sql = " ".join(q["sql"] for q in ctx.captured_queries).upper()
+    assert "COUNT(" not in sql
+
+
+@pytest.mark.django_db
+def test_deep_page_uses_keyset_not_offset(seeded):
+    url = "/api/logs/?pagination=cursor&page_size=5"
+    for _ in range(4):
+        url = seeded.get(url).json()["next"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert seeded.get(url).status_code == 200
+    sql = " ".join(q["sql"] for q in ctx.captured_queries).upper()
+    assert "COUNT(" not in sql
+    assert "OFFSET" not in sql
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_is_404(seeded):
+    assert seeded.get("/api/logs/?cursor=garbage").status_code == 404
+
+
+@pytest.mark.django_db
+def test_page_number_remains_default(seeded):
+    data = seeded.get("/api/logs/").json()
+    assert data["count"] == 30
+    assert len(data["results"]) == 20
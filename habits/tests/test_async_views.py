@@ -0,0 +1,88 @@
+import datetime as dt
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
+
+from habits.models import Habit
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+pytestmark = [pytest.mark.urls("habits.tests.urls_async"), pytest.mark.django_db]
+
+
+def aget(client, url, **kwargs):
+    return async_to_sync(client.get)(url, **kwargs)
+
+
+class settings_urls:
+    """Dočasně sync urlconf (pro porovnání výstupu)."""
+
+    def __init__(self, settings):
+        self.settings = settings
+
+    def __enter__(self):
+        self.prev = self.settings.ROOT_URLCONF
+        self.settings.ROOT_URLCONF = "habit_tracker.urls"
+
+    def __exit__(self, *exc):
+        self.settings.ROOT_URLCONF = self.prev
+
+
+@pytest.fixture
+def seeded():
+    u = UserFactory()
+    today = dt.date.today()
+    daily = HabitFactory(user=u)
+    weekly = HabitFactory(user=u, periodicity=Habit.Periodicity.WEEKLY)
+    for i in range(25):
+        HabitLogFactory(habit=daily, date=today - dt.timedelta(days=i))
+    HabitLogFactory(habit=weekly, date=today)
+    sync, aclient = Client(), AsyncClient()
+    sync.force_login(u)
+    aclient.cookies = sync.cookies
+    return u, sync, aclient
+
+
+def test_stats_matches_sync(seeded, settings):
+    _, sync, aclient = seeded
+    res = aget(aclient, "/api/stats/?windows=7,30,90")
+    assert res.status_code == 200
+    with settings_urls(settings):
+        expected = sync.get("/api/stats/?windows=7,30,90").json()
+    assert res.json() == expected
+
+    again = aget(
+        aclient, "/api/stats/?windows=7,30,90", headers={"If-None-Match": res["ETag"]}
+    )
+    assert again.status_code == 304
+
+
+def test_stats_bad_windows_is_400(seeded):
+    _, _, aclient = seeded
+    res = aget(aclient, "/api/stats/?windows=abc")
+    assert res.status_code == 400
+    assert "windows" in res.json()
+
+
+def test_log_list_stays_on_sync_viewset(seeded):
+    _, _, aclient = seeded
+    res = aget(aclient, "/api/logs/?page=2&ordering=date")
+    assert res.status_code == 200
+    assert res.json()["count"] == 26
+
+    anon = aget(AsyncClient(), "/api/logs/")
+    assert anon.status_code == 403
+
+
+def test_today_view(seeded):
+    _, _, aclient = seeded
+    res = aget(aclient, "/today/")
+    assert res.status_code == 200
+    assert "Dnes zaznamenáno: 2 / 2" in res.content.decode()
+
+    partial = aget(aclient, "/today/", headers={"HX-Request": "true"})
+    assert partial.content.decode().lstrip().startswith('<div id="today-list"')
+
+    anon = aget(AsyncClient(), "/today/")
+    assert anon.status_code == 302
@@ -0,0 +1,74 @@
+import copy
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from habits.benchmarks import compare, run_benchmarks
+from habits.benchmarks.cases import CASES
+from habits.benchmarks.datasets import DatasetSize, parse_sizes
+
+
+def test_parse_sizes():
+    assert parse_sizes("10x1, 100x5") == [DatasetSize(10, 1), DatasetSize(100, 5)]
+    for bad in ("", "10", "x5", "0x1", "10y5"):
+        with pytest.raises(ValueError):
+            parse_sizes(bad)
+
+
+def _report(**overrides):
+    row = dict(
+        case="compute_user_stats",
+        dataset="10h_1y",
+        habits=10,
+        years=1,
+        logs=100,
+        wall_ms_median=20.0,
+        wall_ms_min=18.0,
+        queries=3,
+        peak_kib=100.0,
+    )
+    row.update(overrides)
+    return {"results": [row]}
+
+
+def test_compare_flags_regressions_only():
+    base = _report()
+    assert compare(_report(wall_ms_median=24.0), base) == []
+    # pod prahem šumu (5 ms) se čas nehlásí
+    assert compare(_report(wall_ms_median=2.0), _report(wall_ms_median=1.0)) == []
+
+    problems = compare(_report(queries=4, wall_ms_median=40.0, peak_kib=200.0), base)
+    assert len(problems) == 3
+    assert all(p.startswith("compute_user_stats@10h_1y") for p in problems)
+
+    # nový případ bez baseline není regrese
+    assert compare(_report(dataset="99h_9y", queries=99), base) == []
+
+
+@pytest.mark.django_db
+def test_run_benchmarks_small_dataset():
+    report = run_benchmarks([DatasetSize(4, 1)], repeat=1)
+    rows = {r["case"]: r for r in report["results"]}
+    assert set(rows) == set(CASES)
+    assert rows["compute_user_stats"]["queries"] == 3
+    assert rows["build_today_context"]["queries"] <= 2
+    assert all(r["logs"] > 0 and r["peak_kib"] > 0 for r in rows.values())
+
+
+@pytest.mark.django_db
+def test_command_fails_on_regression(tmp_path):
+    out = tmp_path / "bench.json"
+    # testovací DB je už izolovaná
+    args = dict(sizes="3x1", cases="compute_user_stats", repeat=1, current_db=True)
+    call_command("run_benchmarks", output=str(out), **args)
+    report = json.loads(out.read_text())
+
+    baseline = copy.deepcopy(report)
+    baseline["results"][0]["queries"] = 1
+    base_path = tmp_path / "baseline.json"
+    base_path.write_text(json.dumps(baseline))
+    with pytest.raises(CommandError, match="dotazy 1 -> 3"):
+        call_command(
+            "run_benchmarks", output=str(out), baseline=str(base_path), **args
+        )
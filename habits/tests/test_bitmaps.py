@@ -0,0 +1,137 @@
+import datetime as dt
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from habits import bitmaps
+from habits.models import Habit, HabitLog, HabitYearBitmap
+from habits.signals import sync_after_bulk
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+
+def _stored(habit):
+    out = []
+    for bm in HabitYearBitmap.objects.filter(habit=habit):
+        out += bitmaps.decode(bm.year, bytes(bm.data))
+    return sorted(out)
+
+
+def test_encode_decode_roundtrip():
+    encoded = bitmaps.encode(
+        [
+            (dt.date(2024, 2, 29), 1),
+            (dt.date(2025, 3, 3), 4),
+            (dt.date(2025, 3, 4), 2_147_483_647),
+        ]
+    )
+    assert set(encoded) == {2024, 2025}
+    assert all(len(data) == 366 * 4 for data in encoded.values())
+    assert bitmaps.decode(2024, encoded[2024]) == [(dt.date(2024, 2, 29), 1)]
+    # hodnoty nad 255 se nesaturují (max PositiveIntegerField)
+    assert bitmaps.decode(2025, encoded[2025]) == [
+        (dt.date(2025, 3, 3), 4),
+        (dt.date(2025, 3, 4), 2_147_483_647),
+    ]
+
+
+@pytest.mark.django_db
+def test_bitmap_follows_log_create_and_delete():
+    h = HabitFactory(periodicity="weekly")
+    d1, d2 = dt.date(2025, 8, 12), dt.date(2025, 8, 13)
+    HabitLogFactory(habit=h, date=d1)
+    log2 = HabitLogFactory(habit=h, date=d2)
+    assert _stored(h) == [(d1, 1), (d2, 1)]
+
+    log2.delete()
+    assert _stored(h) == [(d1, 1)]
+
+    HabitLog.objects.filter(habit=h).delete()
+    assert _stored(h) == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("periodicity", ["daily", "weekly"])
+def test_log_delete_does_not_load_habit(periodicity):
+    h = HabitFactory(periodicity=periodicity)
+    HabitLogFactory(habit=h, date=dt.date(2025, 8, 12))
+    with CaptureQueriesContext(connection) as ctx:
+        HabitLog.objects.filter(habit=h).delete()
+    assert not any('FROM "habits_habit"' in q["sql"] for q in ctx.captured_queries)
+    assert _stored(h) == []
+
+
+@pytest.mark.django_db
+def test_daily_habit_has_no_bitmap():
+    h = HabitFactory(periodicity="daily")
+    HabitLogFactory(habit=h, date=dt.date(2025, 8, 12))
+    sync_after_bulk([h.id])
+    assert not HabitYearBitmap.objects.exists()
+
+
+@pytest.mark.django_db
+def test_weekly_bitmap_stores_values():
+    h = HabitFactory(periodicity="weekly", target_per_period=3)
+    HabitLogFactory(habit=h, date=dt.date(2025, 8, 11), value=2)
+    HabitLogFactory(habit=h, date=dt.date(2025, 8, 12), value=1)
+    assert _stored(h) == [(dt.date(2025, 8, 11), 2), (dt.date(2025, 8, 12), 1)]
+
+
+@pytest.mark.django_db
+def test_periodicity_change_rebuilds_bitmap():
+    h = HabitFactory(periodicity="daily")
+    HabitLogFactory(habit=h, date=dt.date(2025, 8, 11), value=3)
+    h.periodicity = Habit.Periodicity.WEEKLY
+    h.save()
+    assert HabitYearBitmap.objects.filter(habit=h).count() == 1
+    assert _stored(h) == [(dt.date(2025, 8, 11), 3)]
+
+    h.periodicity = Habit.Periodicity.DAILY
+    h.save()
+    assert not HabitYearBitmap.objects.exists()
+
+
+@pytest.mark.django_db
+def test_habit_and_user_delete_cascade_cleanly():
+    u = UserFactory()
+    h = HabitFactory(user=u, periodicity="weekly")
+    HabitLogFactory(habit=h, date=dt.date(2025, 8, 11))
+    h.delete()
+    assert not HabitYearBitmap.objects.exists()
+
+    h2 = HabitFactory(user=u, periodicity="weekly")
+    HabitLogFactory(habit=h2, date=dt.date(2025, 8, 11))
+    u.delete()
+    assert not HabitYearBitmap.objects.exists()
+
+
+@pytest.mark.django_db
+def test_sync_after_bulk_rebuilds_from_logs():
+    h = HabitFactory(periodicity="weekly")
+    days = [dt.date(2025, 8, 1) + dt.timedelta(days=i) for i in range(5)]
+    HabitLog.objects.bulk_create([HabitLog(habit=h, user=h.user, date=d) for d in days])
+    assert _stored(h) == []
+
+    sync_after_bulk([h.id])
+    assert _stored(h) == [(d, 1) for d in days]
+
+
+@pytest.mark.django_db
+def test_fill_demo_data_populates_bitmaps():
+    call_command("fill_demo_data", "--user", "demo", "--habits", "2", "--days", "20")
+    for h in Habit.objects.filter(user__username="demo"):
+        logs = sorted(h.logs.values_list("date", "value"))
+        assert _stored(h) == (logs if h.periodicity == "weekly" else [])
+
+
+@pytest.mark.django_db
+def test_weekly_values_above_255_count_toward_target():
+    from habits.services import get_current_streak
+
+    h = HabitFactory(periodicity="weekly", target_per_period=300)
+    today = dt.date(2025, 8, 13)
+    HabitLogFactory(habit=h, date=today, value=300)
+    assert _stored(h) == [(today, 300)]
+    assert get_current_streak(h, start_date=today) == 1
@@ -0,0 +1,69 @@
+import datetime as dt
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from habits.stats import compute_user_stats
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+START = dt.date(2025, 8, 13)
+
+
+def _rows(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.django_db
+def test_writes_one_line_per_user(tmp_path):
+    users = [UserFactory() for _ in range(5)]
+    for u in users:
+        HabitLogFactory(habit=HabitFactory(user=u), date=START)
+    out = tmp_path / "stats.jsonl"
+
+    call_command(
+        "compute_all_stats",
+        "--output", str(out),
+        "--workers", "1",
+        "--chunk-size", "2",
+        "--date", START.isoformat(),
+    )
+
+    rows = _rows(out)
+    assert sorted(r["user_id"] for r in rows) == sorted(u.id for u in users)
+    by_user = {r["user_id"]: r for r in rows}
+    for u in users:
+        assert by_user[u.id]["habits"] == compute_user_stats(u, start_date=START)
+
+
+@pytest.mark.django_db
+def test_resume_skips_done_users_and_drops_partial_line(tmp_path):
+    users = [UserFactory() for _ in range(3)]
+    out = tmp_path / "stats.jsonl"
+    done = {"user_id": users[0].id, "start_date": START.isoformat(), "habits": []}
+    # přerušený běh: jeden celý řádek + useknutý zápis
+    out.write_text(json.dumps(done) + "\n" + '{"user_id": 99, "sta')
+
+    call_command(
+        "compute_all_stats", "--output", str(out), "--workers", "1",
+        "--date", START.isoformat(),
+    )
+
+    rows = _rows(out)
+    assert [r["user_id"] for r in rows].count(users[0].id) == 1
+    assert sorted(r["user_id"] for r in rows) == sorted(u.id for u in users)
+
+    call_command(
+        "compute_all_stats", "--output", str(out), "--workers", "1",
+        "--date", START.isoformat(), "--restart",
+    )
+    assert len(_rows(out)) == 3
+
+
+@pytest.mark.django_db
+def test_invalid_date_is_command_error(tmp_path):
+    with pytest.raises(CommandError):
+        call_command(
+            "compute_all_stats", "--output", str(tmp_path / "x"), "--date", "nope"
+        )
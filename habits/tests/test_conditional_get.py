@@ -0,0 +1,67 @@
+import datetime as dt
+
+import pytest
+from rest_framework.test import APIClient
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+URLS = ["/api/habits/", "/api/logs/", "/api/stats/", "/api/logs/?ordering=date"]
+
+
+@pytest.fixture
+def api():
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    HabitLogFactory(habit=h, date=dt.date.today())
+    client = APIClient()
+    client.force_authenticate(user=u)
+    return client, h
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", URLS)
+def test_unchanged_poll_is_304_with_one_query(api, url, django_assert_num_queries):
+    client, _ = api
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first["ETag"]
+    assert "Last-Modified" in first
+    assert "private" in first["Cache-Control"]
+
+    # jen verze dat (force_authenticate -> bez session a uživatele)
+    with django_assert_num_queries(1):
+        res = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 304
+    assert res["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_if_modified_since_is_honoured(api):
+    client, _ = api
+    first = client.get("/api/habits/")
+    res = client.get("/api/habits/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+    assert res.status_code == 304
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", URLS)
+def test_write_changes_etag(api, url):
+    client, h = api
+    etag = client.get(url)["ETag"]
+    HabitLogFactory(habit=h, date=dt.date.today() - dt.timedelta(days=1))
+
+    res = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    assert res["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_etag_differs_per_query_and_user(api):
+    client, _ = api
+    a = client.get("/api/logs/")["ETag"]
+    b = client.get("/api/logs/?ordering=date")["ETag"]
+    assert a != b
+
+    other = APIClient()
+    other.force_authenticate(user=UserFactory())
+    assert other.get("/api/logs/", HTTP_IF_NONE_MATCH=a).status_code == 200
@@ -0,0 +1,167 @@
+import asyncio
+import datetime as dt
+import json
+
+import pytest
+from django.test import AsyncRequestFactory, Client
+
+from habits import events, views
+from habits.events import InProcessBroker
+from habits.views import today_events
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+
+class RecordingBroker(InProcessBroker):
+    """Lokální náhrada brokeru: pamatuje si publikované události."""
+
+    published = []
+
+    def publish(self, user_id, event):
+        self.published.append((user_id, event))
+        super().publish(user_id, event)
+
+
+@pytest.fixture
+def recording(settings):
+    RecordingBroker.published = []
+    settings.HABITS_EVENT_BROKER = "habits.tests.test_events.RecordingBroker"
+    yield RecordingBroker.published
+
+
+def test_broker_delivers_per_user():
+    broker = InProcessBroker()
+    a, b = broker.subscribe(1), broker.subscribe(2)
+    broker.publish(1, {"habit_id": 5})
+    assert a.get(0.1) == {"habit_id": 5}
+    assert b.get(0.01) is None
+
+    broker.unsubscribe(a)
+    assert broker.subscriber_count(1) == 0
+
+
+def test_broker_drops_events_for_slow_subscriber():
+    broker = InProcessBroker()
+    sub = broker.subscribe(1)
+    for i in range(events.QUEUE_SIZE + 10):
+        broker.publish(1, {"habit_id": i})
+    assert sub._queue.qsize() == events.QUEUE_SIZE
+
+
+def test_async_subscription():
+    async def run():
+        broker = InProcessBroker()
+        sub = broker.subscribe(1, loop=asyncio.get_running_loop())
+        await asyncio.to_thread(broker.publish, 1, {"habit_id": 3})
+        return await sub.aget(1)
+
+    assert asyncio.run(run()) == {"habit_id": 3}
+
+
+@pytest.mark.django_db
+def test_toggle_and_api_publish_after_commit(
+    recording, django_capture_on_commit_callbacks
+):
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    client = Client()
+    client.force_login(u)
+    today = dt.date.today()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(f"/today/toggle/{h.id}/")
+    assert recording == [(u.id, {"habit_id": h.id, "date": today.isoformat()})]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(f"/today/toggle/{h.id}/")
+        client.post(
+            "/api/logs/",
+            {"habit": h.id, "date": "2025-08-01"},
+            content_type="application/json",
+        )
+    assert [e["habit_id"] for _, e in recording] == [h.id] * 3
+
+
+@pytest.mark.django_db
+def test_no_event_before_commit(recording, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=False):
+        HabitLogFactory()
+    assert recording == []
+
+
+@pytest.mark.django_db
+def test_sse_stream_yields_habit_events(recording):
+    u = UserFactory()
+    request = AsyncRequestFactory().get("/today/events/", {"client": "ab" * 16})
+    request.user = u
+    response = today_events(request)
+    assert response["Content-Type"] == "text/event-stream"
+
+    async def run():
+        stream = aiter(response.streaming_content)
+        first = await anext(stream)
+        broker = events.get_broker()
+        broker.publish(u.id, {"habit_id": 6, "origin": "ab" * 16})
+        broker.publish(u.id, {"habit_id": 7, "date": "2025-08-01", "origin": "cd" * 16})
+        chunk = await anext(stream)
+        await stream.aclose()
+        return first, chunk.decode()
+
+    first, chunk = asyncio.run(run())
+    assert first.startswith(b"retry:")
+    # vlastní událost stránky (origin = client) se přeskočí
+    assert chunk.startswith("event: habit-7\n")
+    assert json.loads(chunk.split("data: ")[1]) == {"habit_id": 7, "date": "2025-08-01"}
+    assert events.get_broker().subscriber_count(u.id) == 0
+
+
+@pytest.mark.django_db
+def test_sse_disabled_under_wsgi():
+    u = UserFactory()
+    HabitFactory(user=u)
+    client = Client()
+    client.force_login(u)
+    assert client.get("/today/events/").status_code == 204
+    html = client.get("/today/").content.decode()
+    assert "sse-connect" not in html
+    assert "hx-trigger" not in html
+
+
+@pytest.mark.django_db
+def test_toggle_publishes_client_origin(
+    recording, django_capture_on_commit_callbacks
+):
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    client = Client()
+    client.force_login(u)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(f"/today/toggle/{h.id}/", headers={"X-Habits-Client": "ab" * 16})
+        client.post(f"/today/toggle/{h.id}/", headers={"X-Habits-Client": "<bad>"})
+    assert [e.get("origin") for _, e in recording] == ["ab" * 16, None]
+
+
+@pytest.mark.django_db
+def test_row_endpoint_renders_current_state():
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    HabitLogFactory(habit=h, date=dt.date.today())
+    client = Client()
+    client.force_login(u)
+    html = client.get(f"/today/row/{h.id}/").content.decode()
+    assert "✅ splněno dnes" in html
+    assert 'id="today-counter" hx-swap-oob="true"' in html
+
+    assert client.get(f"/today/row/{HabitFactory().id}/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_live_attributes_under_asgi():
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    request = AsyncRequestFactory().get("/today/")
+    request.user = u
+    html = views.today_view(request).content.decode()
+    assert 'sse-connect="/today/events/?client=' in html
+    assert '"X-Habits-Client"' in html
+    assert f'hx-trigger="sse:habit-{h.id}"' in html
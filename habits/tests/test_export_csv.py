@@ -49,3 +49,61 @@ def test_export_requires_login():
     r = client.get("/export/logs.csv")
     # redirect na login
     assert r.status_code in (301, 302)
+
+
+@pytest.mark.django_db
+def test_export_stream_matches_buffered_export():
+    u = UserFactory()
+    h = HabitFactory(user=u, name="Čtení")
+    for i in range(5):
+        HabitLogFactory(habit=h, date=dt.date(2025, 8, 1) + dt.timedelta(days=i))
+
+    client = Client()
+    client.force_login(u)
+    buffered = client.get("/export/logs.csv?ordering=date")
+    streamed = client.get("/export/logs.csv?ordering=date&stream=1")
+
+    assert streamed.streaming
+    assert streamed["Content-Type"].startswith("text/csv")
+    assert 'filename="logs.csv"' in streamed["Content-Disposition"]
+    body = b"".join(streamed.streaming_content)
+    assert body.startswith(b"\xef\xbb\xbf")
+    assert body == buffered.content
+
+
+@pytest.mark.django_db
+def test_export_stream_memory_is_flat():
+    import tracemalloc
+
+    from habits.models import HabitLog
+
+    u = UserFactory()
+    client = Client()
+    client.force_login(u)
+
+    def _peak():
+        r = client.get("/export/logs.csv?stream=1")
+        tracemalloc.start()
+        size = 0
+        for chunk in r.streaming_content:
+            size += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak, size
+
+    def _add_logs(habit, n):
+        start = dt.date(2000, 1, 1)
+        HabitLog.objects.bulk_create(
+            HabitLog(habit=habit, user=habit.user, date=start + dt.timedelta(days=i))
+            for i in range(n)
+        )
+
+    _add_logs(HabitFactory(user=u), 2000)
+    small_peak, small_size = _peak()
+    for _ in range(4):
+        _add_logs(HabitFactory(user=u), 2000)
+    big_peak, big_size = _peak()
+
+    assert big_size > 4 * small_size
+    # 5x víc řádků, ale špička paměti zůstává v řádu jedné dávky
+    assert big_peak < 2 * small_peak
@@ -0,0 +1,95 @@
+import datetime as dt
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+
+from habits import bitmaps, runs
+from habits.models import Habit, HabitLog, HabitRun, HabitYearBitmap
+from habits.synthetic import ScaleSpec, generate_chunk
+
+END = dt.date(2025, 8, 20)
+
+
+def _spec(**kwargs):
+    base = dict(users=6, habits_per_user=3, days=60, seed=7, end_date=END)
+    base.update(kwargs)
+    return ScaleSpec(**base)
+
+
+def _dataset(prefix):
+    """{index uživatele: [(periodicita, [data logů])...]} nezávisle na id."""
+    out = {}
+    for u in get_user_model().objects.filter(username__startswith=prefix):
+        out[u.username[len(prefix) :]] = [
+            (
+                h.periodicity,
+                list(h.logs.order_by("date").values_list("date", flat=True)),
+            )
+            for h in Habit.objects.filter(user=u).order_by("id")
+        ]
+    return out
+
+
+@pytest.mark.django_db
+def test_generation_is_deterministic_across_chunking():
+    spec_a = _spec(prefix="a")
+    generate_chunk(spec_a, 0, 6)
+    spec_b = _spec(prefix="b", batch_size=7)
+    for lo in range(0, 6, 2):
+        generate_chunk(spec_b, lo, lo + 2)
+
+    a, b = _dataset("a"), _dataset("b")
+    assert len(a) == 6 and a == b
+    assert HabitLog.objects.filter(user__username__startswith="a").count() > 0
+    log = HabitLog.objects.select_related("habit").first()
+    assert log.user_id == log.habit.user_id
+
+
+@pytest.mark.django_db
+def test_derived_stores_match_rebuild():
+    generate_chunk(_spec(), 0, 6)
+    ids = list(Habit.objects.values_list("id", flat=True))
+    written_runs = list(HabitRun.objects.order_by("habit_id", "start").values_list())
+    written_maps = sorted(
+        HabitYearBitmap.objects.values_list("habit_id", "year", "data")
+    )
+
+    runs.rebuild(ids)
+    bitmaps.rebuild(ids)
+    rebuilt_runs = list(HabitRun.objects.order_by("habit_id", "start").values_list())
+    rebuilt_maps = sorted(
+        HabitYearBitmap.objects.values_list("habit_id", "year", "data")
+    )
+    assert [r[1:] for r in written_runs] == [r[1:] for r in rebuilt_runs]
+    assert [(h, y, bytes(d)) for h, y, d in written_maps] == [
+        (h, y, bytes(d)) for h, y, d in rebuilt_maps
+    ]
+
+
+@pytest.mark.django_db
+def test_distribution_knobs():
+    generate_chunk(_spec(weekly_share=0.0, daily_rate=1.0), 0, 2)
+    assert set(Habit.objects.values_list("periodicity", flat=True)) == {"daily"}
+    assert HabitLog.objects.count() == 2 * 3 * 60
+
+    generate_chunk(_spec(prefix="idle", active_share=0.0), 0, 3)
+    assert not HabitLog.objects.filter(user__username__startswith="idle").exists()
+
+
+@pytest.mark.django_db
+def test_command_scale_mode_reports_and_resumes():
+    out = io.StringIO()
+    call_command(
+        "fill_demo_data", users=5, habits_per_user=2, days=30, chunk_users=2, stdout=out
+    )
+    assert "řádků/s" in out.getvalue()
+    assert get_user_model().objects.filter(username__startswith="load").count() == 5
+
+    out = io.StringIO()
+    call_command("fill_demo_data", users=5, days=30, stdout=out)
+    assert "0 uživatelů (5 už existovalo)" in out.getvalue()
+
+    with pytest.raises(CommandError):
+        call_command("fill_demo_data", users=1, daily_rate=1.5)
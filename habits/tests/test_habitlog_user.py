@@ -0,0 +1,54 @@
+import datetime as dt
+
+import pytest
+
+from habits.models import HabitLog
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+TODAY = dt.date(2025, 8, 20)
+
+
+@pytest.mark.django_db
+def test_save_fills_user_from_habit():
+    h = HabitFactory()
+    log = HabitLog.objects.create(habit=h, date=TODAY)
+    assert log.user_id == h.user_id
+
+
+@pytest.mark.django_db
+def test_habit_owner_change_moves_logs():
+    h = HabitFactory()
+    HabitLogFactory(habit=h, date=TODAY)
+    other = UserFactory()
+    h.user = other
+    h.save()
+    assert list(HabitLog.objects.values_list("user_id", flat=True)) == [other.id]
+
+
+@pytest.mark.django_db
+def test_api_create_sets_user(client):
+    h = HabitFactory()
+    client.force_login(h.user)
+    res = client.post(
+        "/api/logs/",
+        {"habit": h.id, "date": TODAY.isoformat(), "value": 1},
+        content_type="application/json",
+    )
+    assert res.status_code == 201
+    assert HabitLog.objects.get().user_id == h.user_id
+
+
+@pytest.mark.django_db
+def test_per_user_queries_have_no_join_and_use_index():
+    u = UserFactory()
+    HabitLogFactory(habit=HabitFactory(user=u), date=TODAY)
+
+    # dnešní přehled / export / výpis logů
+    for qs in (
+        HabitLog.objects.filter(user=u, date=TODAY),
+        HabitLog.objects.filter(user=u, date__gte=TODAY - dt.timedelta(days=6)),
+        HabitLog.objects.filter(user=u).order_by("-date", "-id"),
+    ):
+        assert "JOIN" not in str(qs.query).upper()
+        assert "habitlog_user_date" in qs.explain()
@@ -1,7 +1,7 @@
-
 import datetime as dt
 
 import pytest
+from django.db.models import QuerySet
 from django.test import Client
 
 from .factories import HabitFactory, HabitLogFactory, UserFactory
@@ -20,10 +20,70 @@ def test_toggle_creates_and_deletes_today_log():
     # 1) create
     r = client.post(url, HTTP_HX_REQUEST="true")
     assert r.status_code == 200
-    assert "today-list" in r.content.decode()
+    assert f'id="habit-row-{h.id}"' in r.content.decode()
     assert h.logs.filter(date=today).count() == 1
 
     # 2) delete (toggle again)
     r = client.post(url, HTTP_HX_REQUEST="true")
     assert r.status_code == 200
     assert h.logs.filter(date=today).count() == 0
+
+
+@pytest.mark.django_db
+def test_toggle_returns_single_row_and_oob_counter():
+    u = UserFactory()
+    h = HabitFactory(user=u, periodicity="daily")
+    other = HabitFactory(user=u, name="jiny-navyk")
+    weekly = HabitFactory(user=u, periodicity="weekly", target_per_period=3)
+    HabitLogFactory(habit=weekly, date=dt.date.today())
+    client = Client()
+    client.force_login(u)
+
+    html = client.post(f"/today/toggle/{h.id}/").content.decode()
+    assert "today-list" not in html
+    assert other.name not in html
+    assert 'id="today-counter" hx-swap-oob="true"' in html
+    assert "Dnes zaznamenáno: 2 / 3" in html
+
+    html = client.post(f"/today/toggle/{weekly.id}/").content.decode()
+    assert "0 / 3 tento týden" in html
+    assert "Dnes zaznamenáno: 1 / 3" in html
+
+
+@pytest.mark.django_db
+def test_toggle_survives_concurrent_insert(monkeypatch):
+    """Souběžný požadavek stihl log založit mezi DELETE a INSERT."""
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    HabitLogFactory(habit=h, date=dt.date.today())
+    monkeypatch.setattr(QuerySet, "delete", lambda self: (0, {}))
+    client = Client()
+    client.force_login(u)
+
+    r = client.post(f"/today/toggle/{h.id}/")
+    assert r.status_code == 200
+    assert "✅ splněno dnes" in r.content.decode()
+    assert h.logs.count() == 1
+
+
+@pytest.mark.django_db
+def test_toggle_foreign_habit_is_404():
+    client = Client()
+    client.force_login(UserFactory())
+    assert client.post(f"/today/toggle/{HabitFactory().id}/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_oob_counter_counts_habits_not_logs():
+    u = UserFactory()
+    h = HabitFactory(user=u, periodicity="daily")
+    other = HabitFactory(user=u, periodicity="daily")
+    today = dt.date.today()
+    for i in range(1, 6):
+        HabitLogFactory(habit=other, date=today - dt.timedelta(days=i))
+    client = Client()
+    client.force_login(u)
+
+    r = client.post(f"/today/toggle/{h.id}/", HTTP_HX_REQUEST="true")
+    assert "Dnes zaznamenáno: 1 / 2" in r.content.decode()
+    assert "Dnes zaznamenáno: 1 / 2" in client.get("/today/").content.decode()
@@ -0,0 +1,121 @@
+import datetime as dt
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import Client
+from rest_framework.test import APIClient
+
+from habits.importer import import_logs_csv
+from habits.models import Habit, HabitLog, HabitRun
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+
+def _export(user):
+    client = Client()
+    client.force_login(user)
+    return client.get("/export/logs.csv?ordering=date").content
+
+
+@pytest.mark.django_db
+def test_roundtrip_export_to_another_user():
+    src = UserFactory()
+    h1 = HabitFactory(user=src, name="Čtení")
+    h2 = HabitFactory(user=src, name="Běh", periodicity="weekly")
+    for i in range(5):
+        HabitLogFactory(habit=h1, date=dt.date(2025, 8, 1) + dt.timedelta(days=i))
+    HabitLogFactory(habit=h2, date=dt.date(2025, 8, 2), value=3)
+
+    dst = UserFactory()
+    existing = HabitFactory(user=dst, name="Čtení")
+    text = _export(src).decode("utf-8-sig")
+
+    result = import_logs_csv(dst, io.StringIO(text), batch_size=2)
+    assert (result.rows, result.created, result.duplicates, result.invalid) == (
+        6,
+        6,
+        0,
+        0,
+    )
+    assert result.habits_created == 1  # "Běh" se založil, "Čtení" se spároval
+    assert existing.logs.count() == 5
+    assert Habit.objects.get(user=dst, name="Běh").logs.get().value == 3
+    assert list(
+        HabitRun.objects.filter(habit=existing).values_list("start", "end")
+    ) == [(dt.date(2025, 8, 1), dt.date(2025, 8, 5))]
+
+    # opakovaný import = samé duplicity
+    again = import_logs_csv(dst, io.StringIO(text))
+    assert (again.created, again.duplicates) == (0, 6)
+
+
+@pytest.mark.django_db
+def test_invalid_rows_and_header():
+    u = UserFactory()
+    h = HabitFactory(user=u, name="Čtení")
+    text = (
+        "habit_id,habit_name,date,value\n"
+        f"{h.id},Čtení,2025-08-01,1\n"
+        f"{h.id},Čtení,2025-08-01,1\n"
+        f"{h.id},Čtení,2025-13-01,1\n"
+        f"{h.id},Čtení,2025-08-02,0\n"
+        "999,Neznámý,2025-08-02,1\n"
+        "1,2\n"
+    )
+    result = import_logs_csv(u, io.StringIO(text), create_missing=False)
+    assert (result.created, result.duplicates, result.invalid) == (1, 1, 4)
+    assert len(result.errors) == 4
+    assert not Habit.objects.filter(name="Neznámý").exists()
+
+    with pytest.raises(ValueError):
+        import_logs_csv(u, io.StringIO("a,b,c\n"))
+
+
+@pytest.mark.django_db
+def test_foreign_habit_id_is_not_used():
+    u = UserFactory()
+    foreign = HabitFactory(user=UserFactory(), name="Cizí")
+    text = f"habit_id,habit_name,date,value\n{foreign.id},Cizí,2025-08-01,1\n"
+    import_logs_csv(u, io.StringIO(text))
+    assert not foreign.logs.exists()
+    assert Habit.objects.get(user=u, name="Cizí").logs.count() == 1
+
+
+@pytest.mark.django_db
+def test_import_command(tmp_path):
+    u = UserFactory(username="importer")
+    path = tmp_path / "logs.csv"
+    path.write_bytes(
+        "\ufeffhabit_id,habit_name,date,value\n1,Čtení,2025-08-01,1\n".encode("utf-8")
+    )
+    out = io.StringIO()
+    call_command("import_logs", str(path), "--user", "importer", stdout=out)
+    assert "řádků/s" in out.getvalue()
+    assert HabitLog.objects.filter(user=u).count() == 1
+
+    with pytest.raises(CommandError):
+        call_command("import_logs", str(path), "--user", "nobody")
+
+
+@pytest.mark.django_db
+def test_import_endpoint():
+    src = UserFactory()
+    h = HabitFactory(user=src, name="Čtení")
+    HabitLogFactory(habit=h, date=dt.date(2025, 8, 1))
+    content = _export(src)
+
+    dst = UserFactory()
+    client = APIClient()
+    client.force_authenticate(user=dst)
+    upload = SimpleUploadedFile("logs.csv", content, content_type="text/csv")
+    res = client.post("/api/logs/import/", {"file": upload}, format="multipart")
+    assert res.status_code == 200, res.content
+    assert res.json()["created"] == 1
+    assert HabitLog.objects.filter(user=dst).count() == 1
+
+    assert client.post("/api/logs/import/", {}, format="multipart").status_code == 400
+    bad = SimpleUploadedFile("x.csv", b"nope\n", content_type="text/csv")
+    res = client.post("/api/logs/import/", {"file": bad}, format="multipart")
+    assert res.status_code == 400
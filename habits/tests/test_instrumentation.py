@@ -0,0 +1,129 @@
+import json
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from habits.instrumentation import RequestMetrics, _current
+from habits.models import Habit
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def request_log(caplog):
+    caplog.set_level(logging.INFO, logger="habits.requests")
+
+    def lines():
+        return [
+            json.loads(r.getMessage())
+            for r in caplog.records
+            if r.name == "habits.requests"
+        ]
+
+    return lines
+
+
+@pytest.fixture
+def user_client(client):
+    u = UserFactory(is_staff=True)
+    habit = HabitFactory(user=u)
+    HabitLogFactory(habit=habit)
+    client.force_login(u)
+    return u, client
+
+
+def test_api_request_gets_server_timing_and_log_line(user_client, request_log):
+    u, client = user_client
+    res = client.get("/api/stats/")
+    assert res.status_code == 200
+    timing = res["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert "view;dur=" in timing and "total;dur=" in timing
+
+    (record,) = request_log()
+    assert record["view"] == "stats"
+    assert record["path"] == "/api/stats/"
+    assert record["status"] == 200
+    assert record["user_id"] == u.id
+    assert record["queries"] > 0
+    assert f'"{record["queries"]} queries"' in timing
+    assert record["db_ms"] <= record["view_ms"] <= record["total_ms"]
+
+
+def test_viewset_and_plain_views_logged(user_client, request_log):
+    _, client = user_client
+    client.get("/api/habits/")
+    client.get("/today/")
+    client.get("/healthz/")
+    views = [r["view"] for r in request_log()]
+    assert views == ["habits-list", "today", "healthz"]
+
+
+def test_duplicate_queries_counted():
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        for _ in range(3):
+            list(Habit.objects.filter(pk=1))
+        list(Habit.objects.filter(pk=2))
+    finally:
+        _current.reset(token)
+    assert metrics.queries == 4
+    assert metrics.duplicates == 2
+    (dup,) = metrics.top_duplicates()
+    assert dup["count"] == 3 and "habits_habit" in dup["sql"]
+
+    # mimo požadavek se nic neměří
+    list(Habit.objects.all())
+    assert metrics.queries == 4
+
+
+@pytest.mark.urls("habits.tests.urls_async")
+def test_async_view_queries_counted(user_client, request_log):
+    _, client = user_client
+    aclient = AsyncClient()
+    aclient.cookies = client.cookies
+    res = async_to_sync(aclient.get)("/api/stats/")
+    assert res.status_code == 200
+    (record,) = request_log()
+    assert record["view"] == "stats"
+    assert record["queries"] >= 4  # session + uživatel + verze + statistiky
+    assert "db;dur=" in res["Server-Timing"]
+
+
+def test_server_timing_only_for_staff_or_debug(client, settings):
+    u = UserFactory()
+    client.force_login(u)
+    assert "Server-Timing" not in client.get("/api/stats/")
+    client.logout()
+    assert "Server-Timing" not in client.get("/healthz/")
+
+    settings.DEBUG = True
+    assert "Server-Timing" in client.get("/healthz/")
+
+
+def test_log_write_error_does_not_break_response(user_client, tmp_path):
+    _, client = user_client
+    handler = logging.FileHandler(tmp_path / "log.jsonl", delay=True)
+    (tmp_path / "log.jsonl").mkdir()  # open() selže
+    logger = logging.getLogger("habits.requests")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        assert client.get("/healthz/").status_code == 200
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+
+
+def test_disabled(user_client, settings, request_log):
+    _, client = user_client
+    settings.HABITS_INSTRUMENTATION = False
+    res = client.get("/healthz/")
+    assert res.status_code == 200
+    assert "Server-Timing" not in res
+    assert request_log() == []
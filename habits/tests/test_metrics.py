@@ -0,0 +1,89 @@
+import datetime as dt
+import re
+
+import pytest
+
+from habits.metrics import Registry, registry
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+
+def _value(text: str, sample: str) -> float:
+    match = re.search(rf"^{re.escape(sample)} (\S+)$", text, re.M)
+    return float(match.group(1)) if match else 0.0
+
+
+def _scrape(client) -> str:
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res["Content-Type"].startswith("text/plain; version=0.0.4")
+    return res.content.decode()
+
+
+def test_registry_render_format():
+    reg = Registry()
+    hits = reg.counter("t_hits_total", "Hits.", labels=("kind",))
+    lat = reg.histogram("t_seconds", "Latency.", buckets=(0.1, 1))
+    hits.inc(kind='a"b')
+    hits.inc(2, kind='a"b')
+    for v in (0.05, 0.5, 3):
+        lat.observe(v)
+    text = reg.render()
+    assert "# TYPE t_hits_total counter" in text
+    assert 't_hits_total{kind="a\\"b"} 3' in text
+    assert "# TYPE t_seconds histogram" in text
+    assert 't_seconds_bucket{le="0.1"} 1' in text
+    assert 't_seconds_bucket{le="1"} 2' in text
+    assert 't_seconds_bucket{le="+Inf"} 3' in text
+    assert "t_seconds_count 3" in text
+    assert "t_seconds_sum 3.55" in text
+
+
+def test_file_store_sums_processes(tmp_path, settings):
+    settings.HABITS_METRICS_FLUSH_INTERVAL = 0
+    workers = [Registry(directory=tmp_path) for _ in range(3)]
+    for i, reg in enumerate(workers, start=1):
+        reg.counter("t_total", "T.").inc(i)
+        reg.histogram("t_seconds", "T.", buckets=(1,)).observe(0.5)
+    assert len(list(tmp_path.glob("*.json"))) == 3
+
+    text = workers[0].render()
+    assert "t_total 6" in text
+    assert 't_seconds_bucket{le="1"} 3' in text
+    assert "t_seconds_count 3" in text
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_tracks_app_activity(client):
+    before = registry.collect()
+    user = UserFactory()
+    habit = HabitFactory(user=user)
+    HabitLogFactory(habit=habit, date=dt.date.today() - dt.timedelta(days=1))
+    client.force_login(user)
+
+    assert client.get("/api/stats/").status_code == 200
+    assert client.get("/api/stats/").status_code == 200  # z cache
+    client.post(f"/today/toggle/{habit.id}/")
+    export = client.get("/export/logs.csv")
+
+    text = _scrape(client)
+    old = registry.render(before)
+    for sample, delta in [
+        ('habits_request_duration_seconds_count{view="stats",method="GET"}', 2),
+        ("habits_compute_user_stats_seconds_count", 1),
+        ('habits_compute_user_stats_habits_bucket{le="1"}', 1),
+        ('habits_cache_requests_total{cache="stats",result="hit"}', 1),
+        ('habits_cache_requests_total{cache="stats",result="miss"}', 1),
+        ('habits_log_writes_total{op="create"}', 2),
+        ("habits_csv_export_bytes_total", len(export.content)),
+    ]:
+        assert _value(text, sample) - _value(old, sample) == delta, sample
+    assert 'habits_cache_hit_ratio{cache="stats"}' in text
+
+
+def test_metrics_restricted_to_allowed_ips(client, settings):
+    assert client.get("/metrics", REMOTE_ADDR="10.0.0.5").status_code == 403
+    settings.HABITS_METRICS_ALLOWED_IPS = None
+    assert client.get("/metrics", REMOTE_ADDR="10.0.0.5").status_code == 200
+    settings.HABITS_METRICS = False
+    assert client.get("/metrics").status_code == 404
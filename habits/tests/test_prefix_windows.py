@@ -0,0 +1,105 @@
+import datetime as dt
+import random
+
+import pytest
+from rest_framework.test import APIClient
+
+from habits.prefix import PrefixIndex
+from habits.runs import runs_from_dates
+from habits.stats import (
+    compute_user_stats,
+    parse_windows,
+    success_ratio_daily,
+    success_ratio_weekly,
+)
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+START = dt.date(2025, 8, 13)
+WINDOWS = (1, 3, 7, 10, 13, 14, 15, 30, 90, 365)
+
+
+def _random_pairs(seed, days=500, p=0.5):
+    rng = random.Random(seed)
+    return [
+        (START - dt.timedelta(days=k), rng.randint(1, 3))
+        for k in range(days)
+        if rng.random() < p
+    ]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_prefix_index_matches_window_helpers(seed):
+    pairs = _random_pairs(seed)
+    dates = {d for d, _ in pairs}
+    origin = START - dt.timedelta(days=max(WINDOWS) - 1)
+
+    daily = PrefixIndex.from_runs(runs_from_dates(dates), origin, START)
+    for n in WINDOWS:
+        assert daily.daily_ratio(n) == success_ratio_daily(dates, n, START)
+
+    for target in (1, 2, 4):
+        weekly = PrefixIndex(pairs, origin, START, target)
+        for n in WINDOWS:
+            assert weekly.weekly_ratio(n) == pytest.approx(
+                success_ratio_weekly(pairs, target, n, START)
+            ), (target, n)
+
+
+def test_window_longer_than_history():
+    index = PrefixIndex([(START, 1)], START - dt.timedelta(days=364), START)
+    assert index.daily_ratio(365) == pytest.approx(1 / 365)
+
+
+def test_parse_windows():
+    assert parse_windows(None) == (7, 30)
+    assert parse_windows("365,7, 30,7") == (7, 30, 365)
+    for raw in ("abc", "0", "-3", "99999", ",".join(str(i) for i in range(1, 20))):
+        with pytest.raises(ValueError):
+            parse_windows(raw)
+
+
+@pytest.mark.django_db
+def test_compute_user_stats_custom_windows():
+    u = UserFactory()
+    h_daily = HabitFactory(user=u, periodicity="daily")
+    h_weekly = HabitFactory(user=u, periodicity="weekly", target_per_period=2)
+    daily_pairs = _random_pairs(1, days=400, p=0.6)
+    weekly_pairs = _random_pairs(2, days=400, p=0.3)
+    for d, _ in daily_pairs:
+        HabitLogFactory(habit=h_daily, date=d)
+    for d, v in weekly_pairs:
+        HabitLogFactory(habit=h_weekly, date=d, value=v)
+
+    rows = compute_user_stats(u, start_date=START, windows=(7, 90, 365))
+    by_id = {r["id"]: r for r in rows}
+    dates = {d for d, _ in daily_pairs}
+    for n in (7, 90, 365):
+        assert by_id[h_daily.id][f"success_{n}d"] == round(
+            success_ratio_daily(dates, n, START), 4
+        )
+        assert by_id[h_weekly.id][f"success_{n}d"] == round(
+            success_ratio_weekly(weekly_pairs, 2, n, START), 4
+        )
+    assert "success_30d" not in by_id[h_daily.id]
+
+
+@pytest.mark.django_db
+def test_api_stats_windows_param():
+    u = UserFactory()
+    HabitFactory(user=u)
+    client = APIClient()
+    client.force_authenticate(user=u)
+
+    res = client.get("/api/stats/?windows=7,30,90,365")
+    assert res.status_code == 200
+    item = res.json()["habits"][0]
+    for key in ("success_7d", "success_30d", "success_90d", "success_365d"):
+        assert key in item
+
+    res = client.get("/api/stats/")
+    assert set(res.json()["habits"][0]) >= {"success_7d", "success_30d"}
+
+    res = client.get("/api/stats/?windows=7,x")
+    assert res.status_code == 400
+    assert "windows" in res.json()
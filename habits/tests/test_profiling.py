@@ -0,0 +1,68 @@
+import pytest
+
+from habits.profiling import read_index
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.HABITS_PROFILING = True
+    settings.HABITS_PROFILE_DIR = tmp_path / "profiles"
+    return settings.HABITS_PROFILE_DIR
+
+
+def _login(client, **kwargs):
+    user = UserFactory(**kwargs)
+    HabitLogFactory(habit=HabitFactory(user=user))
+    client.force_login(user)
+    return user
+
+
+def test_staff_request_saves_profile_and_index(client, profiling):
+    user = _login(client, is_staff=True)
+    res = client.get("/api/stats/?profile=1")
+    assert res.status_code == 200
+    name = res["X-Profile"]
+    assert name.endswith(".prof") and "_stats_" in name
+    assert (profiling / name).exists()
+
+    (entry,) = read_index(profiling)
+    assert entry["file"] == name
+    assert entry["path"] == "/api/stats/?profile=1"
+    assert entry["user_id"] == user.id
+    functions = [f["function"] for f in entry["top"]]
+    assert any(f.startswith("stats.py:") for f in functions)
+
+
+def test_header_trigger(client, profiling):
+    _login(client, is_staff=True)
+    res = client.get("/today/", headers={"X-Profile": "1"})
+    assert res["X-Profile"].endswith(".prof")
+
+
+def test_non_staff_is_not_profiled(client, profiling):
+    _login(client)
+    assert "X-Profile" not in client.get("/api/stats/?profile=1")
+    assert not profiling.exists()
+
+
+def test_disabled_by_default(client, settings, tmp_path):
+    settings.HABITS_PROFILE_DIR = tmp_path / "profiles"
+    _login(client, is_staff=True)
+    assert "X-Profile" not in client.get("/api/stats/?profile=1")
+    assert not settings.HABITS_PROFILE_DIR.exists()
+
+
+def test_index_keeps_only_slowest(client, settings, profiling):
+    settings.HABITS_PROFILE_KEEP = 2
+    _login(client, is_staff=True)
+    for _ in range(4):
+        client.get("/api/stats/?profile=1")
+    index = read_index(profiling)
+    assert len(index) == 2
+    assert index[0]["elapsed_ms"] >= index[1]["elapsed_ms"]
+    files = {p.name for p in profiling.glob("*.prof")}
+    assert files == {e["file"] for e in index}
@@ -0,0 +1,109 @@
+"""
+Rozpočty SQL dotazů pro hlavní endpointy.
+
+Každý endpoint se změří na malém a velkém datasetu (se studenou cache).
+Počet dotazů nesmí záviset na počtu habitů a logů a nesmí překročit
+rozpočet v tabulce `BUDGETS`. Při změně view, která dotazy vědomě přidá,
+se upraví rozpočet zde.
+"""
+
+import datetime as dt
+from dataclasses import dataclass
+
+import pytest
+from django.core.cache import caches
+from django.test import Client
+
+from habits import habit_cache
+from habits.models import Habit, HabitLog
+from habits.signals import sync_after_bulk
+
+from .factories import UserFactory
+from .query_budget import format_queries, query_budget
+
+pytestmark = pytest.mark.django_db
+
+
+@dataclass(frozen=True)
+class Budget:
+    url: str
+    max_queries: int
+    method: str = "get"
+
+
+# včetně načtení session a uživatele (2 dotazy); čtení s ETagem nebo cache
+# statistik navíc načte verzi dat (UserDataVersion, 1 dotaz)
+BUDGETS = [
+    Budget("/today/", 4),
+    # zápis logu + řada + verze dat; 6 z nich jsou SAVEPOINT/RELEASE
+    Budget("/today/toggle/{habit_id}/", 16, method="post"),
+    Budget("/stats/", 6),
+    Budget("/api/stats/", 6),
+    Budget("/api/habits/", 5),
+    Budget("/api/logs/", 5),
+    Budget("/api/logs/?pagination=cursor", 4),
+    Budget("/export/logs.csv", 3),
+]
+
+SIZES = {"small": (1, 3), "large": (12, 120)}
+
+
+def _seed(habits: int, days: int):
+    user = UserFactory()
+    today = dt.date.today()
+    objs = Habit.objects.bulk_create(
+        Habit(
+            user=user,
+            name=f"h{i}",
+            periodicity=(
+                Habit.Periodicity.WEEKLY if i % 3 == 2 else Habit.Periodicity.DAILY
+            ),
+            target_per_period=1,
+        )
+        for i in range(habits)
+    )
+    HabitLog.objects.bulk_create(
+        HabitLog(habit=h, user=user, date=today - dt.timedelta(days=d), value=1)
+        for h in objs
+        for d in range(1, days + 1)
+        if d % 4  # mezery -> víc řad
+    )
+    sync_after_bulk(h.id for h in objs)
+    return user, objs[0]
+
+
+def _measure(budget: Budget, size: str):
+    user, habit = _seed(*SIZES[size])
+    client = Client()
+    client.force_login(user)
+    for cache in caches.all():
+        cache.clear()
+    habit_cache.clear()
+
+    url = budget.url.format(habit_id=habit.id)
+    label = f"{budget.method.upper()} {url} ({size})"
+    with query_budget(budget.max_queries, label) as captured:
+        res = getattr(client, budget.method)(url)
+        if res.streaming:
+            b"".join(res.streaming_content)
+    assert res.status_code == 200, label
+    return captured
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=lambda b: f"{b.method} {b.url}")
+def test_query_budget(budget):
+    small = _measure(budget, "small")
+    large = _measure(budget, "large")
+    assert len(large) == len(small), (
+        f"{budget.url}: počet dotazů roste s daty ({len(small)} -> {len(large)})\n"
+        f"{format_queries(large)}"
+    )
+
+
+def test_budget_failure_lists_sql():
+    with pytest.raises(pytest.fail.Exception) as exc:
+        with query_budget(0, "seznam habitů"):
+            list(Habit.objects.all())
+    message = str(exc.value)
+    assert message.startswith("seznam habitů: 1 dotazů, rozpočet 0")
+    assert 'FROM "habits_habit"' in message
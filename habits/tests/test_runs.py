@@ -0,0 +1,121 @@
+import datetime as dt
+import random
+
+import pytest
+
+from habits import runs
+from habits.models import HabitLog, HabitRun
+from habits.services import get_current_streak
+from habits.signals import sync_after_bulk
+from habits.stats_cache import get_user_version
+from habits.stats import longest_daily_streak, success_ratio_daily
+
+from .factories import HabitFactory, HabitLogFactory
+
+D = dt.date(2025, 8, 1)
+
+
+def _day(i):
+    return D + dt.timedelta(days=i)
+
+
+def _stored(habit):
+    return list(HabitRun.objects.filter(habit=habit).values_list("start", "end"))
+
+
+@pytest.mark.django_db
+def test_runs_extend_and_merge_on_backfill():
+    h = HabitFactory()
+    for i in (0, 1, 3, 4):
+        HabitLogFactory(habit=h, date=_day(i))
+    assert _stored(h) == [(_day(0), _day(1)), (_day(3), _day(4))]
+
+    # doplnění dne uprostřed historie sloučí obě řady
+    HabitLogFactory(habit=h, date=_day(2))
+    assert _stored(h) == [(_day(0), _day(4))]
+
+    # prodloužení zleva a zprava
+    HabitLogFactory(habit=h, date=_day(-1))
+    HabitLogFactory(habit=h, date=_day(5))
+    assert _stored(h) == [(_day(-1), _day(5))]
+
+
+@pytest.mark.django_db
+def test_runs_shrink_and_split_on_delete():
+    h = HabitFactory()
+    logs = {i: HabitLogFactory(habit=h, date=_day(i)) for i in range(6)}
+
+    logs[3].delete()
+    assert _stored(h) == [(_day(0), _day(2)), (_day(4), _day(5))]
+
+    logs[0].delete()
+    logs[5].delete()
+    assert _stored(h) == [(_day(1), _day(2)), (_day(4), _day(4))]
+
+    logs[4].delete()
+    assert _stored(h) == [(_day(1), _day(2))]
+
+    HabitLog.objects.filter(habit=h).delete()
+    assert _stored(h) == []
+
+
+@pytest.mark.django_db
+def test_moving_log_to_other_habit_resyncs_both():
+    old, new = HabitFactory(), HabitFactory()
+    log = HabitLogFactory(habit=old, date=_day(0))
+    old_version = get_user_version(old.user_id)
+    new_version = get_user_version(new.user_id)
+
+    log.habit = new
+    log.save()
+
+    assert _stored(old) == []
+    assert _stored(new) == [(_day(0), _day(0))]
+    assert get_current_streak(old, start_date=_day(0)) == 0
+    assert get_current_streak(new, start_date=_day(0)) == 1
+    assert get_user_version(old.user_id) > old_version
+    assert get_user_version(new.user_id) > new_version
+
+
+@pytest.mark.django_db
+def test_incremental_runs_match_rebuild_on_random_history():
+    rng = random.Random(3)
+    h = HabitFactory()
+    present = {}
+    for _ in range(150):
+        i = rng.randrange(60)
+        if i in present:
+            present.pop(i).delete()
+        else:
+            present[i] = HabitLogFactory(habit=h, date=_day(i))
+
+    incremental = _stored(h)
+    assert incremental == runs.runs_from_dates(_day(i) for i in present)
+    sync_after_bulk([h.id])
+    assert _stored(h) == incremental
+
+
+def test_daily_metrics_match_set_based_helpers():
+    rng = random.Random(5)
+    dates = {_day(i) for i in range(-200, 10) if rng.random() < 0.7}
+    habit_runs = runs.runs_from_dates(dates)
+    for start in (_day(0), _day(-13), _day(9)):
+        visible = {d for d in dates if d <= start}
+        current, longest, ratios = runs.daily_metrics(habit_runs, start, (1, 7, 30))
+        streak = 0
+        while start - dt.timedelta(days=streak) in visible:
+            streak += 1
+        assert current == streak
+        assert longest == longest_daily_streak(visible)
+        for n in (1, 7, 30):
+            assert ratios[n] == success_ratio_daily(visible, n, start)
+
+
+@pytest.mark.django_db
+def test_get_current_streak_daily_is_single_lookup(django_assert_num_queries):
+    h = HabitFactory(periodicity="daily")
+    for i in range(10):
+        HabitLogFactory(habit=h, date=_day(i))
+    with django_assert_num_queries(1):
+        assert get_current_streak(h, start_date=_day(5)) == 6
+    assert get_current_streak(h, start_date=_day(12)) == 0
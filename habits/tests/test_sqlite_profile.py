@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+
+import pytest
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper as BaseWrapper
+
+from habits.backends.sqlite3.base import DatabaseWrapper
+from habits.sqlite import apply_pragmas
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -64000,
+    "mmap_size": 268435456,
+}
+
+
+def _wrapper(cls, path, alias="tuned"):
+    settings_dict = {
+        **connections["default"].settings_dict,
+        "ENGINE": "habits.backends.sqlite3",
+        "NAME": str(path),
+    }
+    return cls(settings_dict, alias=alias)
+
+
+@pytest.fixture
+def unblocked(django_db_blocker):
+    """Vlastní spojení na dočasné DB mimo testovací databázi."""
+    with django_db_blocker.unblock():
+        yield
+
+
+def test_apply_pragmas(tmp_path, unblocked):
+    conn = _wrapper(DatabaseWrapper, tmp_path / "db.sqlite3")
+    conn.ensure_connection()
+    try:
+        applied = apply_pragmas(conn, PRAGMAS)
+    finally:
+        conn.close()
+    assert applied == {
+        "journal_mode": "wal",
+        "synchronous": 1,
+        "busy_timeout": 5000,
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+    }
+    # journal_mode zůstává uložený v souboru DB
+    raw = sqlite3.connect(tmp_path / "db.sqlite3")
+    assert raw.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    raw.close()
+
+
+def test_connection_created_hook(tmp_path, settings, unblocked):
+    settings.HABITS_SQLITE_PRAGMAS = {"journal_mode": "WAL", "busy_timeout": 1234}
+    conn = _wrapper(DatabaseWrapper, tmp_path / "db.sqlite3")
+    conn.ensure_connection()
+    try:
+        assert conn.connection.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize(
+    "cls, expect_error",
+    [(BaseWrapper, True), (DatabaseWrapper, False)],
+    ids=["deferred", "immediate"],
+)
+def test_read_then_write_transactions(tmp_path, unblocked, cls, expect_error):
+    """Čtení a pak zápis v transakci: deferred BEGIN hned "locked", IMMEDIATE čeká."""
+    path = tmp_path / "db.sqlite3"
+    setup = sqlite3.connect(path)
+    setup.execute("PRAGMA journal_mode = WAL")
+    setup.execute("CREATE TABLE t (x INTEGER)")
+    setup.commit()
+    setup.close()
+
+    in_transaction, release = threading.Event(), threading.Event()
+    errors = []
+
+    def _writer(alias, first):
+        conn = _wrapper(cls, path, alias)
+        try:
+            conn.ensure_connection()
+            conn.connection.execute("PRAGMA busy_timeout = 5000")
+            if not first:
+                # první zapisovatel pokračuje, až druhý stihne začít transakci
+                threading.Timer(0.2, release.set).start()
+            conn._start_transaction_under_autocommit()  # jako atomic()
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT count(*) FROM t")
+                if first:
+                    in_transaction.set()
+                    release.wait(5)
+                cursor.execute("INSERT INTO t VALUES (1)")
+            conn.connection.execute("COMMIT")
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+            release.set()
+        finally:
+            conn.close()
+
+    t1 = threading.Thread(target=_writer, args=("first", True))
+    t1.start()
+    in_transaction.wait(5)
+    t2 = threading.Thread(target=_writer, args=("second", False))
+    t2.start()
+    t1.join(10)
+    t2.join(10)
+    assert bool(errors) == expect_error, errors
+    if expect_error:
+        assert "locked" in str(errors[0])
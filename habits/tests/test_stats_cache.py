@@ -0,0 +1,151 @@
+import datetime as dt
+
+import pytest
+from django.core.cache import caches
+from django.test import Client
+from rest_framework.test import APIClient
+
+from habits.models import HabitLog, UserDataVersion
+from habits.signals import sync_after_bulk
+from habits.stats_cache import (
+    bump_user_version,
+    cache_info,
+    get_user_stats,
+    get_user_version,
+)
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+START = dt.date(2025, 8, 13)
+
+
+@pytest.mark.django_db
+def test_second_call_is_a_hit_with_one_query(django_assert_num_queries):
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    HabitLogFactory(habit=h, date=START)
+
+    first = get_user_stats(u, start_date=START)
+    # jen verze dat z DB
+    with django_assert_num_queries(1):
+        assert get_user_stats(u, start_date=START) == first
+
+    info = cache_info()
+    assert (info["hits"], info["misses"]) == (1, 1)
+    assert info["hit_ratio"] == 0.5
+
+
+@pytest.mark.django_db
+def test_log_create_and_delete_invalidate():
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    assert get_user_stats(u, START)[0]["current_streak"] == 0
+
+    log = HabitLogFactory(habit=h, date=START)
+    assert get_user_stats(u, START)[0]["current_streak"] == 1
+
+    log.delete()
+    assert get_user_stats(u, START)[0]["current_streak"] == 0
+    assert cache_info()["hits"] == 0
+
+
+@pytest.mark.django_db
+def test_habit_changes_invalidate():
+    u = UserFactory()
+    h = HabitFactory(user=u, name="A")
+    assert get_user_stats(u, START)[0]["name"] == "A"
+
+    h.name = "B"
+    h.save()
+    assert get_user_stats(u, START)[0]["name"] == "B"
+
+    h.delete()
+    assert get_user_stats(u, START) == []
+
+
+@pytest.mark.django_db
+def test_other_users_writes_do_not_invalidate():
+    u, other = UserFactory(), UserFactory()
+    HabitFactory(user=u)
+    version = get_user_version(u.id)
+    HabitLogFactory(habit=HabitFactory(user=other), date=START)
+    assert get_user_version(u.id) == version
+
+
+@pytest.mark.django_db
+def test_bulk_sync_and_toggle_invalidate():
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    get_user_stats(u, START)
+
+    HabitLog.objects.bulk_create([HabitLog(habit=h, user=h.user, date=START)])
+    sync_after_bulk([h.id])
+    assert get_user_stats(u, START)[0]["current_streak"] == 1
+
+    client = Client()
+    client.force_login(u)
+    before = get_user_stats(u)[0]["current_streak"]
+    client.post(f"/today/toggle/{h.id}/", HTTP_HX_REQUEST="true")
+    assert get_user_stats(u)[0]["current_streak"] != before
+
+
+@pytest.mark.django_db
+def test_version_is_monotonic():
+    u = UserFactory()
+    v1 = get_user_version(u.id)
+    bump_user_version(u.id)
+    v2 = get_user_version(u.id)
+    assert v2 > v1
+    bump_user_version(u.id)
+    assert get_user_version(u.id) > v2
+
+
+@pytest.mark.django_db
+def test_version_does_not_depend_on_cache():
+    """Verze je v DB: worker s vlastní (prázdnou) cache vidí stejnou verzi."""
+    u = UserFactory()
+    HabitLogFactory(habit=HabitFactory(user=u), date=START)
+    version = get_user_version(u.id)
+    assert version > 0
+    for cache in caches.all():
+        cache.clear()
+    assert get_user_version(u.id) == version
+
+
+@pytest.mark.django_db
+def test_user_delete_with_habits():
+    u = UserFactory()
+    HabitLogFactory(habit=HabitFactory(user=u), date=START)
+    u.delete()
+    assert not UserDataVersion.objects.exists()
+
+
+@pytest.mark.django_db
+def test_api_stats_served_from_cache():
+    u = UserFactory()
+    HabitFactory(user=u)
+    client = APIClient()
+    client.force_authenticate(user=u)
+    assert client.get("/api/stats/").status_code == 200
+    assert client.get("/api/stats/").status_code == 200
+    assert cache_info()["hits"] == 1
+
+
+@pytest.mark.django_db
+def test_file_based_backend(settings, tmp_path):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    settings.HABITS_STATS_CACHE_TTL = 60
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    get_user_stats(u, START)
+    assert get_user_stats(u, START)[0]["current_streak"] == 0
+    assert cache_info()["hits"] == 1
+
+    HabitLogFactory(habit=h, date=START)
+    assert get_user_stats(u, START)[0]["current_streak"] == 1
+    assert any(tmp_path.iterdir())
@@ -0,0 +1,102 @@
+import datetime as dt
+import random
+from collections import defaultdict
+
+import pytest
+
+from habits.models import Habit
+from habits.services import calc_daily_streak, calc_weekly_streak
+from habits.stats import (
+    _start_of_week,
+    compute_user_stats,
+    longest_daily_streak,
+    longest_weekly_streak,
+    success_ratio_daily,
+    success_ratio_weekly,
+)
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+START = dt.date(2025, 8, 13)
+
+
+def _reference_stats(h, start_date):
+    """Původní výpočet: dotazy per habit + čisté funkce nad sety."""
+    logs_qs = h.logs.filter(date__lte=start_date)
+    if h.periodicity == Habit.Periodicity.WEEKLY:
+        pairs = list(logs_qs.values_list("date", "value"))
+        week_sums = defaultdict(int)
+        for d, v in pairs:
+            week_sums[_start_of_week(d)] += int(v)
+        t = h.target_per_period
+        return {
+            "current_streak": calc_weekly_streak(pairs, t, start_date=start_date),
+            "longest_streak": longest_weekly_streak(week_sums, t),
+            "success_7d": round(success_ratio_weekly(pairs, t, 7, start_date), 4),
+            "success_30d": round(success_ratio_weekly(pairs, t, 30, start_date), 4),
+        }
+    dates = set(logs_qs.values_list("date", flat=True))
+    return {
+        "current_streak": calc_daily_streak(dates, start_date=start_date),
+        "longest_streak": longest_daily_streak(dates),
+        "success_7d": round(success_ratio_daily(dates, 7, start_date), 4),
+        "success_30d": round(success_ratio_daily(dates, 30, start_date), 4),
+    }
+
+
+def _seed_random_history(user, habits=6, days=120, seed=7):
+    rng = random.Random(seed)
+    out = []
+    for i in range(habits):
+        weekly = i % 2 == 1
+        h = HabitFactory(
+            user=user,
+            periodicity="weekly" if weekly else "daily",
+            target_per_period=rng.randint(1, 4) if weekly else 1,
+        )
+        for k in range(days):
+            if rng.random() < 0.6:
+                HabitLogFactory(
+                    habit=h, date=START - dt.timedelta(days=k), value=rng.randint(1, 2)
+                )
+        out.append(h)
+    return out
+
+
+@pytest.mark.django_db
+def test_engine_matches_reference_per_habit():
+    u = UserFactory()
+    habits = _seed_random_history(u)
+    # logy po start_date se nesmí započítat
+    HabitLogFactory(habit=habits[0], date=START + dt.timedelta(days=1))
+
+    for start in (START, START - dt.timedelta(days=17)):
+        by_id = {row["id"]: row for row in compute_user_stats(u, start_date=start)}
+        for h in habits:
+            row = by_id[h.id]
+            for key, expected in _reference_stats(h, start).items():
+                assert row[key] == expected, (h.periodicity, key)
+
+
+@pytest.mark.django_db
+def test_engine_query_count_is_constant(django_assert_num_queries):
+    u = UserFactory()
+    _seed_random_history(u, habits=2, days=10)
+    with django_assert_num_queries(3):
+        compute_user_stats(u, start_date=START)
+
+    _seed_random_history(u, habits=10, days=30, seed=11)
+    with django_assert_num_queries(3):
+        compute_user_stats(u, start_date=START)
+
+
+@pytest.mark.django_db
+def test_engine_ignores_other_users_logs():
+    u, other = UserFactory(), UserFactory()
+    h = HabitFactory(user=u)
+    foreign = HabitFactory(user=other)
+    HabitLogFactory(habit=foreign, date=START)
+
+    rows = compute_user_stats(u, start_date=START)
+    assert [r["id"] for r in rows] == [h.id]
+    assert rows[0]["current_streak"] == 0
@@ -0,0 +1,86 @@
+import datetime as dt
+import random
+
+import pytest
+from rest_framework.test import APIClient
+
+from habits.stats import compute_user_history, compute_user_stats
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+START = dt.date(2025, 8, 13)
+
+
+def _seed(user):
+    rng = random.Random(9)
+    h_daily = HabitFactory(user=user, periodicity="daily")
+    h_weekly = HabitFactory(user=user, periodicity="weekly", target_per_period=3)
+    for k in range(150):
+        d = START - dt.timedelta(days=k)
+        if rng.random() < 0.7:
+            HabitLogFactory(habit=h_daily, date=d)
+        if rng.random() < 0.45:
+            HabitLogFactory(habit=h_weekly, date=d, value=rng.randint(1, 2))
+    return h_daily, h_weekly
+
+
+@pytest.mark.django_db
+def test_history_matches_stats_computed_per_day():
+    u = UserFactory()
+    _seed(u)
+    date_from = START - dt.timedelta(days=40)
+    history = compute_user_history(u, date_from, START, windows=(7, 30))
+
+    for habit in history:
+        assert len(habit["series"]) == 41
+        for row in habit["series"]:
+            day = dt.date.fromisoformat(row["date"])
+            ref = {r["id"]: r for r in compute_user_stats(u, start_date=day)}
+            ref = ref[habit["id"]]
+            assert row["current_streak"] == ref["current_streak"], row
+            assert row["longest_streak_so_far"] == ref["longest_streak"], row
+            assert row["success_7d"] == ref["success_7d"], row
+            assert row["success_30d"] == ref["success_30d"], row
+
+
+@pytest.mark.django_db
+def test_history_query_count_is_constant(django_assert_num_queries):
+    u = UserFactory()
+    _seed(u)
+    with django_assert_num_queries(3):
+        compute_user_history(u, START - dt.timedelta(days=365), START)
+
+
+@pytest.mark.django_db
+def test_history_api_params_and_errors():
+    u = UserFactory()
+    h_daily, _ = _seed(u)
+    foreign = HabitFactory(user=UserFactory())
+    client = APIClient()
+    client.force_authenticate(user=u)
+
+    res = client.get(
+        f"/api/stats/history/?from=2025-08-01&to=2025-08-13&habit_id={h_daily.id}"
+        "&windows=7,90"
+    )
+    assert res.status_code == 200
+    payload = res.json()
+    assert payload["from"] == "2025-08-01"
+    assert [h["id"] for h in payload["habits"]] == [h_daily.id]
+    series = payload["habits"][0]["series"]
+    assert series[0]["date"] == "2025-08-01"
+    assert series[-1]["date"] == "2025-08-13"
+    assert {"success_7d", "success_90d"} <= set(series[0])
+
+    assert client.get("/api/stats/history/").status_code == 200
+    assert client.get("/api/stats/history/?from=2025-13-01").status_code == 400
+    assert (
+        client.get("/api/stats/history/?from=2025-08-13&to=2025-08-01").status_code
+        == 400
+    )
+    assert (
+        client.get("/api/stats/history/?from=2000-01-01&to=2025-08-01").status_code
+        == 400
+    )
+    res = client.get(f"/api/stats/history/?habit_id={foreign.id}")
+    assert res.status_code == 404
@@ -0,0 +1,83 @@
+import datetime as dt
+import random
+from collections import defaultdict
+
+import pytest
+
+from habits import stats_numpy
+from habits.services import calc_weekly_streak, get_current_streak
+from habits.stats import (
+    _start_of_week,
+    compute_user_stats,
+    longest_weekly_streak,
+    success_ratio_weekly,
+)
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+pytest.importorskip("numpy")
+
+START = dt.date(2025, 8, 13)
+WINDOWS = (3, 7, 10, 14, 30, 90)
+
+
+def _random_pairs(seed, days=400, p=0.7):
+    rng = random.Random(seed)
+    return [
+        (START - dt.timedelta(days=k), rng.randint(1, 3))
+        for k in range(days, -5, -1)
+        if rng.random() < p
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_weekly_metrics_match_pure_python(seed):
+    pairs = _random_pairs(seed, p=0.4)
+    target = seed % 4 + 1
+    for start in (START, START - dt.timedelta(days=seed * 5 + 2)):
+        visible = [(d, v) for d, v in pairs if d <= start]
+        week_sums = defaultdict(int)
+        for d, v in visible:
+            week_sums[_start_of_week(d)] += v
+
+        current, longest, ratios = stats_numpy.weekly_metrics(
+            pairs, target, start, WINDOWS
+        )
+        assert current == calc_weekly_streak(visible, target, start_date=start)
+        assert longest == longest_weekly_streak(week_sums, target)
+        for n in WINDOWS:
+            assert ratios[n] == pytest.approx(
+                success_ratio_weekly(visible, target, n, start)
+            )
+
+
+def test_empty_history():
+    assert stats_numpy.weekly_metrics([], 2, START) == (0, 0, {7: 0.0, 30: 0.0})
+
+
+def test_should_use_respects_threshold_and_availability(settings, monkeypatch):
+    settings.HABITS_NUMPY_THRESHOLD = 10
+    assert not stats_numpy.should_use(9)
+    assert stats_numpy.should_use(10)
+
+    monkeypatch.setattr(stats_numpy, "AVAILABLE", False)
+    assert not stats_numpy.should_use(10_000)
+
+
+@pytest.mark.django_db
+def test_compute_user_stats_same_result_with_numpy_backend(settings):
+    u = UserFactory()
+    h_daily = HabitFactory(user=u, periodicity="daily")
+    h_weekly = HabitFactory(user=u, periodicity="weekly", target_per_period=3)
+    for d, v in _random_pairs(1, days=120):
+        HabitLogFactory(habit=h_daily, date=d, value=1)
+    for d, v in _random_pairs(2, days=120, p=0.5):
+        HabitLogFactory(habit=h_weekly, date=d, value=v)
+
+    settings.HABITS_NUMPY_THRESHOLD = 10**9
+    pure = compute_user_stats(u, start_date=START)
+    pure_streaks = [get_current_streak(h, START) for h in (h_daily, h_weekly)]
+
+    settings.HABITS_NUMPY_THRESHOLD = 1
+    assert compute_user_stats(u, start_date=START) == pure
+    assert [get_current_streak(h, START) for h in (h_daily, h_weekly)] == pure_streaks
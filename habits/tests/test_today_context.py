@@ -0,0 +1,97 @@
+import datetime as dt
+
+import pytest
+from django.test import Client
+
+from habits import habit_cache
+from habits.models import Habit
+from habits.views import _build_today_context
+
+from .factories import HabitFactory, HabitLogFactory, UserFactory
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    """Seznam habitů se cachuje jen se sdíleným backendem."""
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    assert habit_cache.enabled()
+
+
+@pytest.mark.django_db
+def test_today_context_values():
+    u = UserFactory()
+    today = dt.date.today()
+    monday = today - dt.timedelta(days=today.weekday())
+    daily = HabitFactory(user=u)
+    weekly = HabitFactory(user=u, periodicity=Habit.Periodicity.WEEKLY)
+    HabitLogFactory(habit=daily, date=today)
+    HabitLogFactory(habit=weekly, date=monday, value=2)
+    if monday != today:
+        HabitLogFactory(habit=weekly, date=today, value=1)
+    HabitLogFactory(habit=weekly, date=monday - dt.timedelta(days=1))
+
+    ctx = _build_today_context(u)
+    assert ctx["daily"] == [{"habit": daily, "checked": True}]
+    expected = 2 if monday == today else 3
+    assert ctx["weekly"] == [{"habit": weekly, "count": expected}]
+    assert ctx["total"] == 2
+
+
+@pytest.mark.django_db
+def test_warm_today_context_is_one_query(shared_cache, django_assert_num_queries):
+    u = UserFactory()
+    HabitFactory(user=u)
+    _build_today_context(u)
+    with django_assert_num_queries(1):
+        _build_today_context(u)
+
+
+@pytest.mark.django_db
+def test_habit_writes_invalidate_cached_list(shared_cache):
+    u = UserFactory()
+    h = HabitFactory(user=u, name="stary")
+    _build_today_context(u)
+
+    h.name = "novy"
+    h.save()
+    ctx = _build_today_context(u)
+    assert ctx["daily"][0]["habit"].name == "novy"
+
+    HabitFactory(user=u)
+    assert len(_build_today_context(u)["daily"]) == 2
+
+    h.delete()
+    assert len(_build_today_context(u)["daily"]) == 1
+
+
+@pytest.mark.django_db
+def test_today_page_warm_needs_one_db_roundtrip(
+    shared_cache, django_assert_num_queries
+):
+    u = UserFactory()
+    HabitFactory(user=u)
+    client = Client()
+    client.force_login(u)
+    client.get("/today/")
+    # session + user (auth) + jeden dotaz dnešního přehledu
+    with django_assert_num_queries(3):
+        assert client.get("/today/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_process_local_cache_reads_habits_from_db(django_assert_num_queries):
+    """S locmem by jiný worker změnu nepoznal -> žádná cache seznamu."""
+    assert not habit_cache.enabled()
+    u = UserFactory()
+    h = HabitFactory(user=u)
+    _build_today_context(u)
+    # změna "v jiném procesu": signály tohoto procesu se neuplatní
+    Habit.objects.filter(pk=h.pk).update(name="jinde")
+    with django_assert_num_queries(2):
+        ctx = _build_today_context(u)
+    assert ctx["daily"][0]["habit"].name == "jinde"
@@ -0,0 +1,6 @@
+from django.urls import include, path
+
+from habit_tracker.urls import urlpatterns as base_urlpatterns
+from habits.urls import async_urlpatterns
+
+urlpatterns = [path("", include(async_urlpatterns))] + base_urlpatterns
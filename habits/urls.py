@@ -1,13 +1,19 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
+from . import async_views
+
 from .views import (
     HabitLogViewSet,
     HabitViewSet,
+    StatisticsHistoryView,
     StatisticsView, 
     home,
     stats_page,      
     today_view,   
+    today_events,
+    today_row,
     toggle_today ,
     export_logs_csv  
 )
@@ -20,8 +26,22 @@ urlpatterns = [
     path("", home, name="home"),
     path("today/", today_view, name="today"),
     path("today/toggle/<int:habit_id>/", toggle_today, name="toggle_today"),
+    path("today/row/<int:habit_id>/", today_row, name="today_row"),
+    path("today/events/", today_events, name="today_events"),
     path("stats/", stats_page, name="stats_page"),
     path("api/stats/", StatisticsView.as_view(), name="stats"),
+    path(
+        "api/stats/history/", StatisticsHistoryView.as_view(), name="stats_history"
+    ),
     path("export/logs.csv", export_logs_csv, name="export_logs"),
     path("", include(router.urls)),
 ]
+
+# async (ASGI) varianty čtecích view; mají přednost před sync cestami
+async_urlpatterns = [
+    path("today/", async_views.today_view, name="today"),
+    path("api/stats/", async_views.statistics, name="stats"),
+]
+
+if getattr(settings, "HABITS_ASYNC_VIEWS", False):
+    urlpatterns = async_urlpatterns + urlpatterns
@@ -1,49 +1,169 @@
+import asyncio
 import csv
 import io
+import json
+import uuid
 
 from datetime import date
 import datetime as dt
-from collections import defaultdict
 
-from django.http import HttpResponse
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Sum
 from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
 from django.http import HttpResponse
 from django.shortcuts import render, get_object_or_404
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 
+from .conditional import ConditionalGetMixin
+from .events import CLIENT_HEADER, clean_client_id, event_origin, get_broker
+from .habit_cache import get_user_habits
+from .metrics import CSV_EXPORT_BYTES, LOG_WRITES
 from .models import Habit, HabitLog
-from .stats import compute_user_stats
+from .stats import MAX_WINDOW_DAYS, compute_user_history, parse_windows
+from .stats_cache import get_user_stats
+
+
+def filter_logs(qs, params):
+    """Filtry výpisu logů: habit_id, date__gte, date__lte, ordering (date/id)."""
+    habit_id = params.get("habit_id")
+    if habit_id:
+        try:
+            qs = qs.filter(habit_id=int(habit_id))
+        except ValueError:
+            pass
+
+    d_gte = params.get("date__gte")
+    if d_gte:
+        try:
+            qs = qs.filter(date__gte=date.fromisoformat(d_gte))
+        except ValueError:
+            pass
 
+    d_lte = params.get("date__lte")
+    if d_lte:
+        try:
+            qs = qs.filter(date__lte=date.fromisoformat(d_lte))
+        except ValueError:
+            pass
+
+    ordering = params.get("ordering", "-date")
+    if ordering.lstrip("-") in {"date", "id"}:
+        qs = qs.order_by(ordering)
+
+    return qs
 
-class StatisticsView(APIView):
+
+class StatisticsView(ConditionalGetMixin, APIView):
+    """
+    /api/stats/ — statistiky všech habitů přihlášeného uživatele.
+    ?windows=7,30,90,365 — okna úspěšnosti ve dnech (výchozí 7,30).
+    Podporuje If-None-Match / If-Modified-Since (304 bez výpočtu).
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        data = compute_user_stats(request.user)
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        try:
+            windows = parse_windows(request.query_params.get("windows"))
+        except ValueError as exc:
+            raise ValidationError({"windows": str(exc)})
+        data = get_user_stats(
+            request.user, windows=windows, version=self.data_version
+        )
         return Response({"habits": data})
 
 
+class StatisticsHistoryView(APIView):
+    """
+    /api/stats/history/?from=&to=&habit_id=&windows=
+    Denní vývoj current_streak, longest_streak_so_far a úspěšnosti v oknech.
+    Výchozí rozsah: posledních 30 dní.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        errors = {}
+
+        def _date(key, default):
+            if not params.get(key):
+                return default
+            try:
+                return date.fromisoformat(params[key])
+            except ValueError:
+                errors[key] = "Očekávám datum YYYY-MM-DD."
+                return default
+
+        date_to = _date("to", date.today())
+        date_from = _date("from", date_to - dt.timedelta(days=29))
+        try:
+            windows = parse_windows(params.get("windows"))
+        except ValueError as exc:
+            errors["windows"] = str(exc)
+
+        habit_id = params.get("habit_id")
+        if habit_id:
+            try:
+                habit_id = int(habit_id)
+            except ValueError:
+                errors["habit_id"] = "Očekávám celé číslo."
+        else:
+            habit_id = None
+
+        if not errors and date_from > date_to:
+            errors["from"] = "from musí být <= to."
+        if not errors and (date_to - date_from).days + 1 > MAX_WINDOW_DAYS:
+            errors["from"] = f"Rozsah může mít nejvýš {MAX_WINDOW_DAYS} dní."
+        if errors:
+            raise ValidationError(errors)
+
+        data = compute_user_history(
+            request.user, date_from, date_to, habit_id=habit_id, windows=windows
+        )
+        if habit_id is not None and not data:
+            raise NotFound()
+        return Response(
+            {"from": date_from.isoformat(), "to": date_to.isoformat(), "habits": data}
+        )
+
+
 from .models import Habit, HabitLog
 from .permissions import IsOwner
 from .serializers import (
+    HabitLogBulkItemSerializer,
     HabitLogCreateSerializer,
     HabitLogSerializer,
     HabitSerializer,
 )
+from .importer import import_logs_csv
+from .pagination import HabitLogKeysetPagination
+from .signals import sync_after_bulk
+
+BULK_MAX_ITEMS = 5000
+BULK_BATCH_SIZE = 500
 
 
 def home(_request):
     return HttpResponse("HabitTracker běží.")
 
 
-class HabitViewSet(viewsets.ModelViewSet):
+class HabitViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     /api/habits/ — full CRUD nad vlastními návyky
+    Výpis podporuje If-None-Match / If-Modified-Since (304 bez dotazu).
     """
     serializer_class = HabitSerializer
     permission_classes = [IsAuthenticated, IsOwner]
@@ -51,11 +171,15 @@ class HabitViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Habit.objects.filter(user=self.request.user).order_by("id")
 
+    def list(self, request, *args, **kwargs):
+        return self.not_modified(request) or super().list(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
 class HabitLogViewSet(
+    ConditionalGetMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
@@ -65,61 +189,163 @@ class HabitLogViewSet(
     """
     /api/logs/ — list/retrieve/create/delete jen pro logy přihlášeného uživatele.
     Filtrování: habit_id, date__gte, date__lte, ordering (date/id).
+    Stránkování: výchozí page number; ?pagination=cursor (nebo ?cursor=)
+    přepne na keyset stránkování po (date, id) bez COUNT(*).
+    Výpis podporuje If-None-Match / If-Modified-Since (304 bez dotazu).
     """
     permission_classes = [IsAuthenticated, IsOwner]
 
-    def get_queryset(self):
-        qs = HabitLog.objects.select_related("habit").filter(
-            habit__user=self.request.user
-        )
+    def list(self, request, *args, **kwargs):
+        return self.not_modified(request) or super().list(request, *args, **kwargs)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("pagination") == "cursor" or "cursor" in params:
+                self._paginator = HabitLogKeysetPagination()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
-        habit_id = self.request.query_params.get("habit_id")
-        if habit_id:
-            try:
-                qs = qs.filter(habit_id=int(habit_id))
-            except ValueError:
-                pass
-
-        d_gte = self.request.query_params.get("date__gte")
-        if d_gte:
-            try:
-                qs = qs.filter(date__gte=date.fromisoformat(d_gte))
-            except ValueError:
-                pass
-
-        d_lte = self.request.query_params.get("date__lte")
-        if d_lte:
-            try:
-                qs = qs.filter(date__lte=date.fromisoformat(d_lte))
-            except ValueError:
-                pass
-
-        ordering = self.request.query_params.get("ordering", "-date")
-        if ordering.lstrip("-") in {"date", "id"}:
-            qs = qs.order_by(ordering)
-
-        return qs
+    def get_queryset(self):
+        # serializer vrací jen habit pk -> žádný JOIN na habits_habit
+        qs = HabitLog.objects.filter(user=self.request.user)
+        return filter_logs(qs, self.request.query_params)
 
     def get_serializer_class(self):
         return HabitLogCreateSerializer if self.action == "create" else HabitLogSerializer
 
     http_method_names = ["get", "post", "delete", "head", "options"]
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        POST /api/logs/bulk/ — [{habit, date, value}, ...] (nebo {"items": [...]}).
+        Vlastnictví i duplicity se ověří jedním dotazem, vložení jedním
+        bulk_create v transakci. Výsledek per položka: created/duplicate/invalid.
+        """
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get("items")
+        if not isinstance(items, list):
+            raise ValidationError({"items": "Očekávám seznam položek."})
+        if len(items) > BULK_MAX_ITEMS:
+            raise ValidationError({"items": f"Nejvýš {BULK_MAX_ITEMS} položek."})
+
+        results = [None] * len(items)
+        parsed = []
+        for i, item in enumerate(items):
+            ser = HabitLogBulkItemSerializer(data=item)
+            if ser.is_valid():
+                parsed.append((i, ser.validated_data))
+            else:
+                results[i] = {"index": i, "status": "invalid", "errors": ser.errors}
+
+        habit_ids = {v["habit"] for _, v in parsed}
+        owned = set(
+            Habit.objects.filter(user=request.user, id__in=habit_ids).values_list(
+                "id", flat=True
+            )
+        )
+        existing = set()
+        if parsed and owned:
+            dates = [v["date"] for _, v in parsed]
+            existing = set(
+                HabitLog.objects.filter(
+                    habit_id__in=owned, date__gte=min(dates), date__lte=max(dates)
+                ).values_list("habit_id", "date")
+            )
+
+        to_create = []
+        for i, v in parsed:
+            key = (v["habit"], v["date"])
+            if v["habit"] not in owned:
+                results[i] = {
+                    "index": i,
+                    "status": "invalid",
+                    "errors": {"habit": ["Tento zvyk ti nepatří."]},
+                }
+            elif key in existing:
+                results[i] = {"index": i, "status": "duplicate"}
+            else:
+                existing.add(key)  # duplicita i v rámci jednoho požadavku
+                to_create.append(
+                    HabitLog(
+                        habit_id=key[0],
+                        user_id=request.user.id,
+                        date=key[1],
+                        value=v["value"],
+                    )
+                )
+                results[i] = {"index": i, "status": "created"}
+
+        if to_create:
+            with transaction.atomic():
+                HabitLog.objects.bulk_create(
+                    to_create, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True
+                )
+                # bulk_create nevolá signály -> dopočítat odvozená data
+                sync_after_bulk(log.habit_id for log in to_create)
+            LOG_WRITES.inc(len(to_create), op="create")
+
+        summary = {"created": 0, "duplicate": 0, "invalid": 0}
+        for r in results:
+            summary[r["status"]] += 1
+        return Response({"summary": summary, "results": results})
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def import_csv(self, request):
+        """
+        POST /api/logs/import/ — multipart pole `file` s CSV ve formátu exportu.
+        ?create_missing=0 — nezakládat chybějící návyky.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "Povinné pole."})
+
+        create_missing = request.query_params.get("create_missing", "1") != "0"
+        upload.file.seek(0)
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            result = import_logs_csv(
+                request.user, stream, create_missing=create_missing
+            )
+        except (UnicodeDecodeError, ValueError) as exc:
+            raise ValidationError({"file": str(exc)})
+        finally:
+            stream.detach()
+        return Response(result.as_dict())
     
 
-def _build_today_context(user):
-    today = date.today()
+def _today_rows(user, today):
+    """Agregace logů týdne per habit: checked_today a week_total."""
     monday = today - dt.timedelta(days=today.weekday())
+    return (
+        HabitLog.objects.filter(user=user, date__gte=monday, date__lte=today)
+        .values("habit_id")
+        .annotate(
+            checked_today=Count("id", filter=Q(date=today)),
+            week_total=Sum("value"),
+        )
+        .order_by()
+    )
 
-    habits = Habit.objects.filter(user=user).order_by("id")
-    logs_today = {
-        x["habit_id"]
-        for x in HabitLog.objects.filter(habit__user=user, date=today).values("habit_id")
-    }
-    logs_this_week = defaultdict(int)
-    for d, hid, val in HabitLog.objects.filter(
-        habit__user=user, date__gte=monday, date__lte=today
-    ).values_list("date", "habit_id", "value"):
-        logs_this_week[hid] += int(val)
+
+def _today_context(today, habits, rows):
+    logs_today = set()
+    logs_this_week = {}
+    for row in rows:
+        if row["checked_today"]:
+            logs_today.add(row["habit_id"])
+        logs_this_week[row["habit_id"]] = int(row["week_total"])
 
     daily, weekly = [], []
     for h in habits:
@@ -127,12 +353,40 @@ def _build_today_context(user):
             daily.append({"habit": h, "checked": h.id in logs_today})
         else:
             weekly.append({"habit": h, "count": logs_this_week.get(h.id, 0)})
-    return {"today": today, "daily": daily, "weekly": weekly}
+    return {
+        "today": today,
+        "daily": daily,
+        "weekly": weekly,
+        "done": len(logs_today),
+        "total": len(daily) + len(weekly),
+    }
+
+
+def _live_context(request) -> dict:
+    """
+    Živé aktualizace (SSE) jen pod ASGI – pod WSGI by každý otevřený panel
+    držel vlákno workeru. `client_id` označí stránku, aby jí SSE neposílalo
+    její vlastní toggly (řádek už přepsala odpověď na POST).
+    """
+    if not isinstance(request, ASGIRequest):
+        return {"live_updates": False}
+    return {"live_updates": True, "client_id": uuid.uuid4().hex}
+
+
+def _build_today_context(user):
+    """
+    Jeden agregovaný dotaz nad logy týdne (index user+date, bez JOINu);
+    seznam habitů jde z paměťové cache, je-li cache sdílená (habits.habit_cache).
+    """
+    today = date.today()
+    habits = get_user_habits(user.id)
+    return _today_context(today, habits, _today_rows(user, today))
 
 
 @login_required
 def today_view(request):
     ctx = _build_today_context(request.user)
+    ctx.update(_live_context(request))
     # HTMX požadavek? vrať jen partial
     if request.headers.get("HX-Request") == "true":
         return render(request, "habits/_today_list.html", ctx)
@@ -141,25 +395,157 @@ def today_view(request):
 
 @login_required
 def stats_page(request):
-    data = compute_user_stats(request.user)
+    data = get_user_stats(request.user)
     return render(request, "habits/stats.html", {"stats": data})
 
 
+def _toggle_log(habit: Habit, day) -> bool:
+    """
+    Atomický toggle logu (habit, day); vrací True, pokud log po operaci existuje.
+    Souběžné požadavky (dvojklik) nespadnou na unikátním omezení – kdo prohraje
+    závod o INSERT, jen potvrdí existující záznam.
+    """
+    with transaction.atomic():
+        deleted, _ = HabitLog.objects.filter(habit=habit, date=day).delete()
+        if deleted:
+            return False
+        try:
+            with transaction.atomic():
+                HabitLog.objects.create(habit=habit, date=day, value=1)
+        except IntegrityError:
+            pass
+        return True
+
+
+def _render_row(request, habit: Habit, today, checked: bool | None = None):
+    """Řádek habitu + out-of-band počítadlo (odpověď toggle i živé aktualizace)."""
+    item = {"habit": habit, "checked": checked}
+    if checked is None or habit.periodicity == Habit.Periodicity.WEEKLY:
+        rows = _today_rows(request.user, today).filter(habit_id=habit.id)
+        row = next(iter(rows), None)
+        item["checked"] = bool(row and row["checked_today"])
+        item["count"] = int(row["week_total"]) if row else 0
+    counter = Habit.objects.filter(user=request.user).aggregate(
+        total=Count("id", distinct=True),
+        done=Count("logs", filter=Q(logs__date=today)),
+    )
+    return render(
+        request,
+        "habits/_today_toggle.html",
+        {
+            "item": item,
+            "oob": True,
+            "live_updates": isinstance(request, ASGIRequest),
+            **counter,
+        },
+    )
+
+
 @login_required
 @require_POST
 def toggle_today(request, habit_id: int):
+    """
+    HTMX toggle dnešního logu. Vrací jen řádek habitu (#habit-row-<id>)
+    a out-of-band aktualizaci počítadla (#today-counter).
+    """
     habit = get_object_or_404(Habit, id=habit_id, user=request.user)
     today = dt.date.today()
+    origin = clean_client_id(request.headers.get(CLIENT_HEADER))
+    with event_origin(origin):
+        checked = _toggle_log(habit, today)
+    return _render_row(request, habit, today, checked)
 
-    # toggle dnešního logu
-    existing = HabitLog.objects.filter(habit=habit, date=today).first()
-    if existing:
-        existing.delete()
-    else:
-        HabitLog.objects.create(habit=habit, date=today, value=1)
 
-    ctx = _build_today_context(request.user)
-    return render(request, "habits/_today_list.html", ctx)
+@login_required
+@require_GET
+def today_row(request, habit_id: int):
+    """Aktuální řádek habitu – stahuje ho stránka po SSE události habit-<id>."""
+    habit = get_object_or_404(Habit, id=habit_id, user=request.user)
+    return _render_row(request, habit, dt.date.today())
+
+
+SSE_RETRY_MS = 3000
+
+
+def _sse_message(event: dict) -> str:
+    data = {k: v for k, v in event.items() if k != "origin"}
+    return f"event: habit-{event['habit_id']}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _asse_stream(broker, user_id: int, keepalive: float, client_id=None):
+    sub = broker.subscribe(user_id, loop=asyncio.get_running_loop())
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            event = await sub.aget(keepalive)
+            if event is None:
+                yield ": ping\n\n"
+            elif client_id is None or event.get("origin") != client_id:
+                yield _sse_message(event)
+    finally:
+        broker.unsubscribe(sub)
+
+
+@login_required
+@require_GET
+def today_events(request):
+    """
+    SSE kanál změn habitů přihlášeného uživatele (event `habit-<id>`).
+    Jen pod ASGI; pod WSGI vrací 204, na což EventSource přestane
+    obnovovat spojení. `?client=<id>` vynechá události této stránky.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    broker = get_broker()
+    keepalive = float(getattr(settings, "HABITS_SSE_KEEPALIVE", 15))
+    client_id = clean_client_id(request.GET.get("client"))
+    stream = _asse_stream(broker, request.user.id, keepalive, client_id)
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+CSV_HEADER = ["habit_id", "habit_name", "date", "value"]
+CSV_CHUNK = 2000
+
+
+class _Echo:
+    """Pseudo-buffer pro csv.writer: write() jen vrátí řádek."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_stream(rows):
+    """BOM, hlavička a pak řádky po dávkách z DB (.iterator)."""
+    writer = csv.writer(_Echo())
+    sent = 0
+    try:
+        chunk = "\ufeff" + writer.writerow(CSV_HEADER)
+        sent += len(chunk.encode())
+        yield chunk
+        batch = []
+        for habit_id, habit_name, log_date, value in rows.iterator(
+            chunk_size=CSV_CHUNK
+        ):
+            batch.append(
+                writer.writerow(
+                    [habit_id, habit_name, log_date.isoformat(), int(value)]
+                )
+            )
+            if len(batch) >= CSV_CHUNK:
+                chunk = "".join(batch)
+                sent += len(chunk.encode())
+                yield chunk
+                batch = []
+        if batch:
+            chunk = "".join(batch)
+            sent += len(chunk.encode())
+            yield chunk
+    finally:
+        # i při přerušeném stahování
+        CSV_EXPORT_BYTES.inc(sent)
 
 
 @login_required
@@ -167,8 +553,9 @@ def export_logs_csv(request):
     """
     Stáhne CSV s logy přihlášeného uživatele.
     Filtry: ?habit_id=&date__gte=&date__lte=&ordering=(date|-date|id|-id)
+    ?stream=1 — streamované CSV; paměť nezávisí na počtu řádků.
     """
-    qs = HabitLog.objects.select_related("habit").filter(habit__user=request.user)
+    qs = HabitLog.objects.filter(user=request.user)
 
     habit_id = request.GET.get("habit_id")
     if habit_id:
@@ -195,12 +582,21 @@ def export_logs_csv(request):
     if ordering.lstrip("-") in {"date", "id"}:
         qs = qs.order_by(ordering)
 
+    rows = qs.values_list("habit_id", "habit__name", "date", "value")
+
+    if request.GET.get("stream") in {"1", "true"}:
+        resp = StreamingHttpResponse(
+            _csv_stream(rows), content_type="text/csv; charset=utf-8"
+        )
+        resp["Content-Disposition"] = 'attachment; filename="logs.csv"'
+        return resp
+
     # CSV do paměti
     buf = io.StringIO()
     writer = csv.writer(buf)
-    writer.writerow(["habit_id", "habit_name", "date", "value"])
-    for log in qs:
-        writer.writerow([log.habit_id, log.habit.name, log.date.isoformat(), int(log.value)])
+    writer.writerow(CSV_HEADER)
+    for habit_id, habit_name, log_date, value in rows.iterator(chunk_size=CSV_CHUNK):
+        writer.writerow([habit_id, habit_name, log_date.isoformat(), int(value)])
 
     content = buf.getvalue()
 
@@ -209,4 +605,5 @@ def export_logs_csv(request):
     resp["Content-Disposition"] = 'attachment; filename="logs.csv"'
     resp.write("\ufeff")  # BOM
     resp.write(content)
+    CSV_EXPORT_BYTES.inc(sum(len(chunk) for chunk in resp))
     return resp
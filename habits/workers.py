@@ -0,0 +1,24 @@
+"""
+Pool procesů pro dávkové příkazy (`compute_all_stats`, `fill_demo_data`).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.db import connections
+
+
+def init_worker():
+    """Každý worker si otevře vlastní DB spojení (nic nesdílí s rodičem)."""
+    if not apps.ready:  # spawn start method
+        django.setup()
+    connections.close_all()
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    # spojení rodiče se nesmí sdílet s forknutými workery
+    connections.close_all()
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker)